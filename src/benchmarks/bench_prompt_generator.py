@@ -0,0 +1,48 @@
+"""Compare the column-wise ticket formatter with the original iterrows() loop.
+
+Run from src/: python -m benchmarks.bench_prompt_generator
+"""
+import argparse
+import time
+import pandas as pd
+from benchmarks.synthetic import generate_frame
+from services.prompt_generator import PromptGenerator
+
+def format_ticket_details_iterrows(section_data: pd.DataFrame) -> str:
+    """The row-by-row implementation PromptGenerator used before vectorization"""
+    return "\n".join(
+        f"- Ticket {row.get('ORDER_NUMBER', 'Unknown')} ({row.get('ACCEPTANCE_TIME', 'Unknown date').date() if hasattr(row.get('ACCEPTANCE_TIME', pd.NaT), 'date') else 'Unknown date'}): "
+        f"{row.get('ORDER_DESCRIPTION_1', '')} - {row.get('ORDER_DESCRIPTION_2', '')}. "
+        f"Resolution: {row.get('COMPLETION_RESULT_KB', '')}"
+        for _, row in section_data.iterrows()
+    )
+
+def make_section(rows: int, seed: int = 0) -> pd.DataFrame:
+    section = generate_frame(rows, date_span_days=90, description_cardinality=4, seed=seed)
+    section = section.sort_values('ACCEPTANCE_TIME', kind='stable', ignore_index=True)
+    # Missing descriptions exercise the NaN formatting path
+    section['ORDER_DESCRIPTION_1'] = section['ORDER_DESCRIPTION_1'].mask(section.index % 4 == 3)
+    return section
+
+def timed(func, *args) -> (float, str):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    generator = PromptGenerator()
+    print(f"{'rows':>10} {'iterrows (s)':>14} {'vectorized (s)':>15} {'speedup':>9}")
+    for rows in args.rows:
+        section = make_section(rows)
+        baseline_time, baseline = timed(format_ticket_details_iterrows, section)
+        vectorized_time, vectorized = timed(generator.format_ticket_details, section)
+        if vectorized != baseline:
+            raise SystemExit(f"Output differs from the iterrows implementation at {rows} rows")
+        print(f"{rows:>10} {baseline_time:>14.3f} {vectorized_time:>15.3f} {baseline_time / vectorized_time:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Cold start of the app module and latency of the first summary with and without model warm-up.
+
+Run from src/: python -m benchmarks.bench_startup
+
+Each import is timed in a fresh interpreter. The first-summary comparison needs a running
+Ollama server and is skipped when none is reachable.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from services.ai_service import AIService
+from services.model_warmer import ModelWarmer
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import main; print(time.perf_counter() - started)"
+
+def cold_import_seconds(runs: int) -> list:
+    """Time `import main` in a new interpreter per run"""
+    return [float(subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], check=True,
+                                 capture_output=True, text=True).stdout.strip().splitlines()[-1])
+            for _ in range(runs)]
+
+def unload(model_name: str, host: str = None):
+    """Ask Ollama to evict the model so the next call pays the load time"""
+    from ollama import Client
+    Client(host=host).generate(model=model_name, prompt="", keep_alive=0)
+
+def first_summary_seconds(model_name: str, warm: bool, host: str = None) -> float:
+    """Seconds until the first summary arrives, after any warm-up has finished"""
+    unload(model_name, host)
+    warmer = ModelWarmer(host=host)
+    if warm:
+        warmer.warm(model_name)
+        status = warmer.wait(model_name)
+        if status is None or status['state'] != 'ready':
+            raise RuntimeError(f"Warm-up failed: {status}")
+    ai_service = AIService(model_name, keep_alive=warmer.keep_alive)
+    started = time.perf_counter()
+    ai_service.generate_summary("Summarize in one sentence: the printer on floor 2 is out of toner.")
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--model", default="gemma2:2b-instruct-q5_0")
+    parser.add_argument("--host", default=None, help="Ollama host, defaults to OLLAMA_HOST or localhost")
+    args = parser.parse_args()
+
+    imports = cold_import_seconds(args.runs)
+    print(f"cold import main: median {statistics.median(imports):.3f}s "
+          f"(min {min(imports):.3f}s, max {max(imports):.3f}s, {args.runs} runs)")
+
+    try:
+        cold = first_summary_seconds(args.model, warm=False, host=args.host)
+        warm = first_summary_seconds(args.model, warm=True, host=args.host)
+    except Exception as e:
+        print(f"first summary: skipped, Ollama not reachable ({e})")
+        return
+    print(f"first summary: {cold:.2f}s without warm-up, {warm:.2f}s after warm-up")
+
+if __name__ == "__main__":
+    main()
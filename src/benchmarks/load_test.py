@@ -0,0 +1,152 @@
+"""Simulate concurrent analyst sessions end to end against a local mock Ollama server.
+
+Run from src/:
+    python -m benchmarks.load_test --sessions 8 --rows 20000 --first-token-latency 0.5 --tokens-per-second 30
+
+Each session uploads a synthetic dump, parses it with FileController, processes it with
+DataController.process_data and generates product summaries with
+SummaryController.generate_product_summary, like a user of the app. The report lists
+throughput and p50/p95/p99 latency per stage. Sessions share one SummaryWorker, as the
+app's sessions do. Pass --ollama-url to load a real server instead of the mock.
+"""
+import argparse
+import io
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import numpy as np
+from benchmarks.mock_ollama import MockOllamaServer
+from benchmarks.synthetic import generate_dump
+from controllers.data_controller import DataController
+from controllers.file_controller import FileController
+from controllers.summary_controller import SummaryController
+from services.summary_worker import SummaryWorker
+
+STAGES = ['upload', 'process', 'summary', 'session']
+
+class _Upload(io.BytesIO):
+    """In-memory stand-in for a Streamlit UploadedFile"""
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+class LoadRecorder:
+    """Thread-safe latencies per stage and failure counts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.failures: Dict[str, int] = defaultdict(int)
+
+    def record(self, stage: str, seconds: float, failed: bool = False):
+        with self._lock:
+            if failed:
+                self.failures[stage] += 1
+            else:
+                self.latencies[stage].append(seconds)
+
+    def report(self, wall_time: float) -> Dict[str, Dict[str, float]]:
+        report = {}
+        for stage in STAGES:
+            values = np.array(self.latencies.get(stage, []))
+            entry = {'count': int(len(values)), 'failed': self.failures.get(stage, 0),
+                     'throughput': len(values) / wall_time if wall_time else 0.0}
+            if len(values):
+                p50, p95, p99 = np.percentile(values, [50, 95, 99])
+                entry.update({'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'max': float(values.max())})
+            report[stage] = entry
+        return report
+
+def run_session(number: int, args: argparse.Namespace, worker: SummaryWorker, base_url: str,
+                recorder: LoadRecorder):
+    """One analyst: upload, process, then summarize products one after another"""
+    started = time.perf_counter()
+    seed = 0 if args.same_data else number
+    upload = _Upload(f"session-{number}.txt", generate_dump(args.rows, seed=seed).encode("utf-8"))
+
+    stage_start = time.perf_counter()
+    try:
+        df, _ = FileController(max_workers=1).load_uploaded_files([upload])
+    except Exception:
+        recorder.record('upload', 0.0, failed=True)
+        recorder.record('session', 0.0, failed=True)
+        return
+    recorder.record('upload', time.perf_counter() - stage_start)
+
+    stage_start = time.perf_counter()
+    data_controller = DataController(single_pass=True)
+    data_controller.process_data(df)
+    recorder.record('process', time.perf_counter() - stage_start)
+
+    summary_controller = SummaryController(data_controller, args.model, max_concurrency=args.llm_concurrency,
+                                           worker=worker, session_id=number, base_url=base_url)
+    failed = False
+    for product in data_controller.get_stats()['products'][:args.products]:
+        stage_start = time.perf_counter()
+        try:
+            summary_controller.generate_product_summary(product)
+            recorder.record('summary', time.perf_counter() - stage_start)
+        except Exception:
+            recorder.record('summary', 0.0, failed=True)
+            failed = True
+    recorder.record('session', time.perf_counter() - started, failed=failed)
+
+def run_load(args: argparse.Namespace, base_url: str) -> Dict[str, Any]:
+    recorder = LoadRecorder()
+    worker = SummaryWorker(max_concurrency=args.shared_concurrency)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions, thread_name_prefix="session") as pool:
+        for future in [pool.submit(run_session, number, args, worker, base_url, recorder)
+                       for number in range(args.sessions)]:
+            future.result()
+    wall_time = time.perf_counter() - started
+    return {'wall_time': wall_time, 'stages': recorder.report(wall_time)}
+
+def print_report(result: Dict[str, Any], server_stats: Optional[Dict[str, int]]):
+    print(f"wall time {result['wall_time']:.2f}s")
+    print(f"{'stage':<10}{'count':>7}{'failed':>8}{'per s':>9}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'max s':>9}")
+    for stage, entry in result['stages'].items():
+        timings = "".join(f"{entry[key]:>9.3f}" if key in entry else f"{'-':>9}" for key in ('p50', 'p95', 'p99', 'max'))
+        print(f"{stage:<10}{entry['count']:>7}{entry['failed']:>8}{entry['throughput']:>9.2f}{timings}")
+    if server_stats is not None:
+        print("mock server: " + ", ".join(f"{key} {value}" for key, value in server_stats.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent analyst sessions")
+    parser.add_argument("--rows", type=int, default=20_000, help="Tickets per uploaded dump")
+    parser.add_argument("--products", type=int, default=2, help="Products summarized per session")
+    parser.add_argument("--same-data", action="store_true",
+                        help="Every session uploads the same dump, so identical prompts are deduplicated")
+    parser.add_argument("--model", default="gemma2:2b-instruct-q5_0")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent LLM calls per session")
+    parser.add_argument("--shared-concurrency", type=int, default=4,
+                        help="Concurrent LLM calls across all sessions (the app's SHARED_LLM_CONCURRENCY)")
+    parser.add_argument("--first-token-latency", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=80)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-parallel", type=int, default=None, help="Mock server's OLLAMA_NUM_PARALLEL")
+    parser.add_argument("--ollama-url", default=None, help="Load this server instead of starting the mock")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    if args.ollama_url is not None:
+        result, server_stats = run_load(args, args.ollama_url), None
+    else:
+        with MockOllamaServer(first_token_latency=args.first_token_latency, tokens_per_second=args.tokens_per_second,
+                              response_tokens=args.response_tokens, error_rate=args.error_rate,
+                              max_parallel=args.max_parallel, seed=0) as server:
+            result = run_load(args, server.url)
+            server_stats = server.stats()
+
+    print_report(result, server_stats)
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'settings': vars(args), 'server': server_stats, **result}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
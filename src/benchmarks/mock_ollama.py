@@ -0,0 +1,231 @@
+"""Local stand-in for the Ollama HTTP API, for load tests without a model or network.
+
+Run from src/:
+    python -m benchmarks.mock_ollama --port 11435 --first-token-latency 0.5 --tokens-per-second 40
+    OLLAMA_HOST=http://127.0.0.1:11435 streamlit run main.py
+
+Serves /api/chat and /api/generate (streamed NDJSON or a single JSON reply, as the request
+asks), plus /api/tags, /api/version and /api/ps so clients that probe the server work.
+Replies arrive after first_token_latency and then at tokens_per_second; error_rate of the
+requests fail with HTTP 500. max_parallel queues requests beyond Ollama's OLLAMA_NUM_PARALLEL.
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_Server"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        mock = self.server.mock
+        if self.path == "/api/tags":
+            self._send_json(200, {'models': [{'name': name, 'model': name} for name in mock.models]})
+        elif self.path == "/api/version":
+            self._send_json(200, {'version': "0.0.0-mock"})
+        elif self.path == "/api/ps":
+            self._send_json(200, {'models': []})
+        elif self.path == "/":
+            self._send_text(200, "Ollama is running")
+        else:
+            self._send_json(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._send_json(404, {'error': f"unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {'error': "invalid JSON body"})
+            return
+        self.server.mock.handle(self, request, chat=self.path == "/api/chat")
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        self._send_text(status, json.dumps(body), "application/json")
+
+    def _send_text(self, status: int, text: str, content_type: str = "text/plain"):
+        payload = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockOllamaServer"
+
+    def handle_error(self, request, client_address):
+        # Clients cancelling a generation close the connection mid-reply
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class MockOllamaServer:
+    """Threaded HTTP server answering like Ollama with synthetic latency, throughput and errors"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, first_token_latency: float = 0.2,
+                 tokens_per_second: float = 50.0, response_tokens: int = 80, error_rate: float = 0.0,
+                 max_parallel: Optional[int] = None, seed: Optional[int] = None):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.models = ["gemma2:2b-instruct-q5_0", "mistral", "gemma"]
+        self._random = random.Random(seed)
+        self._parallel = threading.BoundedSemaphore(max_parallel) if max_parallel else None
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'active': 0, 'peak_active': 0, 'tokens': 0}
+        self._server = _Server((host, port), _Handler)
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockOllamaServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="mock-ollama")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockOllamaServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Requests served, failed, running now, peak concurrency and tokens generated"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+            if key == 'active':
+                self._stats['peak_active'] = max(self._stats['peak_active'], self._stats['active'])
+
+    def handle(self, handler: _Handler, request: Dict[str, Any], chat: bool):
+        self._count('requests')
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            self._count('errors')
+            handler._send_json(500, {'error': "mock failure"})
+            return
+
+        if self._parallel is not None:
+            self._parallel.acquire()
+        self._count('active')
+        try:
+            self._reply(handler, request, chat)
+        finally:
+            self._count('active', -1)
+            if self._parallel is not None:
+                self._parallel.release()
+
+    def _prompt(self, request: Dict[str, Any], chat: bool) -> str:
+        if chat:
+            return "\n".join(str(message.get('content', '')) for message in request.get('messages', []))
+        return str(request.get('prompt', ''))
+
+    def _tokens(self, prompt: str) -> Iterator[str]:
+        """Deterministic reply words derived from the prompt"""
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        for i in range(self.response_tokens):
+            yield f"{digest[i % 60:i % 60 + 4]} "
+
+    def _reply(self, handler: _Handler, request: Dict[str, Any], chat: bool):
+        started = time.perf_counter()
+        model = request.get('model', self.models[0])
+        prompt = self._prompt(request, chat)
+        # An empty /api/generate prompt only loads the model, as ModelWarmer uses it
+        tokens = [] if not chat and not prompt else list(self._tokens(prompt))
+        stream = request.get('stream', True)
+        time.sleep(self.first_token_latency)
+
+        def chunk(text: str, done: bool) -> Dict[str, Any]:
+            body = {'model': model, 'created_at': datetime.now(timezone.utc).isoformat(), 'done': done}
+            if chat:
+                body['message'] = {'role': 'assistant', 'content': text}
+            else:
+                body['response'] = text
+            if done:
+                elapsed = int((time.perf_counter() - started) * 1e9)
+                body.update({'done_reason': 'stop', 'total_duration': elapsed, 'load_duration': 0,
+                             'prompt_eval_count': max(1, len(prompt) // 4), 'prompt_eval_duration': 0,
+                             'eval_count': len(tokens), 'eval_duration': elapsed})
+            return body
+
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        if not stream:
+            time.sleep(interval * len(tokens))
+            self._count('tokens', len(tokens))
+            handler._send_json(200, chunk("".join(tokens), True))
+            return
+
+        handler.send_response(200)
+        handler.send_header("Content-Type", "application/x-ndjson")
+        handler.send_header("Transfer-Encoding", "chunked")
+        handler.end_headers()
+
+        def write(body: Dict[str, Any]):
+            line = (json.dumps(body) + "\n").encode("utf-8")
+            handler.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+            handler.wfile.flush()
+
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(interval)
+            write(chunk(token, False))
+        self._count('tokens', len(tokens))
+        write(chunk("", True))
+        handler.wfile.write(b"0\r\n\r\n")
+        handler.wfile.flush()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Ollama API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=80, help="Tokens per reply")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with HTTP 500")
+    parser.add_argument("--max-parallel", type=int, default=None,
+                        help="Requests generated at once, like OLLAMA_NUM_PARALLEL; others wait")
+    args = parser.parse_args()
+
+    server = MockOllamaServer(args.host, args.port, args.first_token_latency, args.tokens_per_second,
+                              args.response_tokens, args.error_rate, args.max_parallel)
+    print(f"Mock Ollama listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
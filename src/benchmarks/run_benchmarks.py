@@ -0,0 +1,141 @@
+"""Time and peak memory of each pipeline stage at several scales, checked against a stored baseline.
+
+Run from src/:
+    python -m benchmarks.run_benchmarks                  # compare with benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --save-baseline  # record a new baseline on this machine
+    python -m benchmarks.run_benchmarks --rows 1000000   # a million-row dump, for profiling by hand
+
+Exits with status 1 when a stage is slower or uses more memory than the baseline allows, or when
+there is no baseline to compare with. The committed baseline was recorded with the default --rows;
+the default tolerances leave room for CI machines slower than the one that recorded it.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from benchmarks.synthetic import generate_dump
+from benchmarks.stub_llm import StubAIService
+from controllers.data_controller import DataController
+from controllers.summary_controller import SummaryController
+from models.category_mapper import CategoryMapper
+from models.data_loader import DataLoader
+from models.data_processor import DataProcessor
+from models.timeline_analyzer import TimelineAnalyzer
+from services.prompt_generator import PromptGenerator
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+def build_cases(rows: int, args: argparse.Namespace) -> List[Tuple[str, Callable[[], object]]]:
+    """Prepare the input of every stage up front so each case times one stage only"""
+    text = generate_dump(rows, date_span_days=args.date_span_days,
+                         description_cardinality=args.description_cardinality)
+    raw_df = DataLoader().load_from_text(text)
+    processor = DataProcessor()
+    mapper = CategoryMapper()
+    processed_df = processor.preprocess(raw_df)
+    mapped_df = mapper.map_categories(processed_df)
+    
+    data_controller = DataController()
+    data_controller.process_data(raw_df)
+    product = max(data_controller.products, key=lambda name: len(data_controller.get_product_data(name)))
+    product_df = data_controller.get_product_data(product)
+    analyzer = TimelineAnalyzer()
+    section_name, section_data = next(iter(analyzer.create_timeline_sections(product_df).items()))
+    generator = PromptGenerator()
+    
+    summary_controller = SummaryController(data_controller)
+    summary_controller.ai_service = StubAIService(latency=args.llm_latency)
+    
+    return [
+        ("DataLoader.load_from_text", lambda: DataLoader().load_from_text(text)),
+        ("DataProcessor.preprocess", lambda: processor.preprocess(raw_df)),
+        ("CategoryMapper.map_categories", lambda: mapper.map_categories(processed_df)),
+        ("TimelineAnalyzer.create_timeline_sections", lambda: analyzer.create_timeline_sections(product_df)),
+        ("PromptGenerator.create_section_prompt",
+         lambda: generator.create_section_prompt(section_name, product, section_data)),
+        ("SummaryController.generate_product_summary", lambda: summary_controller.generate_product_summary(product)),
+    ]
+
+def measure(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best wall time over repeat runs, then peak traced allocation in a separate run"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    
+    # Tracing slows allocation-heavy code down, so memory is measured apart from timing
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'peak_bytes': peak}
+
+def check(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+          time_tolerance: float, memory_tolerance: float, time_slack: float) -> List[str]:
+    """List every measurement that exceeds its baseline by more than the tolerance.
+    
+    A slowdown must also exceed time_slack seconds, so timer jitter on millisecond cases is ignored.
+    """
+    regressions = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        allowed_seconds = max(expected['seconds'] * (1 + time_tolerance), expected['seconds'] + time_slack)
+        if result['seconds'] > allowed_seconds:
+            regressions.append(f"{key}: {result['seconds']:.4f}s vs baseline {expected['seconds']:.4f}s")
+        if result['peak_bytes'] > expected['peak_bytes'] * (1 + memory_tolerance):
+            regressions.append(f"{key}: peak {result['peak_bytes'] / 2**20:.1f} MB "
+                               f"vs baseline {expected['peak_bytes'] / 2**20:.1f} MB")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Dump sizes to run; the defaults finish in a few minutes in CI")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best one counts")
+    parser.add_argument("--date-span-days", type=int, default=90)
+    parser.add_argument("--description-cardinality", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds per stub LLM call")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=1.0, help="Allowed slowdown, as a fraction")
+    parser.add_argument("--time-slack", type=float, default=0.05, help="Slowdowns below this many seconds are ignored")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="Allowed peak memory growth, as a fraction")
+    args = parser.parse_args()
+    
+    results = {}
+    print(f"{'case':<45} {'rows':>10} {'time (s)':>10} {'peak (MB)':>10}")
+    for rows in args.rows:
+        for name, func in build_cases(rows, args):
+            result = measure(func, args.repeat)
+            results[f"{name}@{rows}"] = result
+            print(f"{name:<45} {rows:>10} {result['seconds']:>10.4f} {result['peak_bytes'] / 2**20:>10.1f}")
+    
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return 1
+    
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = check(results, baseline, args.time_tolerance, args.memory_tolerance,
+                        args.time_slack)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+"""Deterministic stand-in for the Ollama model, so benchmarks measure our code rather than the LLM."""
+import hashlib
+import time
+from typing import Iterator, List, Optional
+from services.ai_service import AIService
+from services.summary_cache import SummaryCache
+
+class _Message:
+    def __init__(self, content: str):
+        self.content = content
+
+class StubLLM:
+    """Answers every prompt with a short summary derived from its hash after a fixed latency"""
+    
+    def __init__(self, latency: float = 0.0, tokens: int = 40):
+        self.latency = latency
+        self.tokens = tokens
+        self.calls = 0
+    
+    def _reply(self, messages) -> List[str]:
+        self.calls += 1
+        digest = hashlib.sha256(messages[-1].content.encode("utf-8")).hexdigest()
+        return [f"{digest[i % 64:i % 64 + 4]} " for i in range(self.tokens)]
+    
+    def invoke(self, messages, **kwargs) -> _Message:
+        time.sleep(self.latency)
+        return _Message("".join(self._reply(messages)))
+    
+    def stream(self, messages, **kwargs) -> Iterator[_Message]:
+        reply = self._reply(messages)
+        for token in reply:
+            time.sleep(self.latency / len(reply))
+            yield _Message(token)
+
+class StubAIService(AIService):
+    """AIService backed by StubLLM; caching and the concurrency cap behave as in production"""
+    
+    def __init__(self, latency: float = 0.0, tokens: int = 40, cache: Optional[SummaryCache] = None,
+                 max_concurrency: int = 4):
+        super().__init__("stub", cache=cache, max_concurrency=max_concurrency)
+        self.latency = latency
+        self.tokens = tokens
+    
+    def _initialize_llm(self):
+        if self._llm is None:
+            self._llm = StubLLM(self.latency, self.tokens)
@@ -0,0 +1,44 @@
+"""Synthetic ticket dumps shaped like the real exports."""
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+# Roughly the share of each service category in production dumps; 'XXX' is filtered out by preprocessing
+DEFAULT_CATEGORY_MIX = {
+    'KAI': 0.30, 'NET': 0.15, 'KAV': 0.15, 'KAD': 0.12,
+    'GIGA': 0.08, 'VOD': 0.06, 'HDW': 0.09, 'XXX': 0.05
+}
+
+def generate_frame(rows: int, category_mix: Optional[Dict[str, float]] = None, date_span_days: int = 90,
+                   description_cardinality: int = 50, start: str = '2024-01-01', seed: int = 0) -> pd.DataFrame:
+    """Generate raw tickets with the dump's columns, in file order (not sorted by time).
+    
+    description_cardinality is the number of distinct values in each free-text column;
+    lower values mean more near-duplicate tickets.
+    """
+    rng = np.random.default_rng(seed)
+    mix = category_mix or DEFAULT_CATEGORY_MIX
+    categories = np.array(list(mix))
+    weights = np.array(list(mix.values()), dtype=float)
+    
+    start_ns = pd.Timestamp(start).value
+    span_ns = max(1, date_span_days) * 86_400 * 10**9
+    # Whole minutes, as in the exports
+    accepted = (start_ns + rng.integers(0, span_ns, rows)) // 60_000_000_000 * 60_000_000_000
+    completed = accepted + rng.integers(5, 3_000, rows) * 60_000_000_000
+    
+    cardinality = max(1, description_cardinality)
+    return pd.DataFrame({
+        'ORDER_NUMBER': np.arange(100_000, 100_000 + rows).astype(str),
+        'SERVICE_CATEGORY': rng.choice(categories, rows, p=weights / weights.sum()),
+        'ACCEPTANCE_TIME': pd.to_datetime(accepted),
+        'COMPLETION_TIME': pd.to_datetime(completed),
+        'ORDER_DESCRIPTION_1': np.char.add('Issue ', rng.integers(0, cardinality, rows).astype(str)),
+        'ORDER_DESCRIPTION_2': np.char.add('Detail ', rng.integers(0, cardinality, rows).astype(str)),
+        'COMPLETION_RESULT_KB': np.char.add('Resolution ', rng.integers(0, cardinality, rows).astype(str)),
+        'CUSTOMER_REGION': rng.choice(['North', 'South', 'East', 'West'], rows),
+    })
+
+def generate_dump(rows: int, delimiter: str = '\t', **options) -> str:
+    """Generate a dump as text, in the format the uploader accepts"""
+    return generate_frame(rows, **options).to_csv(sep=delimiter, index=False, date_format='%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,227 @@
+"""Headless batch summarizer for ticket dumps.
+
+Usage (from src/):
+    python cli.py DUMP_DIR --output reports/ [--workers 8] [--llm-concurrency 4]
+
+Dumps are parsed and processed across a process pool while the main process sends
+LLM calls through a separate, bounded thread pool. Each dump gets one markdown and
+one JSON summary per product, and the run writes a manifest.json with timings
+plus metrics.prom / metrics.jsonl for dashboards.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from controllers.data_controller import DataController
+from controllers.summary_controller import SummaryController
+from models.category_mapper import CategoryMapper, DEFAULT_RULES_PATH
+from models.data_loader import DataLoader, PIPELINE_COLUMNS, PIPELINE_DTYPES
+from models.timeline_analyzer import STRATEGIES
+from services.metrics import metrics
+from services.summary_cache import SummaryCache, DEFAULT_CACHE_DIR
+
+
+def process_dump(path: str, category_rules: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Parse and process one dump file; runs in a worker process"""
+    timings = {}
+
+    start = time.perf_counter()
+    df = DataLoader(usecols=PIPELINE_COLUMNS, dtype=PIPELINE_DTYPES).load_from_path(path)
+    timings['parse'] = time.perf_counter() - start
+    rows_loaded = len(df)
+
+    start = time.perf_counter()
+    data_controller = DataController(single_pass=True, category_mapper=CategoryMapper(rules_path=category_rules))
+    data_controller.process_data(df)
+    timings['process'] = time.perf_counter() - start
+
+    return data_controller.mapped_df, {'rows_loaded': rows_loaded, 'timings': timings}
+
+
+def _safe_name(name: Any) -> str:
+    return re.sub(r'[^\w.-]+', '_', str(name)).strip('_') or 'unnamed'
+
+
+def _format_time(value) -> Optional[str]:
+    return None if pd.isna(value) else pd.Timestamp(value).isoformat()
+
+
+def write_product_reports(summary_controller: SummaryController, dump_dir: str,
+                          sections_by_product: Dict[str, Optional[List[Tuple[str, pd.DataFrame, Optional[str], Optional[str]]]]]
+                          ) -> List[str]:
+    """Write <product>.md and <product>.json for every product with tickets"""
+    os.makedirs(dump_dir, exist_ok=True)
+    written = []
+    degraded = {(product, section_name): reason for product, section_name, reason in summary_controller.degraded}
+    for product, sections in sections_by_product.items():
+        if sections is None:
+            continue
+
+        plan = [(section_name, section_data, None) for section_name, section_data, _, _ in sections]
+        ai_summaries = [
+            ai_summary if error is None else f"*Summary unavailable: {error}*"
+            for _, _, ai_summary, error in sections
+        ]
+        markdown = summary_controller.format_product_summary(product, plan, ai_summaries)
+        report = {
+            'product': str(product),
+            'sections': [
+                {
+                    'name': section_name,
+                    'tickets': len(section_data),
+                    'start': _format_time(section_data['ACCEPTANCE_TIME'].min()) if len(section_data) else None,
+                    'end': _format_time(section_data['ACCEPTANCE_TIME'].max()) if len(section_data) else None,
+                    'summary': ai_summary,
+                    'error': error,
+                    'degraded': degraded.get((product, section_name))
+                }
+                for section_name, section_data, ai_summary, error in sections
+            ]
+        }
+
+        base = os.path.join(dump_dir, _safe_name(product))
+        with open(f"{base}.md", "w", encoding="utf-8") as f:
+            f.write(markdown)
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        written.append(base)
+    return written
+
+
+def summarize_dump(summary_controller: SummaryController, data_controller: DataController,
+                   mapped_df: pd.DataFrame, dump_dir: str, llm_concurrency: int) -> Dict[str, Any]:
+    """Summarize every product of a processed dump and write its reports"""
+    data_controller.load_mapped_data(mapped_df)
+    products = data_controller.get_stats()['products']
+
+    start = time.perf_counter()
+    sections_by_product = summary_controller.summarize_products(products, llm_concurrency)
+    summarize_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    write_product_reports(summary_controller, dump_dir, sections_by_product)
+    write_time = time.perf_counter() - start
+
+    return {
+        'rows_mapped': len(mapped_df),
+        'products': [str(product) for product in products],
+        'sections': sum(len(sections) for sections in sections_by_product.values() if sections),
+        'failures': [
+            {'product': str(product), 'section': section_name, 'error': error}
+            for product, section_name, error in summary_controller.failures
+        ],
+        'degraded': [
+            {'product': str(product), 'section': section_name, 'reason': reason}
+            for product, section_name, reason in summary_controller.degraded
+        ],
+        'timings': {'summarize': summarize_time, 'write': write_time}
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize ticket dumps without the Streamlit UI")
+    parser.add_argument("input_dir", help="Directory containing ticket dump files")
+    parser.add_argument("--output", "-o", default="reports", help="Directory for reports and manifest.json")
+    parser.add_argument("--pattern", default="*.txt", help="Glob pattern for dump files inside input_dir")
+    parser.add_argument("--model", default="gemma2:2b-instruct-q5_0", help="Ollama model name")
+    parser.add_argument("--ollama-url", default=None,
+                        help="Ollama server URL; defaults to OLLAMA_HOST or http://localhost:11434")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes used to parse and process dumps")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum concurrent LLM requests")
+    parser.add_argument("--num-sections", type=int, default=5, help="Timeline sections per product")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="auto", help="Timeline bucketing strategy")
+    parser.add_argument("--prompt-token-budget", type=int, default=None,
+                        help="Compact section prompts above this many estimated tokens")
+    parser.add_argument("--map-reduce-chunk-size", type=int, default=None,
+                        help="Summarize sections with more tickets than this chunk by chunk")
+    parser.add_argument("--map-reduce-fan-out", type=int, default=8, help="Partial summaries combined per reduce call")
+    parser.add_argument("--latency-budget", type=float, default=None,
+                        help="Seconds summarizing one dump may take; late sections use the fallback model "
+                             "or a statistical summary")
+    parser.add_argument("--call-timeout", type=float, default=None, help="Cancel LLM calls after this many seconds")
+    parser.add_argument("--fallback-model", default=None,
+                        help="Faster Ollama model for sections the main model cannot finish within the budget")
+    parser.add_argument("--category-rules", default=DEFAULT_RULES_PATH,
+                        help="JSON file with the rules mapping tickets to products")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Summary cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the summary cache")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    paths = sorted(glob.glob(os.path.join(args.input_dir, args.pattern)))
+    if not paths:
+        print(f"No files matching {args.pattern} in {args.input_dir}", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output, exist_ok=True)
+    data_controller = DataController(single_pass=True)
+    data_controller.set_timeline_options(args.num_sections, args.strategy)
+    summary_controller = SummaryController(data_controller, args.model,
+                                           cache=None if args.no_cache else SummaryCache(args.cache_dir),
+                                           prompt_token_budget=args.prompt_token_budget,
+                                           max_concurrency=args.llm_concurrency,
+                                           map_reduce_chunk_size=args.map_reduce_chunk_size,
+                                           map_reduce_fan_out=args.map_reduce_fan_out,
+                                           base_url=args.ollama_url,
+                                           latency_budget=args.latency_budget,
+                                           call_timeout=args.call_timeout,
+                                           fallback_model=args.fallback_model)
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    run_start = time.perf_counter()
+    dumps = {}
+
+    # Dumps are summarized as soon as their worker finishes, while the others keep parsing
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(process_dump, path, args.category_rules): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            name = os.path.splitext(os.path.basename(path))[0]
+            entry = {'path': path, 'output': os.path.join(args.output, _safe_name(name))}
+            try:
+                mapped_df, processed = future.result()
+                entry.update(processed)
+                # Workers run in other processes, so their stage timings are recorded here
+                for stage, seconds in processed['timings'].items():
+                    metrics.record_stage(stage, seconds)
+                metrics.record_volume('parsed', processed['rows_loaded'], os.path.getsize(path))
+                metrics.record_volume('processed', len(mapped_df), mapped_df.memory_usage(deep=True).sum())
+                summarized = summarize_dump(summary_controller, data_controller, mapped_df,
+                                            entry['output'], args.llm_concurrency)
+                entry['timings'].update(summarized.pop('timings'))
+                entry.update(summarized)
+                entry['status'] = 'ok' if not entry['failures'] else 'partial'
+            except Exception as e:
+                entry['status'] = 'error'
+                entry['error'] = str(e)
+            dumps[path] = entry
+            print(f"[{entry['status']}] {path}", file=sys.stderr)
+
+    manifest = {
+        'started_at': started_at,
+        'wall_time': time.perf_counter() - run_start,
+        'settings': {key: value for key, value in vars(args).items() if key != 'input_dir'},
+        'input_dir': args.input_dir,
+        'dumps': [dumps[path] for path in paths]
+    }
+    with open(os.path.join(args.output, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    metrics.export(args.output)
+
+    return 0 if all(entry['status'] != 'error' for entry in dumps.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
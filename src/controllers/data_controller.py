@@ -1,48 +1,242 @@
+import os
+import tempfile
+import numpy as np
 import pandas as pd
 from models.data_processor import DataProcessor
 from models.category_mapper import CategoryMapper
 from models.timeline_analyzer import TimelineAnalyzer
-from typing import Dict, Any
+from models.chart_aggregator import ChartAggregator
+from services.metrics import metrics
+from services.ticket_store import TicketStore
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 class DataController:
     """Coordinates data processing operations"""
     
-    def __init__(self):
+    def __init__(self, single_pass: bool = False, track_memory: bool = False,
+                 category_mapper: Optional[CategoryMapper] = None, query_cache: Optional[Dict[str, Any]] = None):
+        self.single_pass = single_pass
+        self.track_memory = track_memory
+        self.memory_report: Dict[str, Dict[str, int]] = {}
+        # Per-file parse report of the uploads the loaded data came from
+        self.file_report: List[Dict[str, Any]] = []
         self.data_processor = DataProcessor()
-        self.category_mapper = CategoryMapper()
+        self.category_mapper = category_mapper or CategoryMapper()
         self.timeline_analyzer = TimelineAnalyzer()
         self.raw_df = pd.DataFrame()
         self.processed_df = pd.DataFrame()
         self.mapped_df = pd.DataFrame()
+        self.product_index: Dict[Any, Tuple[int, int]] = {}
+        self.products: List[Any] = []
+        # Identifies the loaded data (e.g. the upload fingerprint) so results derived from it can be reused
+        self.dataset_id: Optional[str] = None
+        # Row positions of the last filtered and sorted raw-data query, reused while paging. The app
+        # passes a dict kept in st.session_state, so it outlives this controller across reruns
+        self.query_cache: Dict[str, Any] = query_cache if query_cache is not None else {}
+        # Set while the data lives in a TicketStore instead of mapped_df
+        self.ticket_store: Optional[TicketStore] = None
+        self.store_key: Optional[str] = None
+        # Chart aggregates of the loaded data, keyed on the aggregator's settings
+        self._chart_data: Optional[Tuple[Tuple, Any]] = None
     
     def process_data(self, df: pd.DataFrame) -> bool:
         """Process raw dataframe"""
+        self.ticket_store = None
+        with metrics.stage('process'):
+            success = self._process(df)
+        metrics.record_volume('processed', len(self.mapped_df), self.mapped_df.memory_usage(deep=True).sum())
+        return success
+    
+    def _process(self, df: pd.DataFrame) -> bool:
         try:
+            self.memory_report = {}
+            self._record_memory('loaded', df)
+            if self.single_pass:
+                return self._process_single_pass(df)
+            
             self.raw_df = df
             self.processed_df = self.data_processor.preprocess(df)
+            self._record_memory('preprocessed', self.processed_df)
             self.mapped_df = self.category_mapper.map_categories(self.processed_df)
+            self._record_memory('mapped', self.mapped_df)
             self.mapped_df = self.data_processor.calculate_resolution_time(self.mapped_df)
+            self._record_memory('resolved', self.mapped_df)
+            self._build_product_index()
             return True
         except Exception as e:
             raise e
     
+    def _process_single_pass(self, df: pd.DataFrame) -> bool:
+        """Process the frame in place with compact dtypes.
+        
+        The only allocation is the category filter when it drops rows, so raw_df and
+        processed_df are not kept as separate frames in this mode.
+        """
+        self.raw_df = pd.DataFrame()
+        self.processed_df = pd.DataFrame()
+        self.mapped_df = self._single_pass(df)
+        self._build_product_index()
+        return True
+    
+    def _single_pass(self, df: pd.DataFrame) -> pd.DataFrame:
+        frame = self.data_processor.preprocess(df, copy=False)
+        self._record_memory('preprocessed', frame)
+        frame = self.category_mapper.map_categories(frame, copy=False)
+        self._record_memory('mapped', frame)
+        frame = self.data_processor.calculate_resolution_time(frame, copy=False)
+        self._record_memory('resolved', frame)
+        frame = self.data_processor.compact_dtypes(frame)
+        self._record_memory('compacted', frame)
+        return frame
+    
+    def _record_memory(self, stage: str, df: pd.DataFrame):
+        """Record per-column memory in bytes for a processing stage"""
+        if not self.track_memory:
+            return
+        usage = df.memory_usage(index=True, deep=True)
+        report = {str(col): int(nbytes) for col, nbytes in usage.items()}
+        report['total'] = int(usage.sum())
+        self.memory_report[stage] = report
+    
+    def get_memory_report(self) -> Dict[str, Dict[str, int]]:
+        """Get bytes per column and in total for each processing stage"""
+        return self.memory_report
+    
+    def load_mapped_data(self, mapped_df: pd.DataFrame):
+        """Use an already processed and mapped dataframe, e.g. one restored from cache"""
+        self.ticket_store = None
+        self.raw_df = pd.DataFrame()
+        self.processed_df = pd.DataFrame()
+        self.mapped_df = mapped_df
+        self._build_product_index()
+    
+    def merge_history(self, history_df: Optional[pd.DataFrame]):
+        """Merge previously stored tickets with the current ones, keeping the newest copy of each ORDER_NUMBER"""
+        if history_df is None or history_df.empty:
+            return
+        
+        if self.ticket_store is not None:
+            self.load_mapped_data(self.get_mapped_data())
+        merged = pd.concat([self._align_dtypes(history_df), self.mapped_df], ignore_index=True)
+        if 'ORDER_NUMBER' in merged.columns:
+            order_numbers = merged['ORDER_NUMBER']
+            merged = merged[~(order_numbers.duplicated(keep='last') & order_numbers.notna())]
+        if self.single_pass:
+            # Categoricals with different categories concatenate to object columns
+            merged = self.data_processor.compact_dtypes(merged.copy())
+        self.load_mapped_data(merged)
+    
+    def _align_dtypes(self, history_df: pd.DataFrame) -> pd.DataFrame:
+        """Cast stored columns to the current dtypes; Parquet round trips change datetime units and string storage"""
+        aligned = history_df.copy()
+        for col, dtype in self.mapped_df.dtypes.items():
+            if col in aligned.columns and aligned[col].dtype != dtype and not isinstance(dtype, pd.CategoricalDtype):
+                aligned[col] = aligned[col].astype(dtype)
+        return aligned
+    
+    def _build_product_index(self):
+        """Sort mapped_df by PRODUCT and ACCEPTANCE_TIME and record each product's row range.
+        
+        Product lookups then become positional slices instead of full-frame scans, and each
+        slice is already in time order for the timeline analyzer.
+        """
+        self.product_index = {}
+        self.products = []
+        # New data is anonymous until the caller identifies it, so no cached query applies to it
+        self.dataset_id = None
+        self._chart_data = None
+        if self.mapped_df.empty or 'PRODUCT' not in self.mapped_df.columns:
+            return
+        
+        # Keep the first-appearance product order that get_stats has always reported
+        self.products = list(pd.unique(self.mapped_df['PRODUCT']))
+        
+        sort_cols = ['PRODUCT'] + (['ACCEPTANCE_TIME'] if 'ACCEPTANCE_TIME' in self.mapped_df.columns else [])
+        self.mapped_df = self.mapped_df.sort_values(sort_cols, kind='stable', na_position='last')
+        
+        codes, uniques = pd.factorize(self.mapped_df['PRODUCT'])
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+        stops = np.append(starts[1:], len(codes))
+        for start, stop in zip(starts, stops):
+            code = codes[start]
+            if code >= 0:  # rows without a product are sorted last and not indexed
+                self.product_index[uniques[code]] = (int(start), int(stop))
+    
+    def offload(self, ticket_store: TicketStore, dataset_key: str):
+        """Move the processed data into the ticket store and release the in-memory frames"""
+        if not ticket_store.contains(dataset_key):
+            ticket_store.put(dataset_key, self.mapped_df, self.products, self.file_report)
+        self.use_store(ticket_store, dataset_key)
+    
+    def process_into_store(self, frames: Iterable[pd.DataFrame], ticket_store: TicketStore, dataset_key: str,
+                           report: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """Process raw frames one at a time, e.g. one per uploaded file, straight into the ticket store.
+        
+        Unlike process_data followed by offload, the whole dataset is never in memory at once:
+        each frame is processed single-pass and appended to the store before the next is read.
+        Returns whether any rows were stored.
+        """
+        self.memory_report = {}
+        volume = {'rows': 0, 'bytes': 0}
+        
+        def processed():
+            for df in frames:
+                frame = self._single_pass(df)
+                volume['rows'] += len(frame)
+                volume['bytes'] += int(frame.memory_usage(deep=True).sum())
+                yield frame
+        
+        with metrics.stage('process'):
+            rows = ticket_store.put_frames(dataset_key, processed(), report)
+        metrics.record_volume('processed', volume['rows'], volume['bytes'])
+        if not rows:
+            return False
+        self.use_store(ticket_store, dataset_key)
+        return True
+    
+    def use_store(self, ticket_store: TicketStore, dataset_key: str):
+        """Answer every query from a dataset already in the ticket store, without loading it"""
+        self.raw_df = pd.DataFrame()
+        self.processed_df = pd.DataFrame()
+        self.mapped_df = pd.DataFrame()
+        self.product_index = {}
+        self._chart_data = None
+        self.ticket_store = ticket_store
+        self.store_key = dataset_key
+        self.products = ticket_store.info(dataset_key)['products']
+    
+    def _from_store(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Give store results the dtypes of in-memory data; DuckDB returns text as object columns with None"""
+        return self.data_processor.compact_dtypes(df)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get data statistics"""
+        if self.ticket_store is not None:
+            info = self.ticket_store.info(self.store_key)
+            return {'total_tickets': info['rows'], 'unique_products': len(info['products']),
+                    'products': list(info['products'])}
         if self.mapped_df.empty:
             return {'total_tickets': 0, 'unique_products': 0, 'products': []}
         
         return {
             'total_tickets': len(self.mapped_df),
-            'unique_products': self.mapped_df['PRODUCT'].nunique(),
-            'products': list(self.mapped_df['PRODUCT'].unique())
+            'unique_products': len(self.product_index),
+            'products': list(self.products)
         }
     
     def get_product_data(self, product: str) -> pd.DataFrame:
         """Get data for a specific product"""
+        if self.ticket_store is not None:
+            return self._from_store(self.ticket_store.product_data(self.store_key, product))
         if self.mapped_df.empty:
             return pd.DataFrame()
         
-        return self.mapped_df[self.mapped_df['PRODUCT'] == product]
+        start, stop = self.product_index.get(product, (0, 0))
+        return self.mapped_df.iloc[start:stop]
+    
+    def set_timeline_options(self, num_sections: int, strategy: str):
+        """Configure how product tickets are bucketed into timeline sections"""
+        self.timeline_analyzer = TimelineAnalyzer(num_sections, strategy)
     
     def get_timeline_sections(self, product: str) -> Dict[str, pd.DataFrame]:
         """Get timeline sections for a product"""
@@ -50,5 +244,153 @@ class DataController:
         return self.timeline_analyzer.create_timeline_sections(product_df)
     
     def get_mapped_data(self) -> pd.DataFrame:
-        """Get the processed and mapped data"""
-        return self.mapped_df
\ No newline at end of file
+        """Get the processed and mapped data; with a ticket store this loads every row"""
+        if self.ticket_store is not None:
+            return self._from_store(self.ticket_store.frame(self.store_key))
+        return self.mapped_df
+    
+    def get_columns(self) -> List[str]:
+        """Columns of the processed and mapped data"""
+        if self.ticket_store is not None:
+            return self.ticket_store.info(self.store_key)['columns']
+        return list(self.mapped_df.columns)
+    
+    def get_chart_data(self, chart_aggregator: ChartAggregator):
+        """Volume counts and resolution box statistics for the charts, aggregated where the data lives.
+        
+        The result is kept until other data is loaded, so reruns on the same data do not aggregate again.
+        """
+        key = (chart_aggregator.max_points, chart_aggregator.max_outliers, chart_aggregator.use_sketch,
+               chart_aggregator.relative_accuracy)
+        if self._chart_data is None or self._chart_data[0] != key:
+            self._chart_data = (key, self._aggregate_charts(chart_aggregator))
+        return self._chart_data[1]
+    
+    def _aggregate_charts(self, chart_aggregator: ChartAggregator):
+        if self.ticket_store is None:
+            return chart_aggregator.volume_counts(self.mapped_df), chart_aggregator.resolution_summary(self.mapped_df)
+        
+        span_days = self.ticket_store.span_days(self.store_key)
+        volume_counts = None
+        if span_days is not None:
+            rule, label = chart_aggregator.granularity_for_span(span_days)
+            volume_counts = (self.ticket_store.volume_counts(self.store_key, rule), label)
+        return volume_counts, self.ticket_store.resolution_summary(self.store_key, chart_aggregator.max_outliers)
+    
+    def get_date_range(self) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Earliest and latest ACCEPTANCE_TIME, or None when there are no valid dates"""
+        if self.ticket_store is not None:
+            return self.ticket_store.date_range(self.store_key)
+        if self.mapped_df.empty or 'ACCEPTANCE_TIME' not in self.mapped_df.columns:
+            return None
+        times = self.mapped_df['ACCEPTANCE_TIME']
+        if times.isna().all():
+            return None
+        return times.min(), times.max()
+    
+    def query_positions(self, products: Optional[List[Any]] = None, start: Optional[pd.Timestamp] = None,
+                        end: Optional[pd.Timestamp] = None, order_search: str = "",
+                        sort_by: Optional[str] = None, ascending: bool = True) -> np.ndarray:
+        """Row positions in mapped_df matching the filters, in the requested order.
+        
+        Product filters use the product index, so only the selected products' rows are scanned.
+        The result of the last query on an identified dataset is kept, so paging through it does
+        not filter or sort again.
+        """
+        key = (self.dataset_id, self.category_mapper.fingerprint, len(self.mapped_df),
+               tuple(products) if products is not None else None, start, end, order_search, sort_by, ascending)
+        if self.dataset_id is not None and self.query_cache.get('key') == key:
+            return self.query_cache['positions']
+        
+        if products is None:
+            positions = np.arange(len(self.mapped_df))
+        else:
+            ranges = [self.product_index[product] for product in products if product in self.product_index]
+            positions = np.concatenate([np.arange(first, last) for first, last in ranges] or [np.array([], dtype=int)])
+        
+        if (start is not None or end is not None) and 'ACCEPTANCE_TIME' in self.mapped_df.columns:
+            times = self.mapped_df['ACCEPTANCE_TIME'].to_numpy()[positions]
+            mask = np.ones(len(positions), dtype=bool)
+            if start is not None:
+                mask &= times >= np.datetime64(start)
+            if end is not None:
+                mask &= times <= np.datetime64(end)
+            positions = positions[mask]
+        
+        if order_search and 'ORDER_NUMBER' in self.mapped_df.columns:
+            order_numbers = self.mapped_df['ORDER_NUMBER'].take(positions).astype(str)
+            positions = positions[order_numbers.str.contains(order_search, case=False, regex=False).to_numpy()]
+        
+        if sort_by is not None and sort_by in self.mapped_df.columns:
+            values = self.mapped_df[sort_by].take(positions).reset_index(drop=True)
+            order = values.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+            positions = positions[order]
+        
+        if self.dataset_id is not None:
+            self.query_cache.update(key=key, positions=positions)
+        return positions
+    
+    def count_rows(self, **filters) -> int:
+        """Number of rows matching the filters"""
+        if self.ticket_store is not None:
+            return self.ticket_store.count(self.store_key, **filters)
+        if self.mapped_df.empty:
+            return 0
+        return len(self.query_positions(**filters))
+    
+    def query_rows(self, page: int = 0, page_size: int = 100, **filters) -> Tuple[pd.DataFrame, int]:
+        """One page of the filtered and sorted raw data, plus the total number of matching rows"""
+        if self.ticket_store is not None:
+            page_df, total = self.ticket_store.query(self.store_key, page, page_size, **filters)
+            return self._from_store(page_df), total
+        if self.mapped_df.empty:
+            return pd.DataFrame(), 0
+        
+        positions = self.query_positions(**filters)
+        page_positions = positions[page * page_size:(page + 1) * page_size]
+        return self.mapped_df.take(page_positions), len(positions)
+    
+    def export_rows(self, file_format: str = "csv", chunk_size: int = 100_000, directory: Optional[str] = None,
+                    **filters) -> str:
+        """Write the filtered rows to a temporary CSV or Parquet file chunk by chunk and return its path.
+        
+        Only one chunk is materialized at a time, so exporting does not copy the whole result.
+        The file is created in directory, or the system temp directory.
+        """
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(suffix=f".{file_format}", dir=directory)
+        os.close(fd)
+        if self.ticket_store is not None:
+            try:
+                self.ticket_store.export(self.store_key, path, file_format, **filters)
+            except Exception:
+                os.remove(path)
+                raise
+            return path
+        
+        positions = self.query_positions(**filters)
+        chunks = (self.mapped_df.take(positions[first:first + chunk_size])
+                  for first in range(0, max(len(positions), 1), chunk_size))
+        
+        if file_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            writer = None
+            try:
+                for chunk in chunks:
+                    table = pa.Table.from_pandas(chunk, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+            finally:
+                if writer is not None:
+                    writer.close()
+        elif file_format == "csv":
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                for number, chunk in enumerate(chunks):
+                    chunk.to_csv(f, header=number == 0, index=False)
+        else:
+            os.remove(path)
+            raise ValueError(f"Unsupported export format '{file_format}'")
+        return path
\ No newline at end of file
@@ -1,10 +1,38 @@
-from models.data_loader import DataLoader
+from models.data_loader import DataLoader, PIPELINE_COLUMNS, PIPELINE_DTYPES, _pyarrow_available
+from services.metrics import metrics
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+def parse_path(path: str, spill: bool = False) -> Tuple[Union[pd.DataFrame, str], float]:
+    """Parse one extracted file and time it; runs in a worker process.
+    
+    With spill, the frame is written next to the file as Arrow IPC and that path is returned,
+    so the parent reads it from disk instead of unpickling the frame from the worker's pipe.
+    """
+    started = time.perf_counter()
+    df = DataLoader(usecols=PIPELINE_COLUMNS, dtype=PIPELINE_DTYPES).load_from_path(path)
+    if not any(col in df.columns for col in PIPELINE_COLUMNS):
+        raise ValueError("No ticket columns found; expected a header with e.g. SERVICE_CATEGORY")
+    seconds = time.perf_counter() - started
+    if spill:
+        df.to_feather(f"{path}.arrow", compression="uncompressed")
+        return f"{path}.arrow", seconds
+    return df, seconds
 
 class FileController:
     """Responsible only for file operations"""
     
-    def __init__(self):
-        self.data_loader = DataLoader()
+    def __init__(self, max_workers: Optional[int] = None):
+        self.data_loader = DataLoader(usecols=PIPELINE_COLUMNS, dtype=PIPELINE_DTYPES)
+        self.max_workers = max_workers or os.cpu_count() or 1
     
     def read_file(self, file) -> str:
         """Read file content"""
@@ -15,4 +43,151 @@ class FileController:
         try:
             return self.data_loader.load_from_text(text_content)
         except Exception as e:
-            raise e
\ No newline at end of file
+            raise e
+    
+    def fingerprint(self, file, block_size: int = 1024 * 1024) -> str:
+        """Hash the uploaded bytes without holding a second copy in memory"""
+        digest = hashlib.sha256()
+        file.seek(0)
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+        file.seek(0)
+        return digest.hexdigest()
+    
+    def upload_key(self, files: List) -> Tuple[str, ...]:
+        """Identity of uploads without reading them: Streamlit's id per upload, or the content hash of other files"""
+        return tuple(sorted(getattr(file, 'file_id', None) or self.fingerprint(file) for file in files))
+    
+    def fingerprint_files(self, files: List) -> str:
+        """Combined hash of several uploads, independent of their order; one file keeps its own hash"""
+        digests = sorted(self.fingerprint(file) for file in files)
+        if len(digests) == 1:
+            return digests[0]
+        return hashlib.sha256("\n".join(digests).encode()).hexdigest()
+    
+    def load_uploaded_file(self, file) -> pd.DataFrame:
+        """Parse an uploaded file directly from its binary buffer"""
+        try:
+            file.seek(0, os.SEEK_END)
+            size = file.tell()
+            file.seek(0)
+            with metrics.stage('parse'):
+                df = self.data_loader.load_from_buffer(file)
+            metrics.record_volume('parsed', len(df), size)
+            return df
+        except Exception as e:
+            raise e
+    
+    def load_uploaded_files(self, files: List) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+        """Parse uploads and archive members in parallel and concatenate them into one frame.
+        
+        Returns the frame and one report entry per file with its status ('parsed' or
+        'failed'), rows, bytes, parse seconds and error. Files that fail are left out of
+        the frame; the frame is empty only if every file failed.
+        """
+        with tempfile.TemporaryDirectory(prefix="ticket-upload-") as directory:
+            with metrics.stage('parse'):
+                entries, report = self._extract(files, directory)
+                frames = list(self._parse(entries, report))
+                df = self.data_loader.concat_frames([frame for frame in frames if frame is not None])
+        metrics.record_volume('parsed', len(df), sum(entry['bytes'] for entry in report))
+        return df, report
+    
+    def iter_uploaded_files(self, files: List, report: List[Dict[str, Any]]) -> Iterator[pd.DataFrame]:
+        """Parse uploads and archive members like load_uploaded_files, yielding one file's frame at a time.
+        
+        Pool workers spill their frames to disk and a single worker parses lazily, so a consumer
+        that handles each frame before asking for the next holds one file in memory rather than
+        the whole upload. Report entries are appended to report as files are parsed.
+        """
+        rows = 0
+        with tempfile.TemporaryDirectory(prefix="ticket-upload-") as directory:
+            entries, extract_report = self._extract(files, directory)
+            report.extend(extract_report)
+            for frame in self._parse(entries, report):
+                if frame is not None:
+                    rows += len(frame)
+                    yield frame
+        metrics.record_volume('parsed', rows, sum(entry['bytes'] for entry in report))
+    
+    def _extract(self, files: List, directory: str) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
+        """Write every upload and archive member to a temporary file, as (name, path) pairs"""
+        entries, report = [], []
+        for file in files:
+            name = getattr(file, 'name', 'upload')
+            try:
+                file.seek(0)
+                if name.lower().endswith('.zip'):
+                    with zipfile.ZipFile(file) as archive:
+                        for member in archive.infolist():
+                            member_name = member.filename
+                            if member.is_dir() or member_name.startswith('__MACOSX/') or \
+                               os.path.basename(member_name).startswith('.'):
+                                continue
+                            with archive.open(member) as source:
+                                entries.append(self._spool(f"{name}/{member_name}", source, directory))
+                else:
+                    entries.append(self._spool(name, file, directory))
+            except Exception as e:
+                report.append(self._report_entry(name, error=f"Could not read file: {e}"))
+        return entries, report
+    
+    def _spool(self, name: str, source, directory: str) -> Tuple[str, str]:
+        """Copy a stream to disk, decompressing gzip files on the way"""
+        path = os.path.join(directory, f"{len(os.listdir(directory))}.txt")
+        if name.lower().endswith('.gz'):
+            source = gzip.GzipFile(fileobj=source)
+        with open(path, 'wb') as target:
+            shutil.copyfileobj(source, target, 1024 * 1024)
+        return name[:-3] if name.lower().endswith('.gz') else name, path
+    
+    def _parse(self, entries: List[Tuple[str, str]], report: List[Dict[str, Any]]) -> Iterator[Optional[pd.DataFrame]]:
+        """Parse the extracted files, across a process pool when there are several, yielding one frame per file.
+        
+        Files that fail yield None. Without a pool each file is parsed when its frame is requested.
+        """
+        workers = min(self.max_workers, len(entries))
+        if workers <= 1:
+            results = (self._parse_serial(path) for _, path in entries)
+        else:
+            results = [None] * len(entries)
+            spill = _pyarrow_available()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(parse_path, path, spill): i for i, (_, path) in enumerate(entries)}
+                for future in as_completed(futures):
+                    try:
+                        results[futures[future]] = future.result()
+                    except Exception as e:
+                        results[futures[future]] = e
+        
+        for (name, path), result in zip(entries, results):
+            size = os.path.getsize(path)
+            if isinstance(result, Exception):
+                report.append(self._report_entry(name, size=size, error=str(result)))
+                yield None
+            else:
+                df, seconds = result
+                if isinstance(df, str):
+                    # Arrow IPC records string columns without their storage; parsed ones are Arrow-backed
+                    with pd.option_context("mode.string_storage", "pyarrow"):
+                        spilled, df = df, pd.read_feather(df)
+                    os.remove(spilled)
+                report.append(self._report_entry(name, rows=len(df), size=size, seconds=seconds))
+                yield df
+    
+    def _parse_serial(self, path: str) -> Any:
+        try:
+            return parse_path(path)
+        except Exception as e:
+            return e
+    
+    def _report_entry(self, name: str, rows: int = 0, size: int = 0, seconds: float = 0.0,
+                      error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'file': name,
+            'status': 'failed' if error is not None else 'parsed',
+            'rows': rows,
+            'bytes': size,
+            'seconds': seconds,
+            'error': error
+        }
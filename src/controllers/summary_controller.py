@@ -1,48 +1,420 @@
 from services.ai_service import AIService
 from services.prompt_generator import PromptGenerator
+from services.summary_cache import SummaryCache
+from services.history_store import HistoryStore
+from services.metrics import metrics
+from services.summary_worker import SummaryWorker
+from services.model_warmer import ModelWarmer
+from services.model_router import ModelRouter
+from services.deadline import Deadline, DeadlineExceeded
 from controllers.data_controller import DataController
-from typing import Optional
+from helpers.run_concurrently import run_concurrently
+import pandas as pd
+import threading
+import time
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Starts the text of sections answered with a statistical summary instead of the LLM
+DEGRADED_MARKER = "> **Degraded:**"
 
 class SummaryController:
     """Coordinates summary generation"""
     
-    def __init__(self, data_controller: DataController, model_name: str = "gemma2:2b-instruct-q5_0"):
+    def __init__(self, data_controller: DataController, model_name: str = "gemma2:2b-instruct-q5_0",
+                 cache: Optional[SummaryCache] = None, prompt_token_budget: Optional[int] = None,
+                 max_concurrency: int = 4, map_reduce_chunk_size: Optional[int] = None,
+                 map_reduce_fan_out: int = 8, section_store: Optional[HistoryStore] = None,
+                 worker: Optional[SummaryWorker] = None, session_id: Hashable = "default",
+                 warmer: Optional[ModelWarmer] = None, base_url: Optional[str] = None,
+                 latency_budget: Optional[float] = None, call_timeout: Optional[float] = None,
+                 fallback_model: Optional[str] = None, router: Optional[ModelRouter] = None):
         self.data_controller = data_controller
-        self.ai_service = AIService(model_name)
-        self.prompt_generator = PromptGenerator()
+        self.max_concurrency = max_concurrency
+        # With a warmer, model switches start loading the new model right away and calls keep it loaded
+        self.warmer = warmer
+        service_options = {
+            'cache': cache, 'max_concurrency': max_concurrency, 'worker': worker, 'session_id': session_id,
+            'keep_alive': warmer.keep_alive if warmer is not None else None, 'base_url': base_url
+        }
+        self.ai_service = AIService(model_name, **service_options)
+        # Seconds a whole summary run may take, and each LLM call within it; None means no limit.
+        # Prompts not expected to fit go to the fallback model, or get a statistical summary
+        self.latency_budget = latency_budget or None
+        self.call_timeout = call_timeout or None
+        self.fallback_service = AIService(fallback_model, **service_options) \
+            if fallback_model and fallback_model != model_name else None
+        self.router = router if router is not None else ModelRouter()
+        self.prompt_generator = PromptGenerator(token_budget=prompt_token_budget)
+        # Sections with more tickets than map_reduce_chunk_size are summarized chunk by chunk,
+        # then at most map_reduce_fan_out partial summaries are combined per reduce call
+        self.map_reduce_chunk_size = map_reduce_chunk_size
+        self.map_reduce_fan_out = max(2, map_reduce_fan_out)
+        # In append mode, sections whose tickets did not change reuse their stored summary
+        self.section_store = section_store
+        self.failures: List[Tuple[str, str, str]] = []
+        # Sections of the last run answered with a statistical summary, as (product, section, reason)
+        self.degraded: List[Tuple[str, str, str]] = []
+        self._degraded_lock = threading.Lock()
     
     def set_model(self, model_name: str):
         """Set the AI model to use"""
         self.ai_service.set_model(model_name)
+        if self.warmer is not None:
+            self.warmer.warm(model_name)
     
-    def generate_product_summary(self, product: str) -> Optional[str]:
-        """Generate summary for a product with enhanced section formatting"""
+    def plan_product_summary(self, product: str) -> Optional[List[Tuple[str, pd.DataFrame, Optional[str]]]]:
+        """Build the (section name, section data, prompt) list for a product.
+        
+        The prompt is None for sections that will be summarized with map-reduce.
+        """
         product_df = self.data_controller.get_product_data(product)
         if len(product_df) == 0:
             return None
         
         sections = self.data_controller.get_timeline_sections(product)
-        if not sections:
-            return "No timeline sections could be created for this product."
+        return [
+            (section_name, section_data,
+             None if self._needs_map_reduce(section_data)
+             else self.prompt_generator.create_section_prompt(section_name, product, section_data))
+            for section_name, section_data in sections.items()
+        ]
+    
+    def _needs_map_reduce(self, section_data: pd.DataFrame) -> bool:
+        return bool(self.map_reduce_chunk_size) and len(section_data) > self.map_reduce_chunk_size
+    
+    def summarize_section(self, section_name: str, product: str, section_data: pd.DataFrame,
+                          prompt: Optional[str], run_deadline: Optional[Deadline] = None) -> str:
+        """Summarize one planned section, through map-reduce when it was planned without a prompt.
+        
+        Within a latency budget the section may be answered by the fallback model or, when no
+        model is expected to finish in time or the call's deadline passes, degraded to a
+        statistical summary. Both are marked in the returned text.
+        """
+        started = time.perf_counter()
+        fingerprint = self._section_fingerprint(section_data)
+        if fingerprint is not None:
+            stored = self.section_store.get_section_summary(product, section_name, fingerprint)
+            metrics.record_cache('section', stored is not None)
+            if stored is not None:
+                return stored
+        return self._generate_section(section_name, product, section_data, prompt, run_deadline,
+                                      fingerprint, started)
+    
+    def _generate_section(self, section_name: str, product: str, section_data: pd.DataFrame,
+                          prompt: Optional[str], run_deadline: Optional[Deadline],
+                          fingerprint: Optional[str], started: float) -> str:
+        """Generate a section the section store had no summary for"""
+        deadline = self._call_deadline(run_deadline)
+        if deadline is None:
+            if prompt is None:
+                prompt = self._map_reduce_prompt(section_name, product, section_data)
+            summary, store = self.ai_service.generate_summary(prompt), True
+        else:
+            summary, store = self._summarize_within(section_name, product, section_data, prompt, deadline)
+        metrics.record_section(product, section_name, time.perf_counter() - started, len(section_data))
+        
+        if fingerprint is not None and store:
+            self.section_store.put_section_summary(product, section_name, fingerprint, summary)
+        return summary
+    
+    def _call_deadline(self, run_deadline: Optional[Deadline]) -> Optional[Deadline]:
+        """Deadline of one section's calls: the run's deadline, shortened to call_timeout"""
+        if run_deadline is None:
+            return Deadline.after(self.call_timeout)
+        return run_deadline.within(self.call_timeout)
+    
+    def _summarize_within(self, section_name: str, product: str, section_data: pd.DataFrame,
+                          prompt: Optional[str], deadline: Deadline) -> Tuple[str, bool]:
+        """Summarize with the first model expected to finish by the deadline, degrading if none does.
+        
+        Returns the summary and whether it may be stored for reuse; fallback and degraded
+        summaries are not, so a later run with time to spare redoes them.
+        """
+        map_prompts = self._map_prompts(section_name, product, section_data) if prompt is None else None
+        service = self._route(map_prompts or [prompt], deadline)
+        if service is None:
+            return self._degrade(product, section_name, section_data,
+                                 "no model was expected to finish within the latency budget"), False
+        
+        started = time.perf_counter()
+        try:
+            if map_prompts is not None:
+                prompt = self._map_reduce_prompt(section_name, product, section_data, service, deadline, map_prompts)
+            summary = service.generate_summary(prompt, deadline)
+        except Exception as e:
+            # Partial summaries report a passed deadline as an ordinary failure
+            if not isinstance(e, DeadlineExceeded) and not deadline.expired():
+                raise
+            if map_prompts is None:
+                self.router.observe(service.model_name, prompt, time.perf_counter() - started, timed_out=True)
+            return self._degrade(product, section_name, section_data,
+                                 f"{service.model_name} did not finish within the deadline"), False
+        if map_prompts is None:
+            self.router.observe(service.model_name, prompt, time.perf_counter() - started)
         
+        if service is not self.ai_service:
+            return f"*Summarized with the faster model {service.model_name} to fit the latency budget.*\n\n{summary}", False
+        return summary, True
+    
+    def _route(self, prompts: List[str], deadline: Deadline) -> Optional[AIService]:
+        """Service of the first model expected to answer the prompts in time; cached prompts always fit"""
+        if len(prompts) == 1 and self.ai_service.is_cached(prompts[0]):
+            return self.ai_service
+        services = [self.ai_service] + ([self.fallback_service] if self.fallback_service is not None else [])
+        model = self.router.route([service.model_name for service in services], prompts,
+                                  deadline.remaining(), self.max_concurrency)
+        return next((service for service in services if service.model_name == model), None)
+    
+    def _degrade(self, product: str, section_name: str, section_data: pd.DataFrame, reason: str) -> str:
+        """Statistical summary of a section, marked as degraded and recorded in ``degraded``"""
+        with self._degraded_lock:
+            self.degraded.append((product, section_name, reason))
+        return f"{DEGRADED_MARKER} {reason}, so this is a statistical summary.\n\n" + \
+            self.format_statistical_summary(section_data)
+    
+    def format_statistical_summary(self, section_data: pd.DataFrame) -> str:
+        """Ticket count, period, most common issues and resolution times of a section, without the LLM"""
+        lines = [f"- **Tickets:** {len(section_data):,}"]
+        if 'ACCEPTANCE_TIME' in section_data.columns and section_data['ACCEPTANCE_TIME'].notna().any():
+            start, end = section_data['ACCEPTANCE_TIME'].min(), section_data['ACCEPTANCE_TIME'].max()
+            lines.append(f"- **Period:** {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}")
+        if 'ORDER_DESCRIPTION_1' in section_data.columns:
+            top = section_data['ORDER_DESCRIPTION_1'].dropna().astype(str).value_counts().head(3)
+            if len(top):
+                lines.append("- **Most common issues:** " +
+                             ", ".join(f"{issue} ({count:,})" for issue, count in top.items()))
+        if 'RESOLUTION_HOURS' in section_data.columns and section_data['RESOLUTION_HOURS'].notna().any():
+            hours = section_data['RESOLUTION_HOURS']
+            lines.append(f"- **Resolution time:** median {hours.median():.1f} h, 90th percentile {hours.quantile(0.9):.1f} h")
+        if 'COMPLETION_RESULT_KB' in section_data.columns:
+            top = section_data['COMPLETION_RESULT_KB'].dropna().astype(str).value_counts().head(1)
+            if len(top):
+                lines.append(f"- **Most common resolution:** {top.index[0]} ({top.iloc[0]:,})")
+        return "\n".join(lines)
+    
+    def _start_run(self) -> Optional[Deadline]:
+        """Start a summary run: forget the last run's degraded sections and return its deadline"""
+        with self._degraded_lock:
+            self.degraded = []
+        return Deadline.after(self.latency_budget)
+    
+    def settings_key(self) -> Tuple:
+        """Everything besides the data that changes a generated summary"""
+        analyzer = self.data_controller.timeline_analyzer
+        fallback_model = self.fallback_service.model_name if self.fallback_service is not None else None
+        return (self.ai_service.model_name, self.ai_service.temperature, self.prompt_generator.token_budget,
+                self.map_reduce_chunk_size, self.map_reduce_fan_out, analyzer.num_sections, analyzer.strategy,
+                self.latency_budget, self.call_timeout, fallback_model)
+    
+    def _section_fingerprint(self, section_data: pd.DataFrame) -> Optional[str]:
+        """Fingerprint of a section's tickets and every setting that changes its summary"""
+        if self.section_store is None:
+            return None
+        return self.section_store.fingerprint_section(
+            section_data, self.ai_service.model_name, self.ai_service.temperature,
+            self.prompt_generator.token_budget, self.map_reduce_chunk_size, self.map_reduce_fan_out
+        )
+    
+    def _map_prompts(self, section_name: str, product: str, section_data: pd.DataFrame) -> List[str]:
+        """Prompts for the context-sized chunks of a map-reduce section.
+        
+        Chunks are fixed-size slices in time order, so when new tickets only touch one chunk the
+        other partial summaries are served from the summary cache.
+        """
+        size = self.map_reduce_chunk_size
+        chunks = [section_data.iloc[start:start + size] for start in range(0, len(section_data), size)]
+        return [
+            self.prompt_generator.create_section_prompt(
+                f"{section_name} (part {number})", product, chunk)
+            for number, chunk in enumerate(chunks, start=1)
+        ]
+    
+    def _map_reduce_prompt(self, section_name: str, product: str, section_data: pd.DataFrame,
+                           service: Optional[AIService] = None, deadline: Optional[Deadline] = None,
+                           map_prompts: Optional[List[str]] = None) -> str:
+        """Summarize context-sized chunks in parallel and return the prompt for the final reduce"""
+        service = service or self.ai_service
+        if map_prompts is None:
+            map_prompts = self._map_prompts(section_name, product, section_data)
+        partials = self._generate_all(map_prompts, service, deadline)
+        
+        # Reduce level by level until one call can combine what is left
+        fan_out = self.map_reduce_fan_out
+        while len(partials) > fan_out:
+            partials = self._generate_all([
+                self.prompt_generator.create_reduce_prompt(section_name, product, partials[start:start + fan_out])
+                for start in range(0, len(partials), fan_out)
+            ], service, deadline)
+        return self.prompt_generator.create_reduce_prompt(section_name, product, partials)
+    
+    def _generate_all(self, prompts: List[str], service: Optional[AIService] = None,
+                      deadline: Optional[Deadline] = None) -> List[str]:
+        """Generate summaries concurrently, failing if any of them failed"""
+        results = (service or self.ai_service).generate_summaries(prompts, self.max_concurrency, deadline)
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            raise RuntimeError(f"{len(errors)} of {len(prompts)} partial summaries failed: {errors[0]}")
+        return [summary for summary, _ in results]
+    
+    def format_section_details(self, section_data: pd.DataFrame) -> str:
+        """Format the ticket table and divider that follow a section's AI summary"""
+        details = ""
+        
+        # Add ticket examples with clear formatting
+        available_cols = ['ORDER_NUMBER', 'ACCEPTANCE_TIME', 'ORDER_DESCRIPTION_1']
+        display_cols = [col for col in available_cols if col in section_data.columns]
+        
+        if display_cols:
+            details += "**Relevant Tickets:**\n"
+            details += section_data[display_cols].to_markdown(index=False)
+        details += "\n\n---\n\n"  # Visual divider between sections
+        return details
+    
+    def format_product_summary(self, product: str, plan: List[Tuple[str, pd.DataFrame, str]],
+                               ai_summaries: List[str]) -> str:
+        """Assemble the markdown summary from the planned sections and their AI summaries"""
         summary = f"## {product} Summary\n\n"
-        for section_name, section_data in sections.items():
+        degraded = sum(1 for ai_summary in ai_summaries if ai_summary and ai_summary.startswith(DEGRADED_MARKER))
+        if degraded:
+            summary += f"*{degraded} of {len(plan)} sections were degraded to statistical summaries " \
+                       f"to stay within the latency budget.*\n\n"
+        for (section_name, section_data, _), ai_summary in zip(plan, ai_summaries):
             summary += f"### {section_name}\n"
             
-            # Create LLM prompt and generate summary
-            prompt = self.prompt_generator.create_section_prompt(section_name, product, section_data)
-            ai_summary = self.ai_service.generate_summary(prompt)
-            
             # Add clear section divider and summary
             summary += f"{ai_summary}\n\n"
+            summary += self.format_section_details(section_data)
+        
+        return summary
+    
+    def generate_product_summary(self, product: str) -> Optional[str]:
+        """Generate summary for a product with enhanced section formatting"""
+        plan = self.plan_product_summary(product)
+        if plan is None:
+            return None
+        if not plan:
+            return "No timeline sections could be created for this product."
+        
+        run_deadline = self._start_run()
+        ai_summaries = [
+            self.summarize_section(section_name, product, section_data, prompt, run_deadline)
+            for section_name, section_data, prompt in plan
+        ]
+        return self.format_product_summary(product, plan, ai_summaries)
+    
+    def summarize_products(self, products: List[str], max_concurrency: Optional[int] = None,
+                           progress: Optional[Callable[[int, int], None]] = None
+                           ) -> Dict[str, Optional[List[Tuple[str, pd.DataFrame, Optional[str], Optional[str]]]]]:
+        """Summarize all sections of several products concurrently.
+        
+        Each product maps to None when it has no tickets, otherwise to its sections as
+        (section name, section data, summary, error). Failed sections keep a None summary
+        and are recorded in ``failures`` as (product, section, error); sections degraded to
+        a statistical summary are recorded in ``degraded``. ``progress`` is called
+        with (finished sections, total sections) from the worker threads.
+        """
+        plans = {product: self.plan_product_summary(product) for product in products}
+        tasks = [
+            (section_name, product, section_data, prompt)
+            for product, plan in plans.items() if plan
+            for section_name, section_data, prompt in plan
+        ]
+        
+        finished = [0]
+        lock = threading.Lock()
+        run_deadline = self._start_run()
+        
+        def summarize_task(task):
+            try:
+                return self.summarize_section(*task, run_deadline)
+            finally:
+                if progress is not None:
+                    with lock:
+                        finished[0] += 1
+                        progress(finished[0], len(tasks))
+        
+        if progress is not None:
+            progress(0, len(tasks))
+        results = iter(run_concurrently(summarize_task, tasks, max_concurrency or self.max_concurrency))
+        
+        self.failures = []
+        sections = {}
+        for product, plan in plans.items():
+            if plan is None:
+                sections[product] = None
+                continue
             
-            # Add ticket examples with clear formatting
-            available_cols = ['ORDER_NUMBER', 'ACCEPTANCE_TIME', 'ORDER_DESCRIPTION_1']
-            display_cols = [col for col in available_cols if col in section_data.columns]
+            sections[product] = []
+            for section_name, section_data, _ in plan:
+                ai_summary, error = next(results)
+                if error is not None:
+                    self.failures.append((product, section_name, error))
+                sections[product].append((section_name, section_data, ai_summary, error))
+        
+        return sections
+    
+    def generate_product_summaries(self, products: List[str], max_concurrency: Optional[int] = None,
+                                   progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Optional[str]]:
+        """Generate summaries for several products, summarizing all sections concurrently.
+        
+        Sections whose LLM call failed are rendered with the error instead of a summary
+        and recorded in ``failures`` as (product, section, error).
+        """
+        summaries = {}
+        for product, sections in self.summarize_products(products, max_concurrency, progress).items():
+            if sections is None:
+                summaries[product] = None
+                continue
+            if not sections:
+                summaries[product] = "No timeline sections could be created for this product."
+                continue
             
-            if display_cols:
-                summary += "**Relevant Tickets:**\n"
-                summary += section_data[display_cols].to_markdown(index=False)
-            summary += "\n\n---\n\n"  # Visual divider between sections
+            plan = [(section_name, section_data, None) for section_name, section_data, _, _ in sections]
+            ai_summaries = [
+                ai_summary if error is None else f"*Summary unavailable: {error}*"
+                for _, _, ai_summary, error in sections
+            ]
+            summaries[product] = self.format_product_summary(product, plan, ai_summaries)
         
-        return summary
\ No newline at end of file
+        return summaries
+
+    
+    def stream_product_summary(self, product: str) -> Optional[Iterator[Tuple[str, str]]]:
+        """Stream a product summary as ("section", name), ("token", text) and ("details", markdown) events.
+        
+        Joining the tokens of each section gives the same text generate_product_summary embeds.
+        """
+        plan = self.plan_product_summary(product)
+        if plan is None:
+            return None
+        return self._stream_sections(product, plan)
+    
+    def _stream_sections(self, product: str, plan: List[Tuple[str, pd.DataFrame, Optional[str]]]) -> Iterator[Tuple[str, str]]:
+        run_deadline = self._start_run()
+        for section_name, section_data, prompt in plan:
+            yield "section", section_name
+            started = time.perf_counter()
+            fingerprint = self._section_fingerprint(section_data)
+            stored = None
+            if fingerprint is not None:
+                stored = self.section_store.get_section_summary(product, section_name, fingerprint)
+                metrics.record_cache('section', stored is not None)
+            
+            if stored is not None:
+                yield "token", stored
+            elif self._call_deadline(run_deadline) is not None:
+                # Within a latency budget the section is generated whole, so it can be routed or degraded
+                yield "token", self._generate_section(section_name, product, section_data, prompt, run_deadline,
+                                                      fingerprint, started)
+            else:
+                if prompt is None:
+                    # Partial summaries are generated up front; only the final reduce is streamed
+                    prompt = self._map_reduce_prompt(section_name, product, section_data)
+                tokens = []
+                for token in self.ai_service.stream_summary(prompt):
+                    tokens.append(token)
+                    yield "token", token
+                metrics.record_section(product, section_name, time.perf_counter() - started, len(section_data))
+                if fingerprint is not None:
+                    self.section_store.put_section_summary(product, section_name, fingerprint, "".join(tokens))
+            yield "details", self.format_section_details(section_data)
\ No newline at end of file
@@ -0,0 +1,90 @@
+from controllers.summary_controller import SummaryController
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Dict, Hashable, List, Optional
+
+class SummaryJob:
+    """State of one product summary generated in the background"""
+
+    def __init__(self, product: str):
+        self.product = product
+        self.status = "pending"  # pending, running, done or error
+        self.finished_sections = 0
+        self.total_sections = 0
+        self.summary: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update_progress(self, finished_sections: int, total_sections: int):
+        with self._lock:
+            self.status = "running"
+            self.finished_sections = finished_sections
+            self.total_sections = total_sections
+
+    def finish(self, summary: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            self.summary = summary
+            self.error = error
+            self.status = "error" if error is not None else "done"
+            self.finished_at = time.time()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of sections summarized so far"""
+        return self.finished_sections / self.total_sections if self.total_sections else 0.0
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("pending", "running")
+
+class SummaryJobController:
+    """Runs product summaries on a background thread pool and keeps their results.
+
+    Jobs are keyed by dataset, generation settings and product, so reruns with the
+    same inputs re-render a finished job instead of generating it again.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summary-job")
+        self._jobs: Dict[Hashable, SummaryJob] = {}
+        self._lock = threading.Lock()
+
+    def job_key(self, summary_controller: SummaryController, product: str) -> Hashable:
+        return (summary_controller.data_controller.dataset_id, summary_controller.settings_key(), product)
+
+    def get_job(self, summary_controller: SummaryController, product: str) -> Optional[SummaryJob]:
+        """The job for this product under the current dataset and settings, if one was requested"""
+        return self._jobs.get(self.job_key(summary_controller, product))
+
+    def submit(self, summary_controller: SummaryController, product: str) -> SummaryJob:
+        """Start generating a product summary unless an equivalent job is running or done"""
+        key = self.job_key(summary_controller, product)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != "error":
+                return job
+            job = SummaryJob(product)
+            self._jobs[key] = job
+        self._executor.submit(self._run, summary_controller, job)
+        return job
+
+    def submit_all(self, summary_controller: SummaryController, products: List[str]) -> List[SummaryJob]:
+        return [self.submit(summary_controller, product) for product in products]
+
+    def has_active_jobs(self) -> bool:
+        return any(job.active for job in list(self._jobs.values()))
+
+    def clear(self):
+        """Forget finished jobs; running jobs keep going but are no longer shown"""
+        with self._lock:
+            self._jobs = {key: job for key, job in self._jobs.items() if job.active}
+
+    def _run(self, summary_controller: SummaryController, job: SummaryJob):
+        try:
+            summaries = summary_controller.generate_product_summaries([job.product], progress=job.update_progress)
+            job.finish(summary=summaries[job.product])
+        except Exception as e:
+            job.finish(error=str(e))
@@ -1,12 +1,30 @@
 from views.visualization_view import VisualizationView
+from models.chart_aggregator import ChartAggregator
+from controllers.data_controller import DataController
 import pandas as pd
 
 class VisualizationController:
     """Coordinates visualization generation"""
     
-    def __init__(self):
+    def __init__(self, chart_aggregator: ChartAggregator = None):
         self.visualization_view = VisualizationView()
+        self.chart_aggregator = chart_aggregator or ChartAggregator()
     
     def render_visualizations(self, df: pd.DataFrame):
-        """Render all visualizations for the data"""
-        self.visualization_view.render_visualizations(df)
+        """Render all visualizations for the data, aggregated so figure size does not grow with ticket count"""
+        if df.empty:
+            self.visualization_view.show_no_data()
+            return
+        
+        self.visualization_view.render_visualizations(
+            self.chart_aggregator.volume_counts(df),
+            self.chart_aggregator.resolution_summary(df)
+        )
+    
+    def render_dataset_visualizations(self, data_controller: DataController):
+        """Render all visualizations from aggregates computed by the data controller, e.g. as store queries"""
+        if not data_controller.get_stats()['total_tickets']:
+            self.visualization_view.show_no_data()
+            return
+        
+        self.visualization_view.render_visualizations(*data_controller.get_chart_data(self.chart_aggregator))
@@ -1,10 +1,23 @@
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from controllers.file_controller import FileController
 from controllers.data_controller import DataController
 from controllers.visualization_controller import VisualizationController
+from controllers.summary_job_controller import SummaryJobController
 from views.page_view import PageView
 from views.sidebar_view import SidebarView
 from views.data_overview_view import DataOverviewView
 from views.summary_view import SummaryView
+from services.summary_cache import SummaryCache
+from services.dataset_cache import DatasetCache
+from services.history_store import HistoryStore
+from services.summary_worker import SummaryWorker
+from services.model_warmer import ModelWarmer
+from services.model_router import ModelRouter
+from services.ticket_store import TicketStore
+
+# Concurrent LLM calls across all sessions; match Ollama's OLLAMA_NUM_PARALLEL
+SHARED_LLM_CONCURRENCY = 4
 
 def initialize_components():
     """Initialize all controllers and views"""
@@ -17,10 +30,57 @@ def initialize_components():
     
     # Initialize controllers
     file_controller = FileController()
-    data_controller = DataController()
+    # The controller is rebuilt on every rerun; its query cache lives in the session so paging reuses it
+    data_controller = DataController(single_pass=True, query_cache=st.session_state.setdefault('raw_query_cache', {}))
     visualization_controller = VisualizationController()
     
     return (
         page_view, sidebar_view, data_overview_view, summary_view,
         file_controller, data_controller, visualization_controller
-    )
\ No newline at end of file
+    )
+
+@st.cache_resource
+def get_summary_cache() -> SummaryCache:
+    """Shared summary cache that survives Streamlit reruns"""
+    return SummaryCache()
+
+@st.cache_resource
+def get_dataset_cache() -> DatasetCache:
+    """Shared processed-dataset cache that survives Streamlit reruns"""
+    return DatasetCache()
+
+@st.cache_resource
+def get_history_store() -> HistoryStore:
+    """Shared ticket history used by append mode"""
+    return HistoryStore()
+
+@st.cache_resource
+def get_summary_worker() -> SummaryWorker:
+    """LLM worker shared by every session, so one Ollama instance serves all of them fairly"""
+    return SummaryWorker(max_concurrency=SHARED_LLM_CONCURRENCY)
+
+@st.cache_resource
+def get_model_warmer() -> ModelWarmer:
+    """Background model loading shared by every session"""
+    return ModelWarmer()
+
+@st.cache_resource
+def get_model_router() -> ModelRouter:
+    """Latency estimates per model, learned from the calls of every session"""
+    return ModelRouter()
+
+@st.cache_resource
+def get_ticket_store() -> TicketStore:
+    """DuckDB store of processed datasets shared by every session, for out-of-core analysis"""
+    return TicketStore()
+
+def get_session_id() -> str:
+    """Id of the current browser session, used for fair queueing in the shared worker"""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "default"
+
+def get_summary_jobs() -> SummaryJobController:
+    """Background summary jobs of the current browser session"""
+    if 'summary_jobs' not in st.session_state:
+        st.session_state['summary_jobs'] = SummaryJobController()
+    return st.session_state['summary_jobs']
\ No newline at end of file
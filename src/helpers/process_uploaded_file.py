@@ -1,18 +1,109 @@
+import streamlit as st
 from controllers.file_controller import FileController
 from controllers.data_controller import DataController
 from views.page_view import PageView
+from services.dataset_cache import DatasetCache
+from services.history_store import HistoryStore
+from services.metrics import metrics
+from services.ticket_store import TicketStore
+from typing import List, Optional, Tuple
 
+def load_uploaded_dataset(file_controller: FileController, data_controller: DataController, page_view: PageView,
+                          uploaded_files: List, settings: Tuple = (), **stores) -> Optional[DataController]:
+    """Data controller holding the processed uploads, or None if they could not be processed.
+    
+    The loaded controller is kept in the session, keyed on the uploads' ids, the category rules
+    and the settings that change the processed data. Reruns for the same uploads, e.g. the polls
+    while background summaries generate, reuse it without hashing, reading or indexing again.
+    """
+    key = (file_controller.upload_key(uploaded_files), data_controller.category_mapper.fingerprint, settings)
+    loaded = st.session_state.get('loaded_dataset')
+    # The shared ticket store may have evicted the dataset for another session's upload
+    if loaded is not None and loaded[0] == key and (loaded[1].ticket_store is None
+                                                    or loaded[1].ticket_store.contains(loaded[1].store_key)):
+        if loaded[1].file_report:
+            page_view.show_file_report(loaded[1].file_report)
+        return loaded[1]
+    
+    st.session_state.pop('loaded_dataset', None)
+    if not process_uploaded_file(file_controller, data_controller, page_view, uploaded_files, **stores):
+        return None
+    st.session_state['loaded_dataset'] = (key, data_controller)
+    return data_controller
 
-def process_uploaded_file(file_controller: FileController, data_controller: DataController, page_view: PageView, uploaded_file):
-    """Process the uploaded file and return success status"""
+def process_uploaded_file(file_controller: FileController, data_controller: DataController, page_view: PageView, uploaded_files: List,
+                          dataset_cache: Optional[DatasetCache] = None, history_store: Optional[HistoryStore] = None,
+                          ticket_store: Optional[TicketStore] = None):
+    """Process the uploaded files and archives as one dataset and return success status"""
     try:
-        text_content = file_controller.read_file(uploaded_file)
-        df = file_controller.process_file_content(text_content)
-        success = data_controller.process_data(df)
+        # Reruns and re-uploads of identical bytes load the processed dataset from cache
+        fingerprint = file_controller.fingerprint_files(uploaded_files)
+        # Editing the category rules changes the processed data, so they are part of the cache key
+        dataset_key = f"{fingerprint}-{data_controller.category_mapper.fingerprint[:16]}"
+        
+        # Out of core, a dataset already in the ticket store is queried there and never loaded
+        if ticket_store is not None and history_store is None and ticket_store.contains(dataset_key):
+            data_controller.use_store(ticket_store, dataset_key)
+            data_controller.dataset_id = fingerprint
+            report = ticket_store.info(dataset_key)['report']
+            if report is None and dataset_cache is not None:
+                report = dataset_cache.get_report(dataset_key)
+            data_controller.file_report = report or []
+            if report:
+                page_view.show_file_report(report)
+            return True
+        
+        # Otherwise out of core, uploads are processed file by file straight into the ticket store,
+        # so the whole dataset is never held in memory; the store doubles as the dataset cache
+        if ticket_store is not None and history_store is None:
+            report = []
+            success = data_controller.process_into_store(file_controller.iter_uploaded_files(uploaded_files, report),
+                                                         ticket_store, dataset_key, report)
+            data_controller.file_report = report
+            if report:
+                page_view.show_file_report(report)
+            if not success:
+                page_view.show_error("Could not process the file. Please check the format.")
+                return False
+            data_controller.dataset_id = fingerprint
+            return True
+        
+        cached_df = dataset_cache.get(dataset_key) if dataset_cache is not None else None
+        if dataset_cache is not None:
+            metrics.record_cache('dataset', cached_df is not None)
+        
+        if cached_df is not None:
+            data_controller.load_mapped_data(cached_df)
+            report = dataset_cache.get_report(dataset_key)
+            success = True
+        else:
+            df, report = file_controller.load_uploaded_files(uploaded_files)
+            success = not df.empty and data_controller.process_data(df)
+            if success and dataset_cache is not None and not data_controller.mapped_df.empty:
+                dataset_cache.put(dataset_key, data_controller.mapped_df, report)
+        data_controller.file_report = report or []
+        if report:
+            page_view.show_file_report(report)
+        
+        # In append mode the upload is merged once into the stored history, deduplicated on ORDER_NUMBER
+        if success and history_store is not None:
+            if history_store.contains(fingerprint):
+                data_controller.load_mapped_data(history_store.load())
+            else:
+                data_controller.merge_history(history_store.load())
+                history_store.save(data_controller.mapped_df, fingerprint)
+        
+        # Background summary jobs are keyed on this, so they survive reruns for the same data
+        data_controller.dataset_id = fingerprint
+        if history_store is not None:
+            data_controller.dataset_id = f"history:{fingerprint}:{len(data_controller.mapped_df)}"
         
         if not success or data_controller.mapped_df.empty:
             page_view.show_error("Could not process the file. Please check the format.")
             return False
+        
+        if ticket_store is not None:
+            data_controller.offload(ticket_store, dataset_key if history_store is None else data_controller.dataset_id)
         return True
     except Exception as e:
         page_view.show_error(f"Error processing file: {str(e)}")
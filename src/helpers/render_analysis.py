@@ -1,11 +1,15 @@
 from controllers.data_controller import DataController
 from controllers.summary_controller import SummaryController
 from controllers.visualization_controller import VisualizationController
+from controllers.summary_job_controller import SummaryJobController
 from views.data_overview_view import DataOverviewView
 from views.summary_view import SummaryView
+from typing import Optional
 
 def render_analysis(data_controller: DataController, summary_controller: SummaryController, 
-                    data_overview_view: DataOverviewView, summary_view: SummaryView, visualization_controller: VisualizationController):
+                    data_overview_view: DataOverviewView, summary_view: SummaryView, visualization_controller: VisualizationController,
+                    max_concurrency: int = 1, stream: bool = False,
+                    summary_jobs: Optional[SummaryJobController] = None):
     """Render all analysis components"""
     
     # Get statistics
@@ -17,15 +21,44 @@ def render_analysis(data_controller: DataController, summary_controller: Summary
     # Render summary tabs
     tab1, tab2 = summary_view.create_tabs()
     
-    # Render product summaries in tab1
-    summary_view.render_product_summaries(
-        tab1, 
-        stats['products'], 
-        lambda product: summary_controller.generate_product_summary(product)
-    )
+    # Generate on request in the background, stream sections as they are written,
+    # generate all sections concurrently up front, or generate each product in turn
+    if summary_jobs is not None:
+        summary_view.render_on_demand_summaries(
+            tab1,
+            stats['products'],
+            lambda product: summary_jobs.get_job(summary_controller, product),
+            lambda product: summary_jobs.submit(summary_controller, product),
+            lambda: summary_jobs.submit_all(summary_controller, stats['products'])
+        )
+    elif stream:
+        summary_view.render_streaming_product_summaries(
+            tab1,
+            stats['products'],
+            summary_controller.stream_product_summary
+        )
+    elif max_concurrency > 1:
+        with summary_view.show_generating_message(len(stats['products'])):
+            summaries = summary_controller.generate_product_summaries(stats['products'], max_concurrency)
+        summary_view.render_product_summaries(tab1, stats['products'], summaries.get)
+    else:
+        # Render product summaries in tab1
+        summary_view.render_product_summaries(
+            tab1, 
+            stats['products'], 
+            lambda product: summary_controller.generate_product_summary(product)
+        )
     
-    # Render raw data in tab2
-    summary_view.render_raw_data(tab2, data_controller.get_mapped_data())
+    # Render raw data in tab2, one page at a time
+    summary_view.render_raw_data(
+        tab2,
+        stats['products'],
+        data_controller.get_columns(),
+        data_controller.get_date_range(),
+        data_controller.count_rows,
+        data_controller.query_rows,
+        data_controller.export_rows
+    )
     
     # Render visualizations
-    visualization_controller.render_visualizations(data_controller.get_mapped_data())
\ No newline at end of file
+    visualization_controller.render_dataset_visualizations(data_controller)
\ No newline at end of file
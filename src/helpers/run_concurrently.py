@@ -0,0 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+def run_concurrently(func: Callable, items: List, max_concurrency: int) -> List[Tuple[Any, Optional[str]]]:
+    """Apply func to every item on a bounded thread pool, keeping input order.
+    
+    Each result is a (value, error) pair so a failed call does not lose the rest of the batch.
+    """
+    def call(item) -> Tuple[Any, Optional[str]]:
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, str(e)
+    
+    if max_concurrency <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
+    
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+        return list(executor.map(call, items))
@@ -1,7 +1,25 @@
-from helpers.initialize_components import initialize_components
-from helpers.process_uploaded_file import process_uploaded_file
+import os
+import time
+import streamlit as st
+from helpers.initialize_components import (initialize_components, get_summary_cache, get_dataset_cache,
+                                          get_history_store, get_summary_jobs, get_summary_worker, get_session_id,
+                                          get_model_warmer, get_ticket_store, get_model_router)
+from helpers.process_uploaded_file import load_uploaded_dataset
 from helpers.render_analysis import render_analysis
 from controllers.summary_controller import SummaryController
+from services.metrics import metrics
+from services.ticket_store import duckdb_available
+
+# Prometheus text file and JSON log for external dashboards, written at most every METRICS_EXPORT_INTERVAL seconds
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "metrics")
+METRICS_EXPORT_INTERVAL = 30.0
+
+# Seconds between reruns while background summaries are generating
+POLL_INTERVAL = 1.0
+
+def clear_loaded_dataset():
+    """Forget the session's loaded data, so the next run processes the uploads again"""
+    st.session_state.pop('loaded_dataset', None)
 
 def main():
     
@@ -13,21 +31,82 @@ def main():
     page_view.setup_page()
     
     # Get model selection from sidebar
-    model_name = sidebar_view.render_settings(["gemma2:2b-instruct-q5_0", "mistral", "gemma"])
+    model_options = ["gemma2:2b-instruct-q5_0", "mistral", "gemma"]
+    model_name = sidebar_view.render_settings(model_options)
+    
+    # Load the selected model in the background while the user picks a file
+    warmer = get_model_warmer() if sidebar_view.render_warm_up_settings() else None
+    if warmer is not None:
+        warmer.warm(model_name)
+        sidebar_view.render_model_status(model_name, warmer.status(model_name))
+    
+    # Summary cache controls
+    summary_cache = get_summary_cache()
+    use_cache = sidebar_view.render_cache_settings(summary_cache.stats(), summary_cache.clear)
+    generation_settings = sidebar_view.render_generation_settings()
+    latency_settings = sidebar_view.render_latency_settings(model_options, model_name)
+    history_store = get_history_store()
     
-    # Initialize summary controller with selected model
-    summary_controller = SummaryController(data_controller, model_name)
+    def clear_history():
+        history_store.clear()
+        clear_loaded_dataset()
+    
+    def clear_ticket_store():
+        get_ticket_store().clear()
+        clear_loaded_dataset()
+    
+    append_mode = sidebar_view.render_history_settings(clear_history)
+    out_of_core = sidebar_view.render_storage_settings(duckdb_available(), clear_ticket_store)
+    
+    summary_jobs = get_summary_jobs() if generation_settings['on_demand'] else None
     
     # File upload
-    uploaded_file = page_view.file_uploader()
+    uploaded_files = page_view.file_uploader()
     
-    if uploaded_file:
+    if uploaded_files:
         with page_view.show_processing_message():
-            if process_uploaded_file(file_controller, data_controller, page_view, uploaded_file):
+            # Reruns for the same uploads, e.g. while polling background summaries, reuse the loaded data
+            data_controller = load_uploaded_dataset(file_controller, data_controller, page_view, uploaded_files,
+                                                    settings=(append_mode, out_of_core),
+                                                    dataset_cache=get_dataset_cache(),
+                                                    history_store=history_store if append_mode else None,
+                                                    ticket_store=get_ticket_store() if out_of_core else None)
+            if data_controller is not None:
+                data_controller.set_timeline_options(generation_settings['num_sections'],
+                                                     generation_settings['timeline_strategy'])
+                
+                # Initialize summary controller with selected model
+                summary_controller = SummaryController(data_controller, model_name,
+                                                       cache=summary_cache if use_cache else None,
+                                                       prompt_token_budget=generation_settings['prompt_token_budget'],
+                                                       max_concurrency=generation_settings['max_concurrency'],
+                                                       map_reduce_chunk_size=generation_settings['map_reduce_chunk_size'],
+                                                       map_reduce_fan_out=generation_settings['map_reduce_fan_out'],
+                                                       section_store=history_store if append_mode else None,
+                                                       worker=get_summary_worker(),
+                                                       session_id=get_session_id(),
+                                                       warmer=warmer,
+                                                       latency_budget=latency_settings['latency_budget'],
+                                                       call_timeout=latency_settings['call_timeout'],
+                                                       fallback_model=latency_settings['fallback_model'],
+                                                       router=get_model_router())
+                
                 render_analysis(data_controller, summary_controller, 
-                               data_overview_view, summary_view, visualization_controller)
+                               data_overview_view, summary_view, visualization_controller,
+                               max_concurrency=generation_settings['max_concurrency'],
+                               stream=generation_settings['stream'],
+                               summary_jobs=summary_jobs)
     else:
-        page_view.show_info("Please upload a text file to begin analysis")
+        page_view.show_info("Please upload one or more text files or archives to begin analysis")
+    
+    # Rendered last so it includes this run's timings
+    sidebar_view.render_performance_panel(metrics.snapshot(), metrics.reset)
+    metrics.export(METRICS_DIR, min_interval=METRICS_EXPORT_INTERVAL)
+    
+    # Re-render finished summaries and progress until all background jobs are done
+    if summary_jobs is not None and summary_jobs.has_active_jobs():
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,32 +1,71 @@
+import os
+import numpy as np
 import pandas as pd
-from typing import Dict
+from models.category_rules import CategoryRuleEngine, NO_MATCH
+from typing import Dict, Optional
+
+# Rules used when no other rules are given
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  "config", "category_rules.json")
+
+# Mapping the app shipped with, used when the rules file is missing
+DEFAULT_CATEGORY_MAP = {
+    'KAI': 'Broadband',
+    'NET': 'Broadband',
+    'KAV': 'Voice',
+    'KAD': 'TV',
+    'GIGA': 'GIGA',
+    'VOD': 'VOD',
+    'HDW': 'Hardware'
+}
 
 class CategoryMapper:
-    """Responsible only for mapping service categories to products"""
-    
-    def __init__(self, category_map: Dict[str, str] = None):
-        self.category_map = category_map or {
-            'KAI': 'Broadband',
-            'NET': 'Broadband',
-            'KAV': 'Voice',
-            'KAD': 'TV',
-            'GIGA': 'GIGA',
-            'VOD': 'VOD',
-            'HDW': 'Hardware'
-        }
-    
-    def map_categories(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Map service categories to products"""
-        try:
-            mapped_df = df.copy()
-            
-            # Only attempt mapping if the column exists
-            if 'SERVICE_CATEGORY' in mapped_df.columns:
-                mapped_df['PRODUCT'] = mapped_df['SERVICE_CATEGORY'].map(self.category_map)
+    """Responsible only for mapping ticket categories to products"""
+
+    def __init__(self, category_map: Dict[str, str] = None, rules: Optional[CategoryRuleEngine] = None,
+                 rules_path: Optional[str] = None):
+        if rules is None:
+            if category_map is not None:
+                rules = CategoryRuleEngine.from_mapping(category_map)
+            elif rules_path is not None or os.path.exists(DEFAULT_RULES_PATH):
+                rules = CategoryRuleEngine.from_file(rules_path or DEFAULT_RULES_PATH)
             else:
+                rules = CategoryRuleEngine.from_mapping(DEFAULT_CATEGORY_MAP)
+        self.rules = rules
+
+    @property
+    def fingerprint(self) -> str:
+        """Changes whenever the rules or the unmapped policy change"""
+        return self.rules.fingerprint
+
+    def map_categories(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        """Map categories to products, handling unmapped rows per the rules' policy"""
+        try:
+            # Only attempt mapping if a rule column exists
+            if not any(col in df.columns for col in self.rules.columns):
+                mapped_df = df.copy() if copy else df
                 # Create a default product column if SERVICE_CATEGORY doesn't exist
                 mapped_df['PRODUCT'] = 'Unknown'
-                
+                return mapped_df
+
+            indices = self.rules.rule_indices(df)
+            unmapped = indices == NO_MATCH
+            if self.rules.unmapped == 'error' and unmapped.any():
+                column = next(col for col in self.rules.columns if col in df.columns)
+                examples = df.loc[unmapped, column].drop_duplicates().head(5).tolist()
+                raise ValueError(f"{int(unmapped.sum())} rows match no category rule, e.g. {examples}")
+            if self.rules.unmapped == 'drop' and unmapped.any():
+                keep = np.flatnonzero(~unmapped)
+                # take() returns a standalone frame, so it needs no extra copy and later writes do not warn
+                mapped_df = df.take(keep)
+                indices = indices[keep]
+            else:
+                mapped_df = df.copy() if copy else df
+
+            products = self.rules.products_for(indices)
+            if self.rules.unmapped == 'label':
+                products[indices == NO_MATCH] = self.rules.unmapped_label
+            mapped_df['PRODUCT'] = products
             return mapped_df
         except Exception as e:
-            raise ValueError(f"Error mapping categories: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Error mapping categories: {str(e)}")
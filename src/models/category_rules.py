@@ -0,0 +1,162 @@
+import hashlib
+import json
+import re
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+
+MATCH_TYPES = ['exact', 'prefix', 'regex', 'keyword']
+
+# What happens to rows no rule matches: removed, labelled with unmapped_label, or rejected
+UNMAPPED_POLICIES = ['drop', 'label', 'error']
+
+# Rule index of rows no rule matched; larger than any real index so np.minimum keeps real matches
+NO_MATCH = np.iinfo(np.int32).max
+
+class CategoryRuleEngine:
+    """Matches column values against prioritized product rules; the first matching rule wins.
+
+    Each rule names a product, the column it reads and one of MATCH_TYPES. Exact values are
+    looked up in a dict and the other rules of a column are compiled into one regex, so every
+    distinct value is matched once however many rules there are. Results are memoized per
+    distinct value, which makes mapping a large frame cost about as much as its distinct values.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], unmapped: str = 'drop', unmapped_label: str = 'Other',
+                 memo_size: int = 1_000_000):
+        if unmapped not in UNMAPPED_POLICIES:
+            raise ValueError(f"Unknown unmapped policy '{unmapped}', expected one of {UNMAPPED_POLICIES}")
+        self.rules = [self._validate(index, rule) for index, rule in enumerate(rules)]
+        self.unmapped = unmapped
+        self.unmapped_label = unmapped_label
+        self.memo_size = memo_size
+        self.products = np.array([rule['product'] for rule in self.rules] + [None], dtype=object)
+        self.columns = list(dict.fromkeys(rule['column'] for rule in self.rules))
+        self.fingerprint = hashlib.sha256(json.dumps(
+            [self.rules, unmapped, unmapped_label], sort_keys=True).encode()).hexdigest()
+
+        self._exact: Dict[str, Dict[str, int]] = {}
+        self._patterns: Dict[str, Optional[re.Pattern]] = {}
+        for column in self.columns:
+            exact: Dict[str, int] = {}
+            alternatives = []
+            for index, rule in enumerate(self.rules):
+                if rule['column'] != column:
+                    continue
+                if rule['match'] == 'exact' and rule['case_sensitive']:
+                    for value in rule['values']:
+                        exact.setdefault(value, index)
+                else:
+                    alternatives.append(self._alternative(index, rule))
+            self._exact[column] = exact
+            # Each alternative is a zero-width lookahead tried at position 0 in rule order, so the
+            # regex engine reports the first matching rule rather than the leftmost match
+            self._patterns[column] = re.compile("|".join(alternatives), re.DOTALL) if alternatives else None
+        # Column -> distinct value -> index of the first matching rule
+        self._memo: Dict[str, Dict[Any, int]] = {column: {} for column in self.columns}
+
+    @classmethod
+    def from_file(cls, path: str, **options) -> 'CategoryRuleEngine':
+        """Load rules from a JSON file with 'rules' and optional 'unmapped' and 'unmapped_label' keys"""
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        settings = {key: config[key] for key in ('unmapped', 'unmapped_label') if key in config}
+        settings.update(options)
+        return cls(config['rules'], **settings)
+
+    @classmethod
+    def from_mapping(cls, category_map: Dict[str, str], column: str = 'SERVICE_CATEGORY',
+                     **options) -> 'CategoryRuleEngine':
+        """One exact rule per value of a {value: product} mapping"""
+        rules = [{'product': product, 'column': column, 'match': 'exact', 'values': [value]}
+                 for value, product in category_map.items()]
+        return cls(rules, **options)
+
+    @staticmethod
+    def _validate(index: int, rule: Dict[str, Any]) -> Dict[str, Any]:
+        if 'product' not in rule or 'values' not in rule:
+            raise ValueError(f"Category rule {index} needs 'product' and 'values'")
+        match = rule.get('match', 'exact')
+        if match not in MATCH_TYPES:
+            raise ValueError(f"Category rule {index} has unknown match type '{match}', expected one of {MATCH_TYPES}")
+        values = rule['values']
+        values = [values] if isinstance(values, str) else list(values)
+        if match == 'regex':
+            for value in values:
+                try:
+                    compiled = re.compile(value)
+                except re.error as e:
+                    raise ValueError(f"Category rule {index} has an invalid regex '{value}': {e}")
+                # Rules share one compiled alternation, where a rule's groups would be renumbered
+                # and its backreferences would point at another rule's groups
+                if compiled.groups:
+                    raise ValueError(f"Category rule {index} regex '{value}' has capturing groups or "
+                                     "backreferences; use non-capturing groups (?:...) instead")
+        return {
+            'product': rule['product'],
+            'column': rule.get('column', 'SERVICE_CATEGORY'),
+            'match': match,
+            'values': [str(value) for value in values],
+            # Keywords match whole words in any case unless told otherwise
+            'case_sensitive': bool(rule.get('case_sensitive', match != 'keyword'))
+        }
+
+    @staticmethod
+    def _alternative(index: int, rule: Dict[str, Any]) -> str:
+        match, values = rule['match'], rule['values']
+        if match == 'regex':
+            body = ".*?(?:" + "|".join(f"(?:{value})" for value in values) + ")"
+        else:
+            escaped = "|".join(re.escape(value) for value in values)
+            body = {
+                'exact': f"(?:{escaped})\\Z",
+                'prefix': f"(?:{escaped})",
+                'keyword': f".*?\\b(?:{escaped})\\b",
+            }[match]
+        if not rule['case_sensitive']:
+            body = f"(?i:{body})"
+        # The empty named group closes last, so match.lastgroup identifies the rule
+        return f"(?={body})(?P<rule_{index}>)"
+
+    def rule_indices(self, df: pd.DataFrame) -> np.ndarray:
+        """Index of the first rule matching each row, NO_MATCH where none does"""
+        indices = np.full(len(df), NO_MATCH, dtype=np.int32)
+        for column in self.columns:
+            if column in df.columns:
+                np.minimum(indices, self._column_indices(column, df[column]), out=indices)
+        return indices
+
+    def _column_indices(self, column: str, values: pd.Series) -> np.ndarray:
+        # Categoricals already hold their distinct values; other columns are factorized once
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        else:
+            codes, uniques = pd.factorize(values)
+        unique_indices = np.append(self.match_values(column, uniques), NO_MATCH).astype(np.int32)
+        # Missing values have code -1 and pick the trailing NO_MATCH
+        return unique_indices[codes]
+
+    def match_values(self, column: str, values: Iterable[Any]) -> np.ndarray:
+        """Index of the first rule matching each of the given distinct values of a column"""
+        memo = self._memo.setdefault(column, {})
+        exact = self._exact.get(column, {})
+        pattern = self._patterns.get(column)
+        result = []
+        for value in values:
+            index = memo.get(value)
+            if index is None:
+                text = str(value)
+                index = exact.get(text, NO_MATCH)
+                if pattern is not None:
+                    found = pattern.match(text)
+                    if found is not None:
+                        index = min(index, int(found.lastgroup[len("rule_"):]))
+                if len(memo) >= self.memo_size:
+                    memo.clear()
+                memo[value] = index
+            result.append(index)
+        return np.array(result, dtype=np.int64)
+
+    def products_for(self, indices: np.ndarray) -> np.ndarray:
+        """Product names for rule indices, None where no rule matched"""
+        return self.products[np.minimum(indices, len(self.rules))]
@@ -0,0 +1,194 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Tuple
+
+# Columns of the per-product box plot summary
+BOX_COLUMNS = ['PRODUCT', 'COUNT', 'LOWER_FENCE', 'Q1', 'MEDIAN', 'Q3', 'UPPER_FENCE']
+
+# Resampling rules tried in order until the line chart fits in max_points periods
+GRANULARITIES = [('D', 'Daily'), ('W', 'Weekly'), ('M', 'Monthly')]
+
+class QuantileSketch:
+    """Mergeable quantile sketch with bounded relative error, using log-spaced buckets.
+
+    Sketches built from separate chunks (e.g. several uploads) can be merged by adding
+    bucket counts, and any quantile is then within relative_accuracy of the exact value.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 1e-3):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self._gamma)
+        # Bucket index -> count, for positive values and for magnitudes of negative values
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_values(cls, values: Iterable[float], **options) -> 'QuantileSketch':
+        sketch = cls(**options)
+        sketch.add(values)
+        return sketch
+
+    def add(self, values: Iterable[float]):
+        """Add values to the sketch; NaN values are ignored"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        small = np.abs(values) < self.min_value
+        self.zero_count += int(small.sum())
+        self._add_buckets(self.positive, values[~small & (values > 0)])
+        self._add_buckets(self.negative, -values[~small & (values < 0)])
+
+    def _add_buckets(self, store: Dict[int, int], magnitudes: np.ndarray):
+        if len(magnitudes) == 0:
+            return
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Add another sketch's counts into this one; both must use the same accuracy"""
+        if other.relative_accuracy != self.relative_accuracy or other.min_value != self.min_value:
+            raise ValueError("Cannot merge quantile sketches with different accuracy settings")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile, clamped to the exact minimum and maximum"""
+        if self.count == 0:
+            return np.nan
+
+        rank = q * (self.count - 1)
+        # Walk buckets from the most negative value upwards
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return float(np.clip(-self._bucket_value(key), self.min, self.max))
+        seen += self.zero_count
+        if seen > rank:
+            return float(np.clip(0.0, self.min, self.max))
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return float(np.clip(self._bucket_value(key), self.min, self.max))
+        return self.max
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self._gamma ** key / (self._gamma + 1)
+
+class ChartAggregator:
+    """Responsible only for reducing ticket data to chart-sized aggregates"""
+
+    def __init__(self, max_points: int = 400, max_outliers: int = 20, use_sketch: bool = False,
+                 relative_accuracy: float = 0.01):
+        self.max_points = max_points
+        self.max_outliers = max_outliers
+        self.use_sketch = use_sketch
+        self.relative_accuracy = relative_accuracy
+
+    def resolution_hours(self, df: pd.DataFrame) -> Optional[pd.Series]:
+        """Resolution hours computed during processing, or derived from the time columns"""
+        if 'RESOLUTION_HOURS' in df.columns:
+            return df['RESOLUTION_HOURS']
+        if all(col in df.columns for col in ['COMPLETION_TIME', 'ACCEPTANCE_TIME']) and \
+           not df['COMPLETION_TIME'].isna().all() and not df['ACCEPTANCE_TIME'].isna().all():
+            return (df['COMPLETION_TIME'] - df['ACCEPTANCE_TIME']).dt.total_seconds() / 3600
+        return None
+
+    def resolution_summary(self, df: pd.DataFrame) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Box plot statistics per product plus a bounded sample of outliers.
+
+        Returns (summary, outliers) with summary in BOX_COLUMNS and outliers as PRODUCT and
+        RESOLUTION_HOURS, keeping the max_outliers most extreme points per product. Whiskers
+        follow Plotly's default: the furthest points within 1.5 IQR of the quartiles.
+        """
+        resolution_hours = self.resolution_hours(df)
+        if resolution_hours is None or 'PRODUCT' not in df.columns:
+            return None
+
+        rows, outliers = [], []
+        for product, hours in resolution_hours.groupby(df['PRODUCT'], sort=False, observed=True):
+            values = hours.to_numpy(dtype=float)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+
+            if self.use_sketch:
+                sketch = QuantileSketch.from_values(values, relative_accuracy=self.relative_accuracy)
+                q1, median, q3 = (sketch.quantile(q) for q in (0.25, 0.5, 0.75))
+            else:
+                q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+            low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            inside = values[(values >= low) & (values <= high)]
+            rows.append((product, len(values), inside.min() if len(inside) else q1, q1, median, q3,
+                         inside.max() if len(inside) else q3))
+
+            outside = values[(values < low) | (values > high)]
+            if len(outside) > self.max_outliers:
+                distance = np.maximum(low - outside, outside - high)
+                outside = outside[np.argpartition(distance, -self.max_outliers)[-self.max_outliers:]]
+            outliers.extend((product, value) for value in outside.tolist())
+
+        return (pd.DataFrame(rows, columns=BOX_COLUMNS),
+                pd.DataFrame(outliers, columns=['PRODUCT', 'RESOLUTION_HOURS']))
+
+    def volume_counts(self, df: pd.DataFrame, granularity: str = 'auto') -> Optional[Tuple[pd.DataFrame, str]]:
+        """Ticket counts per period and product, with the period length chosen from the date span.
+
+        Returns (counts with DATE, PRODUCT and COUNT columns, granularity label).
+        """
+        if 'ACCEPTANCE_TIME' not in df.columns or df['ACCEPTANCE_TIME'].isna().all():
+            return None
+
+        times = df['ACCEPTANCE_TIME']
+        if not pd.api.types.is_datetime64_any_dtype(times):
+            times = pd.to_datetime(times, errors='coerce')
+        days = times.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+
+        rule, label = self._resolve_granularity(days, granularity)
+        if rule == 'W':
+            # Weeks start on Monday; 1970-01-01 was a Thursday
+            periods = days - ((days.view('i8') + 3) % 7).astype('timedelta64[D]')
+        elif rule == 'M':
+            periods = days.astype('datetime64[M]').astype('datetime64[D]')
+        else:
+            periods = days
+
+        counts = df.groupby([pd.Series(periods, index=df.index, name='DATE'), 'PRODUCT'],
+                            observed=True).size().reset_index(name='COUNT')
+        # Plain labels, so Plotly does not group on unobserved categories
+        counts['PRODUCT'] = counts['PRODUCT'].astype(object)
+        return counts, label
+
+    def _resolve_granularity(self, days: np.ndarray, granularity: str) -> Tuple[str, str]:
+        if granularity != 'auto':
+            return granularity, dict(GRANULARITIES)[granularity]
+        valid = days[~np.isnat(days)]
+        return self.granularity_for_span(int((valid.max() - valid.min()).astype(int)) + 1)
+    
+    def granularity_for_span(self, span_days: int, granularity: str = 'auto') -> Tuple[str, str]:
+        """Finest resampling rule and label keeping a span of days under max_points periods"""
+        if granularity != 'auto':
+            return granularity, dict(GRANULARITIES)[granularity]
+        for rule, label in GRANULARITIES:
+            periods = {'D': span_days, 'W': span_days / 7, 'M': span_days / 30.44}[rule]
+            if periods <= self.max_points:
+                return rule, label
+        return GRANULARITIES[-1]
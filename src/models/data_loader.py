@@ -1,21 +1,180 @@
 import pandas as pd
 import io
-from typing import Tuple
+from pandas.api.types import union_categoricals
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+# Columns the analysis pipeline reads; everything else is skipped at parse time
+PIPELINE_COLUMNS = [
+    'ORDER_NUMBER', 'SERVICE_CATEGORY', 'ACCEPTANCE_TIME', 'COMPLETION_TIME',
+    'ORDER_DESCRIPTION_1', 'ORDER_DESCRIPTION_2', 'COMPLETION_RESULT_KB'
+]
+
+PIPELINE_DTYPES = {
+    'ORDER_NUMBER': str,
+    'SERVICE_CATEGORY': 'category',
+    'ORDER_DESCRIPTION_1': str,
+    'ORDER_DESCRIPTION_2': str,
+    'COMPLETION_RESULT_KB': str
+}
+
+# Tried in order on the first bytes when the encoding is 'auto'; latin-1 decodes any byte sequence
+FALLBACK_ENCODINGS = ['utf-8', 'cp1252', 'latin-1']
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
 
 class DataLoader:
     """Responsible only for loading data from text files"""
-    
+
+    def __init__(self, usecols: Optional[List[str]] = None, dtype: Optional[Dict[str, object]] = None,
+                 engine: str = "auto", chunksize: int = 500_000, encoding: str = "auto",
+                 sniff_bytes: int = 64 * 1024):
+        self.usecols = usecols
+        self.dtype = dtype
+        self.engine = engine
+        self.chunksize = chunksize
+        self.encoding = encoding
+        self.sniff_bytes = sniff_bytes
+
     def load_from_text(self, text_content: str) -> pd.DataFrame:
         """Load data from text content"""
         try:
             lines = text_content.splitlines()
             lines = [line.strip() for line in lines if line.strip()]
-            
+
             # Detect delimiter (tab or comma)
             first_line = lines[0]
             delimiter = '\t' if '\t' in first_line else ','
-            
+
             # Create DataFrame
             return pd.read_csv(io.StringIO(text_content), delimiter=delimiter)
         except Exception as e:
             raise ValueError(f"Error converting text file: {str(e)}")
+
+    def load_from_buffer(self, buffer: BinaryIO) -> pd.DataFrame:
+        """Load data from a seekable binary buffer without decoding it into one string"""
+        try:
+            encoding, delimiter, header = self._sniff(buffer.read(self.sniff_bytes))
+            buffer.seek(0)
+            return self._read_decoded(buffer, encoding, delimiter, header, memory_map=False)
+        except Exception as e:
+            raise ValueError(f"Error converting text file: {str(e)}")
+
+    def load_from_path(self, path: str) -> pd.DataFrame:
+        """Load data from a file on disk through a memory-mapped reader"""
+        try:
+            with open(path, 'rb') as f:
+                encoding, delimiter, header = self._sniff(f.read(self.sniff_bytes))
+            return self._read_decoded(path, encoding, delimiter, header, memory_map=True)
+        except Exception as e:
+            raise ValueError(f"Error converting text file: {str(e)}")
+
+    def _sniff(self, head: bytes) -> Tuple[str, str, List[str]]:
+        """Detect encoding, delimiter (tab or comma) and header names from the first bytes"""
+        encoding = self._detect_encoding(head) if self.encoding == "auto" else self.encoding
+        lines = head.decode(encoding, errors='ignore').lstrip('\ufeff').splitlines()
+        first_line = next(line.strip() for line in lines if line.strip())
+        delimiter = '\t' if '\t' in first_line else ','
+        header = [name.strip().strip('"') for name in first_line.split(delimiter)]
+        return encoding, delimiter, header
+
+    def _detect_encoding(self, head: bytes) -> str:
+        """Encoding from a byte order mark, else the first fallback that decodes the sample"""
+        if head.startswith(b'\xef\xbb\xbf'):
+            return 'utf-8-sig'
+        if head.startswith((b'\xff\xfe', b'\xfe\xff')):
+            return 'utf-16'
+        # A full sample may end inside a multi-byte character
+        sample = head if len(head) < self.sniff_bytes else head[:-3]
+        for encoding in FALLBACK_ENCODINGS:
+            try:
+                sample.decode(encoding)
+                return encoding
+            except UnicodeDecodeError:
+                continue
+        return FALLBACK_ENCODINGS[-1]
+
+    def _resolve_engine(self) -> str:
+        if self.engine == "auto":
+            return "pyarrow" if _pyarrow_available() else "c"
+        return self.engine
+
+    def _read_decoded(self, source, encoding: str, delimiter: str, header: List[str],
+                      memory_map: bool) -> pd.DataFrame:
+        """Read with the detected encoding, falling back when bytes past the sniffed sample do not decode.
+        
+        Detection only sees the first sniff_bytes, so e.g. a UTF-8 header followed by cp1252
+        descriptions is read again as cp1252, then latin-1, which decodes any byte sequence.
+        """
+        candidates = [encoding]
+        if self.encoding == "auto":
+            candidates += [fallback for fallback in FALLBACK_ENCODINGS[1:] if fallback != encoding]
+        for candidate in candidates[:-1]:
+            try:
+                return self._read(source, candidate, delimiter, header, memory_map)
+            except UnicodeDecodeError:
+                if hasattr(source, 'seek'):
+                    source.seek(0)
+        return self._read(source, candidates[-1], delimiter, header, memory_map)
+
+    def _read(self, source, encoding: str, delimiter: str, header: List[str], memory_map: bool) -> pd.DataFrame:
+        usecols = None
+        if self.usecols is not None:
+            # Only request columns that exist so dumps with a partial schema still load
+            usecols = [col for col in header if col in self.usecols] or None
+        dtype = None
+        if self.dtype is not None:
+            dtype = {col: col_type for col, col_type in self.dtype.items() if usecols is None or col in usecols}
+
+        options = dict(sep=delimiter, usecols=usecols, dtype=dtype, encoding=encoding)
+
+        if self._resolve_engine() == "pyarrow":
+            try:
+                # With dtype str the Arrow parser turns empty fields into the text 'None'
+                arrow_dtype = {col: "string[pyarrow]" if col_type is str else col_type
+                               for col, col_type in dtype.items()} if dtype is not None else None
+                df = pd.read_csv(source, engine="pyarrow", **dict(options, dtype=arrow_dtype))
+                if not self._has_undecoded_text(df):
+                    return df
+            except Exception:
+                pass
+            # The Arrow parser is stricter about malformed rows and returns text that does not
+            # decode as bytes; retry with the C parser, which raises UnicodeDecodeError for it
+            if hasattr(source, 'seek'):
+                source.seek(0)
+
+        reader = pd.read_csv(source, engine="c", chunksize=self.chunksize, memory_map=memory_map, **options)
+        with reader:
+            return self.concat_frames(list(reader))
+
+    def _has_undecoded_text(self, df: pd.DataFrame) -> bool:
+        """Whether Arrow returned a text column as binary because it did not decode"""
+        for col in df.columns:
+            if df[col].dtype == object:
+                first = df[col].first_valid_index()
+                if first is not None and isinstance(df[col].at[first], bytes):
+                    return True
+        return False
+
+    def concat_frames(self, chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        """Concatenate parsed chunks or files, unifying categories so categorical columns stay categorical.
+
+        Files may have different columns; a column missing from some of them is filled with NaN.
+        """
+        if not chunks:
+            return pd.DataFrame()
+        if len(chunks) == 1:
+            return chunks[0]
+
+        columns = list(dict.fromkeys(col for chunk in chunks for col in chunk.columns))
+        for col in columns:
+            if all(col in chunk.columns and isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks):
+                categories = union_categoricals([chunk[col] for chunk in chunks]).categories
+                for chunk in chunks:
+                    chunk[col] = chunk[col].cat.set_categories(categories)
+
+        return pd.concat(chunks, ignore_index=True)
@@ -1,23 +1,47 @@
+import numpy as np
 import pandas as pd
-from typing import List
+from typing import List, Optional
+
+# Free-text columns that can be stored as compact Arrow-backed strings
+TEXT_COLUMNS = ['ORDER_NUMBER', 'ORDER_DESCRIPTION_1', 'ORDER_DESCRIPTION_2', 'COMPLETION_RESULT_KB']
+
+# Low-cardinality columns stored as categoricals
+CATEGORICAL_COLUMNS = ['SERVICE_CATEGORY', 'PRODUCT']
+
+def _compact_string_dtype() -> str:
+    try:
+        import pyarrow  # noqa: F401
+        return "string[pyarrow]"
+    except ImportError:
+        return "string"
 
 class DataProcessor:
     """Responsible only for processing and cleaning data"""
     
-    def __init__(self, valid_categories: List[str] = None):
-        self.valid_categories = valid_categories or ['HDW', 'NET', 'KAI', 'KAV', 'GIGA', 'VOD', 'KAD']
+    def __init__(self, valid_categories: Optional[List[str]] = None):
+        # Without a list every category is kept and the category rules decide what is unmapped
+        self.valid_categories = valid_categories
     
-    def preprocess(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and filter the data"""
+    def preprocess(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
+        """Clean and filter the data.
+        
+        With copy=False the input frame is modified in place and only the category
+        filter, when it drops rows, allocates a new frame.
+        """
         try:
             if df.empty:
                 return df
-                
-            processed_df = df.copy()
+            
+            processed_df = df.copy() if copy else df
             
             # Filter only relevant categories if the column exists
-            if 'SERVICE_CATEGORY' in processed_df.columns:
-                processed_df = processed_df[processed_df['SERVICE_CATEGORY'].isin(self.valid_categories)]
+            if self.valid_categories is not None and 'SERVICE_CATEGORY' in processed_df.columns:
+                mask = processed_df['SERVICE_CATEGORY'].isin(self.valid_categories)
+                if copy:
+                    processed_df = processed_df[mask]
+                elif not mask.all():
+                    # take() returns a standalone frame, so later column writes do not warn or copy
+                    processed_df = processed_df.take(np.flatnonzero(mask.to_numpy()))
             
             # Convert date columns if they exist
             date_cols = ['ACCEPTANCE_TIME', 'COMPLETION_TIME']
@@ -29,16 +53,32 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error preprocessing data: {str(e)}")
     
-    def calculate_resolution_time(self, df: pd.DataFrame) -> pd.DataFrame:
+    def calculate_resolution_time(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """Calculate resolution time from acceptance to completion"""
         if df.empty:
             return df
-            
-        result_df = df.copy()
+        
+        result_df = df.copy() if copy else df
         
         if all(col in result_df.columns for col in ['COMPLETION_TIME', 'ACCEPTANCE_TIME']) and \
            not result_df['COMPLETION_TIME'].isna().all() and not result_df['ACCEPTANCE_TIME'].isna().all():
-            result_df['RESOLUTION_HOURS'] = (result_df['COMPLETION_TIME'] - 
+            result_df['RESOLUTION_HOURS'] = (result_df['COMPLETION_TIME'] -
                                             result_df['ACCEPTANCE_TIME']).dt.total_seconds() / 3600
         
-        return result_df
\ No newline at end of file
+        return result_df
+    
+    def compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Store category columns as categoricals and text columns as compact strings, in place"""
+        if df.empty:
+            return df
+        
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        
+        string_dtype = _compact_string_dtype()
+        for col in TEXT_COLUMNS:
+            if col in df.columns and df[col].dtype == object:
+                df[col] = df[col].astype(string_dtype)
+        
+        return df
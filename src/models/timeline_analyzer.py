@@ -1,11 +1,31 @@
 # models/timeline_analyzer.py
+import numpy as np
 import pandas as pd
-from datetime import timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
+
+SECTION_NAMES = ['Initial Issues', 'Follow-ups', 'Developments', 'Later Incidents', 'Recent Events']
+
+# 'auto' splits datasets of at most 10 tickets or 7 days evenly by count, and longer ones into equal time periods.
+# 'calendar' uses calendar months, so appending recent tickets leaves older sections unchanged.
+STRATEGIES = ['auto', 'time', 'count', 'quantile', 'calendar']
+
+NS_PER_DAY = 86_400 * 10**9
 
 class TimelineAnalyzer:
     """Responsible only for creating timeline sections from ticket data"""
     
+    def __init__(self, num_sections: int = 5, strategy: str = 'auto'):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown bucketing strategy '{strategy}', expected one of {STRATEGIES}")
+        self.num_sections = max(1, num_sections)
+        self.strategy = strategy
+    
+    def section_names(self) -> List[str]:
+        """Names of the timeline sections, in time order"""
+        if self.num_sections == len(SECTION_NAMES):
+            return list(SECTION_NAMES)
+        return [f"Period {i + 1}" for i in range(self.num_sections)]
+    
     def create_timeline_sections(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
         """Divide tickets into storytelling timeline sections"""
         if len(df) == 0:
@@ -15,80 +35,94 @@ class TimelineAnalyzer:
         if 'ACCEPTANCE_TIME' not in df.columns or df['ACCEPTANCE_TIME'].isna().all():
             return {"All Tickets": df}
         
-        # Convert to datetime if needed
+        # Convert to datetime if needed, on a new frame rather than the caller's slice
         if not pd.api.types.is_datetime64_any_dtype(df['ACCEPTANCE_TIME']):
-            df['ACCEPTANCE_TIME'] = pd.to_datetime(df['ACCEPTANCE_TIME'], errors='coerce')
-        
-        sorted_df = df.sort_values('ACCEPTANCE_TIME')
-        date_range = (sorted_df['ACCEPTANCE_TIME'].max() - sorted_df['ACCEPTANCE_TIME'].min()).days
+            df = df.assign(ACCEPTANCE_TIME=pd.to_datetime(df['ACCEPTANCE_TIME'], errors='coerce'))
         
-        # For small datasets, prioritize showing all sections with at least 1 ticket
-        if len(sorted_df) <= 10:
-            return self._create_adaptive_sections(sorted_df)
-        elif date_range <= 7:
-            return self._create_count_based_sections(sorted_df)
+        # Product slices from DataController are already in time order
+        if df['ACCEPTANCE_TIME'].is_monotonic_increasing:
+            sorted_df = df
         else:
-            return self._create_time_based_sections(sorted_df, date_range)
-    
-    def _create_empty_sections(self) -> Dict[str, pd.DataFrame]:
-        """Return all section headers even when empty"""
+            sorted_df = df.sort_values('ACCEPTANCE_TIME', kind='stable')
+        
         return {
-            'Initial Issues': pd.DataFrame(),
-            'Follow-ups': pd.DataFrame(),
-            'Developments': pd.DataFrame(),
-            'Later Incidents': pd.DataFrame(),
-            'Recent Events': pd.DataFrame()
+            name: sorted_df.iloc[start:stop]
+            for name, start, stop in self.compute_sections(sorted_df['ACCEPTANCE_TIME'])
+            if stop > start
         }
     
-    def _create_adaptive_sections(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
-        """Create sections that adapt to very small datasets"""
-        sections = self._create_empty_sections()
-        ticket_count = len(df)
+    def compute_sections(self, times: pd.Series) -> List[Tuple[str, int, int]]:
+        """Compute the name and (start, stop) row positions of each section from sorted timestamps.
         
-        # Distribute tickets across sections more evenly
-        if ticket_count >= 1:
-            sections['Initial Issues'] = df.iloc[:1]
-        if ticket_count >= 2:
-            sections['Follow-ups'] = df.iloc[1:2]
-        if ticket_count >= 3:
-            sections['Developments'] = df.iloc[2:3]
-        if ticket_count >= 4:
-            sections['Later Incidents'] = df.iloc[3:4]
-        if ticket_count >= 5:
-            sections['Recent Events'] = df.iloc[4:]
-            
-        return {k: v for k, v in sections.items() if len(v) > 0}
-    
-    def _create_count_based_sections(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
-        """Create sections based on ticket count"""
-        sections = self._create_empty_sections()
-        ticket_count = len(df)
+        Missing timestamps must be sorted last. Sections are contiguous, so callers can
+        slice them without copying.
+        """
+        total = len(times)
+        valid = int(times.notna().sum())
+        values = times.iloc[:valid].to_numpy(dtype='datetime64[ns]').view('i8')
+        names = self.section_names()
         
-        sections['Initial Issues'] = df.iloc[:min(2, ticket_count)]
-        if ticket_count > 2:
-            sections['Follow-ups'] = df.iloc[min(2, ticket_count):min(4, ticket_count)]
-        if ticket_count > 4:
-            sections['Developments'] = df.iloc[min(4, ticket_count):min(6, ticket_count)]
-        if ticket_count > 6:
-            sections['Later Incidents'] = df.iloc[min(6, ticket_count):min(8, ticket_count)]
-        if ticket_count > 8:
-            sections['Recent Events'] = df.iloc[min(8, ticket_count):]
-            
-        return {k: v for k, v in sections.items() if len(v) > 0}
-    
-    def _create_time_based_sections(self, df: pd.DataFrame, date_range: int) -> Dict[str, pd.DataFrame]:
-        """Create sections based on time periods"""
-        sections = self._create_empty_sections()
-        time_split = max(1, date_range // 5)  # Ensure at least 1 day per section
-        min_date = df['ACCEPTANCE_TIME'].min()
+        strategy = self._resolve_strategy(values, total)
+        if strategy == 'calendar':
+            names, starts = self._calendar_sections(values)
+            stop = valid
+        elif strategy == 'count':
+            # Tickets without a date stay in the last section, as with positional slicing
+            starts = self._count_starts(total)
+            stop = total
+        else:
+            if strategy == 'time':
+                starts = np.searchsorted(values, self._time_edges(values), side='left')
+            else:
+                # A quantile is a ticket's timestamp; its ties stay in the section that ends with it
+                starts = np.searchsorted(values, self._quantile_edges(values), side='right')
+            starts = np.concatenate(([0], starts))
+            stop = valid
         
-        sections['Initial Issues'] = df[df['ACCEPTANCE_TIME'] < min_date + timedelta(days=time_split)]
-        sections['Follow-ups'] = df[(df['ACCEPTANCE_TIME'] >= min_date + timedelta(days=time_split)) & 
-                                  (df['ACCEPTANCE_TIME'] < min_date + timedelta(days=time_split*2))]
-        sections['Developments'] = df[(df['ACCEPTANCE_TIME'] >= min_date + timedelta(days=time_split*2)) & 
-                                     (df['ACCEPTANCE_TIME'] < min_date + timedelta(days=time_split*3))]
-        sections['Later Incidents'] = df[(df['ACCEPTANCE_TIME'] >= min_date + timedelta(days=time_split*3)) & 
-                                        (df['ACCEPTANCE_TIME'] < min_date + timedelta(days=time_split*4))]
-        sections['Recent Events'] = df[df['ACCEPTANCE_TIME'] >= min_date + timedelta(days=time_split*4)]
+        stops = np.append(starts[1:], stop)
+        return [(name, int(start), int(end)) for name, start, end in zip(names, starts, stops)]
+    
+    def _resolve_strategy(self, values: np.ndarray, total: int) -> str:
+        if self.strategy != 'auto':
+            return self.strategy
+        date_range = (values[-1] - values[0]) // NS_PER_DAY
+        # Small or short-lived datasets are split by ticket count
+        if total <= 10 or date_range <= 7:
+            return 'count'
+        return 'time'
+    
+    def _count_starts(self, total: int) -> np.ndarray:
+        """Start positions for equal-count sections, giving one ticket per section first"""
+        if total < self.num_sections:
+            return np.minimum(np.arange(self.num_sections), total)
+        return np.arange(self.num_sections) * total // self.num_sections
+    
+    def _time_edges(self, values: np.ndarray) -> np.ndarray:
+        """Equal whole-day periods from the first ticket; the last section takes the remainder"""
+        date_range = (values[-1] - values[0]) // NS_PER_DAY
+        time_split = max(1, date_range // self.num_sections)  # Ensure at least 1 day per section
+        return values[0] + np.arange(1, self.num_sections) * time_split * NS_PER_DAY
+    
+    def _quantile_edges(self, values: np.ndarray) -> np.ndarray:
+        """Timestamp quantiles, so equal timestamps never straddle two sections"""
+        quantiles = np.arange(1, self.num_sections) / self.num_sections
+        return np.quantile(values, quantiles, method='inverted_cdf')
+    
+    def _calendar_sections(self, values: np.ndarray) -> Tuple[List[str], np.ndarray]:
+        """One section per calendar month; the first section absorbs months beyond num_sections"""
+        months = values.view('datetime64[ns]').astype('datetime64[M]')
+        periods = np.arange(months[0], months[-1] + 1)
+        absorbed = len(periods) > self.num_sections
+        if absorbed:
+            periods = periods[-self.num_sections:]
         
-        return {k: v for k, v in sections.items() if len(v) > 0}
\ No newline at end of file
+        edges = periods[1:].astype('datetime64[ns]').view('i8')
+        starts = np.concatenate(([0], np.searchsorted(values, edges, side='left')))
+        names = [pd.Timestamp(period).strftime('%B %Y') for period in periods]
+        if absorbed:
+            names[0] = f"Through {names[0]}"
+        return names, starts
+    
+    def _create_empty_sections(self) -> Dict[str, pd.DataFrame]:
+        """Return all section headers even when empty"""
+        return {name: pd.DataFrame() for name in self.section_names()}
@@ -1,32 +1,223 @@
-from langchain_ollama import ChatOllama
-from langchain_core.messages import HumanMessage
+from services.summary_cache import SummaryCache
+from services.summary_worker import SlotLease, SummaryWorker
+from services.deadline import Deadline, DeadlineExceeded
+from services.metrics import metrics, usage_tokens
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from helpers.run_concurrently import run_concurrently
+from typing import Hashable, Iterator, List, Optional, Tuple
+
+# Marks the end of a reply streamed through a queue
+_DONE = object()
 
 class AIService:
     """Service for AI-powered ticket summarization"""
     
-    def __init__(self, model_name: str = "gemma2:2b-instruct-q5_0"):
+    def __init__(self, model_name: str = "gemma2:2b-instruct-q5_0", temperature: float = 0.7,
+                 cache: Optional[SummaryCache] = None, max_concurrency: int = 4,
+                 worker: Optional[SummaryWorker] = None, session_id: Hashable = "default",
+                 keep_alive: Optional[str] = None, base_url: Optional[str] = None):
         self.model_name = model_name
+        self.temperature = temperature
+        self.cache = cache
         self._llm = None
+        # Caps in-flight model calls across every thread using this service
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        # A shared worker also dedupes identical prompts and queues fairly across sessions
+        self.worker = worker
+        self.session_id = session_id
+        # How long Ollama keeps the model loaded after each call, e.g. "30m"; None uses Ollama's default
+        self.keep_alive = keep_alive
+        # Ollama server URL, e.g. a mock server for load tests; None uses OLLAMA_HOST or localhost
+        self.base_url = base_url
     
     def _initialize_llm(self):
         """Initialize LLM if not already initialized"""
         if self._llm is None:
-            self._llm = ChatOllama(model=self.model_name, temperature=0.7)
+            # Imported on first use; langchain adds over a second to app startup
+            from langchain_ollama import ChatOllama
+            options = {} if self.keep_alive is None else {'keep_alive': self.keep_alive}
+            if self.base_url is not None:
+                options['base_url'] = self.base_url
+            self._llm = ChatOllama(model=self.model_name, temperature=self.temperature, **options)
     
     def set_model(self, model_name: str):
         """Change the model"""
         self.model_name = model_name
         self._llm = None  
     
-    def generate_summary(self, prompt: str) -> str:
-        """Generate summary using local Ollama LLM via LangChain"""
+    def is_cached(self, prompt: str) -> bool:
+        """Whether the summary cache already holds this prompt's summary"""
+        return self.cache is not None and \
+            self.cache.contains(SummaryCache.make_key(self.model_name, self.temperature, prompt))
+    
+    @contextmanager
+    def _slot(self, deadline: Optional[Deadline]) -> Iterator[SlotLease]:
+        """Hold one of this service's call slots, giving up at the deadline"""
+        if not self._slots.acquire(timeout=None if deadline is None else deadline.remaining()):
+            raise DeadlineExceeded(f"No LLM slot became free within the {deadline.seconds:.1f}s deadline")
+        lease = SlotLease(self._slots.release)
         try:
+            yield lease
+        finally:
+            lease.close()
+    
+    def generate_summary(self, prompt: str, deadline: Optional[Deadline] = None) -> str:
+        """Generate summary using local Ollama LLM via LangChain.
+        
+        With a deadline, the call is cancelled and DeadlineExceeded raised once it passes.
+        """
+        try:
+            cache_key = SummaryCache.make_key(self.model_name, self.temperature, prompt)
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                metrics.record_cache('summary', cached is not None)
+                if cached is not None:
+                    return cached
+            
             self._initialize_llm()
             
-            message = HumanMessage(content=prompt)
+            with self._slot(deadline) as lease:
+                if deadline is None:
+                    generate = lambda worker_lease: self._invoke(prompt)
+                else:
+                    generate = lambda worker_lease: self._invoke_until(prompt, deadline, [lease, worker_lease])
+                if self.worker is not None:
+                    content = self.worker.run(self.session_id, cache_key, generate, deadline)
+                else:
+                    content = generate(None)
             
+            if self.cache is not None:
+                self.cache.put(cache_key, content)
+            return content
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Error generating AI summary: {str(e)}")
+    
+    def _invoke_until(self, prompt: str, deadline: Deadline, leases: List[Optional[SlotLease]]) -> str:
+        return "".join(self._stream_until(prompt, deadline, leases))
+    
+    def _stream_until(self, prompt: str, deadline: Deadline, leases: List[Optional[SlotLease]]) -> Iterator[str]:
+        """Stream the reply from a helper thread so the caller can give up when the deadline passes.
+        
+        The blocking HTTP read cannot be interrupted, so on expiry the helper closes the stream
+        at its next chunk; dropping the connection makes Ollama stop generating. The helper
+        owns the call's slots and frees them only when it exits, so generations still running
+        after their caller gave up keep counting against the concurrency caps.
+        """
+        replies: "queue.Queue" = queue.Queue()
+        cancelled = threading.Event()
+        releases = [lease.hand_off() for lease in leases if lease is not None]
+        
+        def produce():
+            stream = self._stream_chunks(prompt)
+            try:
+                for chunk in stream:
+                    if cancelled.is_set():
+                        break
+                    replies.put(chunk)
+                replies.put(_DONE)
+            except Exception as e:
+                replies.put(e)
+            finally:
+                stream.close()
+                for release in releases:
+                    release()
+        
+        started = time.perf_counter()
+        threading.Thread(target=produce, daemon=True, name="llm-call").start()
+        try:
+            while True:
+                try:
+                    reply = replies.get(timeout=deadline.remaining())
+                except queue.Empty:
+                    metrics.record_llm_call(self.model_name, 0, 0, time.perf_counter() - started, error=True)
+                    raise DeadlineExceeded(f"{self.model_name} did not finish within the {deadline.seconds:.1f}s deadline")
+                if reply is _DONE:
+                    return
+                if isinstance(reply, Exception):
+                    raise reply
+                yield reply
+        finally:
+            cancelled.set()
+    
+    def _invoke(self, prompt: str) -> str:
+        from langchain_core.messages import HumanMessage
+        message = HumanMessage(content=prompt)
+        started = time.perf_counter()
+        try:
             response = self._llm.invoke([message])
+        except Exception:
+            metrics.record_llm_call(self.model_name, 0, 0, time.perf_counter() - started, error=True)
+            raise
+        metrics.record_llm_call(self.model_name, *usage_tokens(response, prompt, response.content),
+                                time.perf_counter() - started)
+        return response.content
+    
+    def stream_summary(self, prompt: str, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """Yield the summary in chunks as the model generates them, until the deadline if one is given"""
+        try:
+            cache_key = SummaryCache.make_key(self.model_name, self.temperature, prompt)
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                metrics.record_cache('summary', cached is not None)
+                if cached is not None:
+                    yield cached
+                    return
+            
+            self._initialize_llm()
             
-            return response.content
+            chunks = []
+            with self._slot(deadline) as lease:
+                if deadline is None:
+                    generate = lambda worker_lease: self._stream_chunks(prompt)
+                else:
+                    generate = lambda worker_lease: self._stream_until(prompt, deadline, [lease, worker_lease])
+                if self.worker is not None:
+                    stream = self.worker.stream(self.session_id, cache_key, generate, deadline)
+                else:
+                    stream = generate(None)
+                for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            
+            if self.cache is not None:
+                self.cache.put(cache_key, "".join(chunks))
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            raise RuntimeError(f"Error generating AI summary: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Error generating AI summary: {str(e)}")
+    
+    def _stream_chunks(self, prompt: str) -> Iterator[str]:
+        from langchain_core.messages import HumanMessage
+        message = HumanMessage(content=prompt)
+        chunks = []
+        usage_chunk = None
+        # Includes the time the consumer spends rendering each chunk
+        started = time.perf_counter()
+        try:
+            for chunk in self._llm.stream([message]):
+                if getattr(chunk, 'usage_metadata', None):
+                    usage_chunk = chunk
+                chunks.append(chunk.content)
+                yield chunk.content
+        except Exception:
+            metrics.record_llm_call(self.model_name, 0, 0, time.perf_counter() - started, error=True)
+            raise
+        metrics.record_llm_call(self.model_name, *usage_tokens(usage_chunk, prompt, "".join(chunks)),
+                                time.perf_counter() - started)
+    
+    def generate_summaries(self, prompts: List[str], max_concurrency: int = 4,
+                           deadline: Optional[Deadline] = None) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Generate summaries for many prompts concurrently, keeping input order.
+        
+        Each result is a (summary, error) pair so a failed call does not lose the rest of the batch.
+        """
+        # Create the client up front so worker threads share one instance
+        self._initialize_llm()
+        
+        return run_concurrently(partial(self.generate_summary, deadline=deadline), prompts, max_concurrency)
\ No newline at end of file
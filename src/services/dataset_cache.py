@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import pandas as pd
+from typing import Any, Dict, List, Optional
+
+# src/.cache/datasets, wherever the app or the CLI is started from
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 ".cache", "datasets")
+
+# Bump when processing changes so stale datasets are not served
+PIPELINE_VERSION = "3"
+
+class DatasetCache:
+    """On-disk Parquet cache of processed datasets keyed by upload fingerprint"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = 8):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_entries = max_entries
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}-v{PIPELINE_VERSION}.parquet")
+
+    def get(self, fingerprint: str) -> Optional[pd.DataFrame]:
+        """Return the cached dataset or None, marking the entry as recently used"""
+        path = self._path(fingerprint)
+        if not os.path.exists(path):
+            return None
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # mtime doubles as the LRU timestamp
+            return df
+        except Exception:
+            # A truncated or unreadable entry is treated as a miss
+            return None
+
+    def get_report(self, fingerprint: str) -> Optional[List[Dict[str, Any]]]:
+        """Per-file parse report stored with the dataset, if any"""
+        try:
+            with open(self._report_path(fingerprint), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _report_path(self, fingerprint: str) -> str:
+        return self._path(fingerprint)[:-len(".parquet")] + ".json"
+
+    def put(self, fingerprint: str, df: pd.DataFrame, report: Optional[List[Dict[str, Any]]] = None):
+        """Store a processed dataset, and its parse report, and evict least recently used entries.
+        
+        Caching is best-effort, e.g. when no Parquet engine is installed or the disk is full.
+        """
+        if not self._write(self._path(fingerprint), df.to_parquet):
+            return
+        if report is not None:
+            self._write(self._report_path(fingerprint), lambda path: self._dump_json(report, path))
+        self._evict()
+
+    def _write(self, path: str, write) -> bool:
+        """Write through a temporary file and move it into place, so readers never see a partial entry"""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            os.close(fd)
+            write(tmp_path)
+            os.replace(tmp_path, path)
+            return True
+        except Exception:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return False
+
+    @staticmethod
+    def _dump_json(data, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def _evict(self):
+        """Keep only the max_entries most recently used datasets"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".parquet"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except FileNotFoundError:
+                            # Evicted by another session during the scan
+                            continue
+        except OSError:
+            return
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            for stale in (path, path[:-len(".parquet")] + ".json"):
+                try:
+                    os.remove(stale)
+                except OSError:
+                    pass
@@ -0,0 +1,34 @@
+import time
+from typing import Optional
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an LLM call is cancelled because its deadline passed"""
+
+class Deadline:
+    """Point in time, on the monotonic clock, by which a summary run or call must finish"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> Optional['Deadline']:
+        """Deadline in seconds from now, or None when seconds is None or 0"""
+        return cls(seconds) if seconds else None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def within(self, seconds: Optional[float]) -> 'Deadline':
+        """The earlier of this deadline and seconds from now"""
+        if not seconds or seconds >= self.remaining():
+            return self
+        return Deadline(seconds)
+
+    def check(self, what: str = "LLM call"):
+        """Raise DeadlineExceeded if the deadline has passed"""
+        if self.expired():
+            raise DeadlineExceeded(f"{what} exceeded its {self.seconds:.1f}s deadline")
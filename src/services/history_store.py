@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import pandas as pd
+from typing import Dict, Optional
+
+# src/.cache/history, wherever the app is started from
+DEFAULT_STORE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 ".cache", "history")
+
+class HistoryStore:
+    """Persistent ticket history for append mode, plus the summaries of its timeline sections"""
+
+    def __init__(self, store_dir: Optional[str] = None):
+        self.store_dir = store_dir or DEFAULT_STORE_DIR
+        self._lock = threading.Lock()
+        # Serializes writes of one product's section file, so a stale snapshot never overwrites a newer one
+        self._product_locks: Dict[str, threading.Lock] = {}
+        os.makedirs(os.path.join(self.store_dir, "sections"), exist_ok=True)
+        self._sections: Dict[str, Dict[str, Dict[str, str]]] = self._read_sections()
+        self._uploads = set(self._read_json("uploads.json", []))
+
+    @property
+    def _dataset_path(self) -> str:
+        return os.path.join(self.store_dir, "tickets.parquet")
+
+    def _read_json(self, name: str, default):
+        try:
+            with open(os.path.join(self.store_dir, name), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _section_file(self, product: str) -> str:
+        """One file per product, so storing a section rewrites only that product's summaries"""
+        return os.path.join("sections", hashlib.sha256(product.encode("utf-8")).hexdigest()[:32] + ".json")
+
+    def _read_sections(self) -> Dict[str, Dict[str, Dict[str, str]]]:
+        sections = {}
+        for name in sorted(os.listdir(os.path.join(self.store_dir, "sections"))):
+            if name.endswith(".json"):
+                entry = self._read_json(os.path.join("sections", name), None)
+                if entry:
+                    sections[entry['product']] = entry['sections']
+        return sections
+
+    def _write_json(self, name: str, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, os.path.join(self.store_dir, name))
+
+    def contains(self, fingerprint: str) -> bool:
+        """Whether an upload with this fingerprint was already merged into the history"""
+        return fingerprint in self._uploads
+
+    def load(self) -> Optional[pd.DataFrame]:
+        """Load the merged ticket history, or None when nothing was appended yet"""
+        if not os.path.exists(self._dataset_path):
+            return None
+        return pd.read_parquet(self._dataset_path)
+
+    def save(self, df: pd.DataFrame, fingerprint: str):
+        """Replace the stored history with df, which now includes the given upload"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        os.close(fd)
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, self._dataset_path)
+        with self._lock:
+            self._uploads.add(fingerprint)
+            self._write_json("uploads.json", sorted(self._uploads))
+
+    @staticmethod
+    def fingerprint_section(section_data: pd.DataFrame, *settings) -> str:
+        """Hash a section's tickets together with the settings that shape its summary"""
+        digest = hashlib.sha256(json.dumps([str(setting) for setting in settings]).encode("utf-8"))
+        if len(section_data):
+            # Hash the text form so the fingerprint survives dtype changes from Parquet round trips
+            row_hashes = pd.util.hash_pandas_object(section_data.astype(str), index=False)
+            digest.update(row_hashes.to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def get_section_summary(self, product: str, section_name: str, fingerprint: str) -> Optional[str]:
+        """Return the stored summary when the section's fingerprint is unchanged"""
+        entry = self._sections.get(str(product), {}).get(section_name)
+        if entry and entry['fingerprint'] == fingerprint:
+            return entry['summary']
+        return None
+
+    def put_section_summary(self, product: str, section_name: str, fingerprint: str, summary: str):
+        """Store the latest summary of a section"""
+        product = str(product)
+        with self._lock:
+            product_lock = self._product_locks.setdefault(product, threading.Lock())
+        with product_lock:
+            with self._lock:
+                sections = self._sections.setdefault(product, {})
+                sections[section_name] = {
+                    'fingerprint': fingerprint,
+                    'summary': summary
+                }
+                snapshot = dict(sections)
+            self._write_json(self._section_file(product), {'product': product, 'sections': snapshot})
+
+    def clear(self):
+        """Forget the stored history and section summaries"""
+        with self._lock:
+            shutil.rmtree(self.store_dir, ignore_errors=True)
+            os.makedirs(os.path.join(self.store_dir, "sections"), exist_ok=True)
+            self._sections = {}
+            self._uploads = set()
@@ -0,0 +1,203 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+class PipelineMetrics:
+    """Process-wide counters for pipeline stages, timeline sections, LLM calls and caches.
+
+    All methods are thread-safe so concurrent summary workers can record into one instance.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Bumped by every record, so exports can skip reruns that recorded nothing
+        self._changes = 0
+        self._exported_changes = -1
+        self._exported_at = 0.0
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._stages: Dict[str, Dict[str, float]] = {}
+            self._sections: Dict[Tuple[str, str], Dict[str, float]] = {}
+            self._llm: Dict[str, Dict[str, float]] = {}
+            self._caches: Dict[str, Dict[str, int]] = {}
+            self._volume: Dict[str, Dict[str, int]] = {}
+            self._started = time.time()
+            self._changes += 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a pipeline stage; repeated runs accumulate"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - started)
+
+    def record_stage(self, name: str, seconds: float):
+        with self._lock:
+            self._changes += 1
+            entry = self._stages.setdefault(name, {'runs': 0, 'seconds': 0.0, 'last_seconds': 0.0})
+            entry['runs'] += 1
+            entry['seconds'] += seconds
+            entry['last_seconds'] = seconds
+
+    def record_section(self, product: str, section_name: str, seconds: float, tickets: int):
+        """Record the latest wall time to summarize one timeline section"""
+        with self._lock:
+            self._changes += 1
+            self._sections[(str(product), section_name)] = {'seconds': seconds, 'tickets': tickets}
+
+    def record_llm_call(self, model: str, prompt_tokens: int, completion_tokens: int, seconds: float,
+                        error: bool = False):
+        """Record one model call; failed calls count towards latency but not tokens"""
+        with self._lock:
+            self._changes += 1
+            entry = self._llm.setdefault(model, {
+                'calls': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'seconds': 0.0
+            })
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            if error:
+                entry['errors'] += 1
+            else:
+                entry['prompt_tokens'] += prompt_tokens
+                entry['completion_tokens'] += completion_tokens
+
+    def record_cache(self, cache: str, hit: bool):
+        with self._lock:
+            self._changes += 1
+            entry = self._caches.setdefault(cache, {'hits': 0, 'misses': 0})
+            entry['hits' if hit else 'misses'] += 1
+
+    def record_volume(self, stage: str, rows: int, nbytes: int = 0):
+        """Record rows and bytes that passed through a stage"""
+        with self._lock:
+            self._changes += 1
+            entry = self._volume.setdefault(stage, {'rows': 0, 'bytes': 0})
+            entry['rows'] += int(rows)
+            entry['bytes'] += int(nbytes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of all metrics, with per-model average latency and tokens/sec"""
+        with self._lock:
+            llm = {}
+            for model, entry in self._llm.items():
+                successful = entry['calls'] - entry['errors']
+                llm[model] = dict(entry,
+                                  avg_latency=entry['seconds'] / entry['calls'] if entry['calls'] else 0.0,
+                                  tokens_per_second=entry['completion_tokens'] / entry['seconds']
+                                  if entry['seconds'] and successful else 0.0)
+            return {
+                'uptime_seconds': time.time() - self._started,
+                'stages': {name: dict(entry) for name, entry in self._stages.items()},
+                'sections': [
+                    {'product': product, 'section': section_name, **entry}
+                    for (product, section_name), entry in self._sections.items()
+                ],
+                'llm': llm,
+                'caches': {name: dict(entry) for name, entry in self._caches.items()},
+                'volume': {name: dict(entry) for name, entry in self._volume.items()}
+            }
+
+    def to_prometheus(self, prefix: str = "ticket_summary") -> str:
+        """Render the snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(value_)}"' for key, value_ in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+        stages = snapshot['stages'].items()
+        family("stage_seconds_total", "counter", "Wall time spent per pipeline stage",
+               [({'stage': name}, entry['seconds']) for name, entry in stages])
+        family("stage_runs_total", "counter", "Runs per pipeline stage",
+               [({'stage': name}, entry['runs']) for name, entry in stages])
+        family("section_seconds", "gauge", "Wall time of the latest summary of each timeline section",
+               [({'product': entry['product'], 'section': entry['section']}, entry['seconds'])
+                for entry in snapshot['sections']])
+
+        llm = snapshot['llm'].items()
+        family("llm_calls_total", "counter", "LLM calls per model",
+               [({'model': model}, entry['calls']) for model, entry in llm])
+        family("llm_errors_total", "counter", "Failed LLM calls per model",
+               [({'model': model}, entry['errors']) for model, entry in llm])
+        family("llm_prompt_tokens_total", "counter", "Prompt tokens sent per model",
+               [({'model': model}, entry['prompt_tokens']) for model, entry in llm])
+        family("llm_completion_tokens_total", "counter", "Completion tokens generated per model",
+               [({'model': model}, entry['completion_tokens']) for model, entry in llm])
+        family("llm_seconds_total", "counter", "Time spent waiting for the LLM per model",
+               [({'model': model}, entry['seconds']) for model, entry in llm])
+        family("llm_tokens_per_second", "gauge", "Average completion tokens per second per model",
+               [({'model': model}, entry['tokens_per_second']) for model, entry in llm])
+
+        caches = snapshot['caches'].items()
+        family("cache_hits_total", "counter", "Cache hits per cache",
+               [({'cache': name}, entry['hits']) for name, entry in caches])
+        family("cache_misses_total", "counter", "Cache misses per cache",
+               [({'cache': name}, entry['misses']) for name, entry in caches])
+
+        volume = snapshot['volume'].items()
+        family("rows_total", "counter", "Rows processed per stage",
+               [({'stage': name}, entry['rows']) for name, entry in volume])
+        family("bytes_total", "counter", "Bytes processed per stage",
+               [({'stage': name}, entry['bytes']) for name, entry in volume])
+
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str, prefix: str = "ticket_summary", min_interval: float = 0.0,
+               max_log_bytes: int = 10 * 1024 * 1024) -> bool:
+        """Atomically write metrics.prom for textfile scrapers and append a line to metrics.jsonl.
+
+        Nothing is written when nothing was recorded since the last export, or when the last
+        export is less than min_interval seconds old. metrics.jsonl is rotated to
+        metrics.jsonl.1 once it reaches max_log_bytes. Returns whether anything was written.
+        """
+        with self._lock:
+            changes = self._changes
+            if changes == self._exported_changes or time.time() - self._exported_at < min_interval:
+                return False
+        
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        os.replace(tmp_path, os.path.join(directory, "metrics.prom"))
+
+        record = dict(self.snapshot(), timestamp=time.time())
+        log_path = os.path.join(directory, "metrics.jsonl")
+        with self._lock:
+            if os.path.exists(log_path) and os.path.getsize(log_path) >= max_log_bytes:
+                os.replace(log_path, log_path + ".1")
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            self._exported_changes = changes
+            self._exported_at = time.time()
+        return True
+
+def _escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Rough token count for models that do not report usage"""
+    return int(len(text) / chars_per_token) + 1 if text else 0
+
+def usage_tokens(message: Any, prompt: str, completion: str) -> Tuple[int, int]:
+    """Prompt and completion tokens from the model's usage metadata, or estimated from text"""
+    usage: Optional[Dict[str, int]] = getattr(message, 'usage_metadata', None)
+    if usage:
+        return usage.get('input_tokens', 0), usage.get('output_tokens', 0)
+    return estimate_tokens(prompt), estimate_tokens(completion)
+
+# Shared by the app, the CLI and every controller in the process
+metrics = PipelineMetrics()
@@ -0,0 +1,94 @@
+import threading
+from services.metrics import estimate_tokens
+from typing import Dict, List, Optional
+
+# Relative generation speed of the app's models; models not listed are assumed as fast as 1.0
+DEFAULT_MODEL_SPEEDS = {
+    'gemma2:2b-instruct-q5_0': 1.0,
+    'gemma': 0.35,
+    'mistral': 0.35
+}
+
+class ModelRouter:
+    """Estimates how long a model takes to answer a prompt and picks the first model that fits a budget.
+
+    An estimate is a fixed overhead plus prompt and reply tokens at the model's prior
+    throughput, corrected by the ratio of observed to estimated latency of the model's past
+    calls. Models without a configured speed or observed calls are always tried, since the
+    caller's deadline bounds what a wrong guess costs; a model that turns out slow on this
+    machine then stops being picked for prompts that would not fit, and a faster fallback
+    takes over.
+    """
+
+    def __init__(self, model_speeds: Optional[Dict[str, float]] = None, prompt_tokens_per_second: float = 150.0,
+                 output_tokens_per_second: float = 20.0, output_tokens: int = 250, overhead: float = 0.5,
+                 smoothing: float = 0.3):
+        self.model_speeds = dict(DEFAULT_MODEL_SPEEDS if model_speeds is None else model_speeds)
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.output_tokens_per_second = output_tokens_per_second
+        self.output_tokens = output_tokens
+        self.overhead = overhead
+        self.smoothing = smoothing
+        # Model -> observed / estimated latency, exponentially smoothed
+        self._corrections: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _prior(self, model: str, prompt_tokens: int) -> float:
+        speed = self.model_speeds.get(model, 1.0)
+        seconds = prompt_tokens / self.prompt_tokens_per_second + self.output_tokens / self.output_tokens_per_second
+        return self.overhead + seconds / speed
+
+    def _estimate(self, model: str, prompt_tokens: int) -> float:
+        with self._lock:
+            correction = self._corrections.get(model, 1.0)
+        return self._prior(model, prompt_tokens) * correction
+
+    def estimate(self, model: str, prompt: str) -> float:
+        """Expected seconds for the model to answer the prompt"""
+        return self._estimate(model, estimate_tokens(prompt))
+
+    def estimate_batch(self, model: str, prompts: List[str], concurrency: int = 1) -> float:
+        """Expected seconds for prompts sent concurrently, followed by one call combining their replies"""
+        if not prompts:
+            return 0.0
+        estimates = [self.estimate(model, prompt) for prompt in prompts]
+        parallel = max(max(estimates), sum(estimates) / max(1, concurrency))
+        return parallel + self._estimate(model, self.output_tokens * len(prompts))
+
+    def observe(self, model: str, prompt: str, seconds: float, timed_out: bool = False):
+        """Correct the model's estimates with a call's latency.
+
+        A timed-out call only shows the latency was at least seconds, so it can raise the
+        estimate but never lower it.
+        """
+        ratio = seconds / self._prior(model, estimate_tokens(prompt))
+        with self._lock:
+            previous = self._corrections.get(model)
+            if previous is None:
+                self._corrections[model] = max(1.0, ratio) if timed_out else ratio
+            elif timed_out:
+                self._corrections[model] = max(previous, ratio)
+            else:
+                self._corrections[model] = previous + self.smoothing * (ratio - previous)
+
+    def route(self, models: List[str], prompts: List[str], remaining: float, concurrency: int = 1) -> Optional[str]:
+        """First model, in preference order, expected to answer within remaining seconds; None if none is.
+
+        Several prompts are estimated as one map-reduce batch.
+        """
+        for model in models:
+            with self._lock:
+                known = model in self._corrections or model in self.model_speeds
+            if not known:
+                return model
+            if len(prompts) == 1:
+                estimate = self.estimate(model, prompts[0])
+            else:
+                estimate = self.estimate_batch(model, prompts, concurrency)
+            if estimate <= remaining:
+                return model
+        return None
+
+    def corrections(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._corrections)
@@ -0,0 +1,60 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class ModelWarmer:
+    """Loads models into Ollama in the background so the first summary does not pay the load time.
+
+    Loading is requested with an empty prompt, which makes Ollama load the model without
+    generating anything, and keep_alive keeps it resident between summaries. Models are
+    loaded again once refresh_after seconds have passed, which renews the keep-alive.
+    """
+
+    def __init__(self, keep_alive: str = "30m", refresh_after: float = 600.0, host: Optional[str] = None):
+        self.keep_alive = keep_alive
+        self.refresh_after = refresh_after
+        self.host = host
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def warm(self, model_name: str) -> bool:
+        """Start loading the model in a background thread; returns False if it is loading or fresh"""
+        with self._lock:
+            status = self._status.get(model_name)
+            if status is not None:
+                if status['state'] == 'loading':
+                    return False
+                if status['state'] == 'ready' and time.time() - status['loaded_at'] < self.refresh_after:
+                    return False
+            self._status[model_name] = {'state': 'loading', 'started_at': time.time()}
+
+        threading.Thread(target=self._load, args=(model_name,), daemon=True,
+                         name=f"warm-up-{model_name}").start()
+        return True
+
+    def _load(self, model_name: str):
+        started = time.perf_counter()
+        try:
+            from ollama import Client
+            Client(host=self.host).generate(model=model_name, prompt="", keep_alive=self.keep_alive)
+            status = {'state': 'ready', 'loaded_at': time.time(), 'seconds': time.perf_counter() - started}
+        except Exception as e:
+            status = {'state': 'error', 'error': str(e), 'seconds': time.perf_counter() - started}
+        with self._lock:
+            self._status[model_name] = status
+
+    def status(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """Warm-up state of a model: loading, ready or error, with timings"""
+        with self._lock:
+            status = self._status.get(model_name)
+            return dict(status) if status is not None else None
+
+    def wait(self, model_name: str, timeout: float = 120.0) -> Optional[Dict[str, Any]]:
+        """Block until the model finished loading or the timeout passed"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status = self.status(model_name)
+            if status is None or status['state'] != 'loading':
+                return status
+            time.sleep(0.05)
+        return self.status(model_name)
@@ -1,18 +1,28 @@
+import numpy as np
 import pandas as pd
+from services.metrics import metrics
+from typing import List, Optional
+
+# Text that decides whether two tickets describe the same issue
+DUPLICATE_TEXT_COLUMNS = ['ORDER_DESCRIPTION_1', 'ORDER_DESCRIPTION_2', 'COMPLETION_RESULT_KB']
 
 class PromptGenerator:
     """Responsible only for generating prompts for AI summarization"""
     
+    def __init__(self, token_budget: Optional[int] = None, chars_per_token: float = 4.0):
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+    
     def create_section_prompt(self, section_name: str, category: str, section_data: pd.DataFrame) -> str:
         """Create a prompt for summarizing a section of tickets"""
        
-        # Generate ticket details string
-        ticket_details = "\n".join(
-            f"- Ticket {row.get('ORDER_NUMBER', 'Unknown')} ({row.get('ACCEPTANCE_TIME', 'Unknown date').date() if hasattr(row.get('ACCEPTANCE_TIME', pd.NaT), 'date') else 'Unknown date'}): "
-            f"{row.get('ORDER_DESCRIPTION_1', '')} - {row.get('ORDER_DESCRIPTION_2', '')}. "
-            f"Resolution: {row.get('COMPLETION_RESULT_KB', '')}"
-            for _, row in section_data.iterrows()
-        )
+        # Generate ticket details string, compacted when it would exceed the token budget
+        with metrics.stage('prompt'):
+            ticket_details = None
+            if not self._exceeds_budget(len(section_data)):
+                ticket_details = self.format_ticket_details(section_data)
+            if ticket_details is None or (self.token_budget and self.estimate_tokens(ticket_details) > self.token_budget):
+                ticket_details = self.compact_ticket_details(section_data)
         
         prompt = f"""Create a concise, professional summary for the '{section_name}' section of {category} tickets.
         Focus on identifying patterns, common issues, and resolution effectiveness. Write in clear business English.
@@ -22,4 +32,154 @@ class PromptGenerator:
         
         Summary:"""
         
-        return prompt
\ No newline at end of file
+        return prompt
+    
+    def create_reduce_prompt(self, section_name: str, category: str, partial_summaries: List[str]) -> str:
+        """Create a prompt for combining partial summaries of one section"""
+        
+        partials = "\n\n".join(
+            f"Part {number}:\n{summary.strip()}" for number, summary in enumerate(partial_summaries, start=1)
+        )
+        
+        prompt = f"""Combine the partial summaries below into one concise, professional summary for the '{section_name}' section of {category} tickets.
+        Keep the most significant patterns, common issues, and resolution effectiveness. Write in clear business English.
+        
+        Partial Summaries:
+        {partials}
+        
+        Summary:"""
+        
+        return prompt
+    
+    def format_ticket_details(self, section_data: pd.DataFrame) -> str:
+        """Format one line per ticket, reading whole columns instead of iterating rows"""
+        if len(section_data) == 0:
+            return ""
+        
+        lines = (
+            f"- Ticket {order_number} ({date}): {description_1} - {description_2}. Resolution: {resolution}"
+            for order_number, date, description_1, description_2, resolution in zip(
+                self._column_values(section_data, 'ORDER_NUMBER', 'Unknown'),
+                self._format_dates(section_data),
+                self._column_values(section_data, 'ORDER_DESCRIPTION_1', ''),
+                self._column_values(section_data, 'ORDER_DESCRIPTION_2', ''),
+                self._column_values(section_data, 'COMPLETION_RESULT_KB', '')
+            )
+        )
+        return "\n".join(lines)
+    
+    def estimate_tokens(self, text: str) -> int:
+        """Rough token count for budgeting, without loading a tokenizer"""
+        return int(np.ceil(len(text) / self.chars_per_token))
+    
+    def _exceeds_budget(self, ticket_count: int) -> bool:
+        """True when even the shortest possible ticket lines would not fit the budget"""
+        min_line_tokens = len("- Ticket  (): - . Resolution: ") / self.chars_per_token
+        return bool(self.token_budget) and ticket_count * min_line_tokens > self.token_budget
+    
+    def compact_ticket_details(self, section_data: pd.DataFrame) -> str:
+        """Collapse near-duplicate tickets into "N tickets: ..." lines and keep what fits the budget.
+        
+        Groups are kept largest first, so the most common issues survive and prefill cost stays
+        bounded however many tickets the section holds. Kept lines are listed in time order.
+        """
+        codes = self._duplicate_groups(section_data)
+        counts = np.bincount(codes)
+        # Codes are numbered by first appearance, so the first occurrences come out in code order
+        code_series = pd.Series(codes)
+        first_positions = code_series.drop_duplicates().index.to_numpy()
+        last_by_code = code_series.drop_duplicates(keep='last')
+        last_positions = last_by_code.index.to_numpy()[np.argsort(last_by_code.to_numpy())]
+        
+        # Only the groups that can possibly fit are formatted
+        budget_chars = self.token_budget * self.chars_per_token if self.token_budget else np.inf
+        candidates = np.lexsort((first_positions, -counts))[:int(min(len(counts), budget_chars // 30 + 1))]
+        rows = np.concatenate((first_positions[candidates], last_positions[candidates]))
+        sample = section_data.iloc[rows]
+        order_numbers = self._column_values(sample, 'ORDER_NUMBER', 'Unknown')
+        dates = self._format_dates(sample)
+        descriptions_1 = self._column_values(sample, 'ORDER_DESCRIPTION_1', '')
+        descriptions_2 = self._column_values(sample, 'ORDER_DESCRIPTION_2', '')
+        resolutions = self._column_values(sample, 'COMPLETION_RESULT_KB', '')
+        
+        selected, used_chars, kept_tickets = [], 0, 0
+        for i, group in enumerate(candidates):
+            first, last = i, len(candidates) + i
+            text = f"{descriptions_1[first]} - {descriptions_2[first]}. Resolution: {resolutions[first]}"
+            if counts[group] == 1:
+                prefix, suffix = f"- Ticket {order_numbers[first]} ({dates[first]}): ", ""
+            else:
+                prefix = f"- {counts[group]} tickets: "
+                suffix = f" (e.g. Ticket {order_numbers[first]}, {dates[first]} to {dates[last]})"
+            line = prefix + text + suffix
+            
+            if used_chars + len(line) + 1 > budget_chars:
+                if selected:
+                    break
+                # The largest group is always listed, shortened to the budget if its text alone exceeds it
+                line = self._truncate(prefix, text, suffix, int(budget_chars) - 1)
+            selected.append((first_positions[group], line))
+            used_chars += len(line) + 1
+            kept_tickets += counts[group]
+        
+        lines = [line for _, line in sorted(selected)]
+        omitted_groups = len(counts) - len(selected)
+        if omitted_groups:
+            lines.append(f"- ... {len(codes) - kept_tickets} more tickets in {omitted_groups} "
+                         f"less frequent groups omitted")
+        return "\n".join(lines)
+    
+    def _truncate(self, prefix: str, text: str, suffix: str, max_chars: int) -> str:
+        """Shorten text with an ellipsis so the whole line fits in max_chars"""
+        room = max_chars - len(prefix) - len(suffix) - 1
+        if room > 0:
+            return prefix + text[:room] + "…" + suffix
+        return (prefix + text + suffix)[:max(0, max_chars - 1)] + "…"
+    
+    def _duplicate_groups(self, section_data: pd.DataFrame) -> np.ndarray:
+        """Group code per ticket, equal for tickets whose normalized text matches.
+        
+        Exact values are factorized first, so the regex normalization only runs once per
+        distinct text combination rather than once per ticket.
+        """
+        combined = np.zeros(len(section_data), dtype=np.int64)
+        for column in DUPLICATE_TEXT_COLUMNS:
+            if column in section_data.columns:
+                column_codes, uniques = pd.factorize(section_data[column], use_na_sentinel=False)
+                combined, _ = pd.factorize(combined * (len(uniques) + 1) + column_codes)
+        
+        combo_codes, _ = pd.factorize(combined)
+        representatives = section_data.iloc[pd.Series(combo_codes).drop_duplicates().index]
+        
+        text = pd.Series("", index=representatives.index)
+        for column in DUPLICATE_TEXT_COLUMNS:
+            if column in representatives.columns:
+                text = text + " | " + representatives[column].astype(str)
+        normalized = (text.str.lower()
+                      .str.replace(r"\d+", "#", regex=True)
+                      .str.replace(r"[^\w#|]+", " ", regex=True)
+                      .str.replace(r"\s+", " ", regex=True)
+                      .str.strip())
+        
+        group_of_combo, _ = pd.factorize(normalized)
+        return group_of_combo[combo_codes]
+    
+    def _column_values(self, section_data: pd.DataFrame, column: str, default: str) -> List:
+        """Column values boxed the same way row iteration boxes them"""
+        if column not in section_data.columns:
+            return [default] * len(section_data)
+        return section_data[column].astype(object).tolist()
+    
+    def _format_dates(self, section_data: pd.DataFrame) -> List[str]:
+        """ACCEPTANCE_TIME as YYYY-MM-DD ('NaT' when missing, 'Unknown date' when not a date)"""
+        if 'ACCEPTANCE_TIME' not in section_data.columns:
+            return ['Unknown date'] * len(section_data)
+        
+        times = section_data['ACCEPTANCE_TIME']
+        if pd.api.types.is_datetime64_any_dtype(times):
+            if getattr(times.dt, 'tz', None) is not None:
+                times = times.dt.tz_localize(None)  # keep local calendar dates
+            days = times.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+            return np.datetime_as_string(days).tolist()
+        
+        return [str(value.date()) if hasattr(value, 'date') else 'Unknown date' for value in times]
\ No newline at end of file
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+# src/.cache/summaries, wherever the app or the CLI is started from
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 ".cache", "summaries")
+
+class SummaryCache:
+    """Persistent, content-addressed cache for generated section summaries"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(model_name: str, temperature: float, prompt: str) -> str:
+        """Hash everything that influences the generated text"""
+        payload = json.dumps([model_name, temperature, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.txt")
+
+    def contains(self, key: str) -> bool:
+        """Whether a summary is cached, without counting a hit or miss or marking it as recently used"""
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached summary or None, marking the entry as recently used"""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                summary = f.read()
+            os.utime(path)  # mtime doubles as the LRU timestamp
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return summary
+
+    def put(self, key: str, summary: str):
+        """Store a summary atomically and evict least recently used entries.
+
+        Caching is best-effort: a full disk or a concurrent eviction never fails the summary.
+        """
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(summary)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return
+        self._evict()
+
+    def _entries(self):
+        """(mtime, size, path) of every entry; files removed during the scan are skipped"""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".txt"):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        yield stat.st_mtime, stat.st_size, entry.path
+        except OSError:
+            return
+
+    def _evict(self):
+        """Drop the oldest entries until the cache fits in max_bytes"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        """Remove all cached summaries and reset counters"""
+        for _, _, path in list(self._entries()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        entries = list(self._entries())
+        return {
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,157 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, Optional
+from services.deadline import Deadline, DeadlineExceeded
+from services.metrics import metrics
+
+class SlotLease:
+    """A held call slot, freed when its with block ends unless it was handed off.
+
+    A call that keeps running after its caller gave up hands its slot off to the thread
+    still waiting on the model, so abandoned generations keep counting against the cap.
+    """
+
+    def __init__(self, release: Callable[[], None]):
+        self._release = release
+        self._handed_off = False
+
+    def hand_off(self) -> Callable[[], None]:
+        """Keep the slot held after the with block; the returned function frees it"""
+        self._handed_off = True
+        return self._release
+
+    def close(self):
+        if not self._handed_off:
+            self._release()
+
+class SummaryWorker:
+    """Process-wide gate for LLM calls shared by every session.
+
+    Identical prompts already being generated are not sent again: later callers wait for
+    the first generation (single-flight). At most max_concurrency calls run at once, and
+    free slots are handed to waiting sessions in round-robin order, so one session with many
+    queued sections cannot starve the others. Admitted calls run in the caller's thread,
+    which lets streamed generations hold a slot while they stream.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(1, max_concurrency)
+        self._condition = threading.Condition()
+        self._in_use = 0
+        # Session id -> tickets of its waiting calls; the first session is served next
+        self._waiting: "OrderedDict[Hashable, deque]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._flight_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, session_id: Hashable, deadline: Optional[Deadline] = None) -> Iterator[SlotLease]:
+        """Hold one of the global slots, waiting for this session's round-robin turn until the deadline"""
+        ticket = object()
+        with self._condition:
+            self._waiting.setdefault(session_id, deque()).append(ticket)
+            while self._in_use >= self.max_concurrency or not self._is_next(session_id, ticket):
+                if deadline is not None and deadline.expired():
+                    self._withdraw(session_id, ticket)
+                    deadline.check("Waiting for an LLM slot")
+                self._condition.wait(None if deadline is None else deadline.remaining())
+            tickets = self._waiting.pop(session_id)
+            tickets.popleft()
+            if tickets:
+                # Back of the line until every other waiting session had a turn
+                self._waiting[session_id] = tickets
+            self._in_use += 1
+            self._condition.notify_all()
+        lease = SlotLease(self._release)
+        try:
+            yield lease
+        finally:
+            lease.close()
+
+    def _release(self):
+        with self._condition:
+            self._in_use -= 1
+            self._condition.notify_all()
+
+    def _withdraw(self, session_id: Hashable, ticket: object):
+        """Remove a ticket whose caller gave up, letting the next waiter in"""
+        tickets = self._waiting[session_id]
+        tickets.remove(ticket)
+        if not tickets:
+            del self._waiting[session_id]
+        self._condition.notify_all()
+
+    def _is_next(self, session_id: Hashable, ticket: object) -> bool:
+        first_session = next(iter(self._waiting))
+        return first_session == session_id and self._waiting[session_id][0] is ticket
+
+    def run(self, session_id: Hashable, key: Hashable, generate: Callable[[SlotLease], str],
+            deadline: Optional[Deadline] = None) -> str:
+        """Return generate(lease) for this key, sharing the result with identical calls in flight"""
+        future, leader = self._join_flight(key)
+        if not leader:
+            return self._shared_result(future, deadline)
+
+        try:
+            with self.slot(session_id, deadline) as lease:
+                result = generate(lease)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._leave_flight(key)
+
+    def stream(self, session_id: Hashable, key: Hashable, generate: Callable[[SlotLease], Iterator[str]],
+               deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """Stream generate(lease) for this key; callers joining an identical generation get its full text at once"""
+        future, leader = self._join_flight(key)
+        if not leader:
+            yield self._shared_result(future, deadline)
+            return
+
+        chunks = []
+        try:
+            with self.slot(session_id, deadline) as lease:
+                for chunk in generate(lease):
+                    chunks.append(chunk)
+                    yield chunk
+            future.set_result("".join(chunks))
+        except BaseException as e:
+            # Includes the consumer closing the stream early, so waiters are not left hanging
+            future.set_exception(e if isinstance(e, Exception) else RuntimeError("Generation was cancelled"))
+            raise
+        finally:
+            self._leave_flight(key)
+
+    def _shared_result(self, future: Future, deadline: Optional[Deadline]) -> str:
+        """Wait for another caller's generation, giving up at the deadline"""
+        try:
+            return future.result(None if deadline is None else deadline.remaining())
+        except FutureTimeoutError:
+            raise DeadlineExceeded(f"Identical LLM call did not finish within the {deadline.seconds:.1f}s deadline")
+
+    def _join_flight(self, key: Hashable):
+        with self._flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        metrics.record_cache('in_flight', not leader)
+        return future, leader
+
+    def _leave_flight(self, key: Hashable):
+        with self._flight_lock:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Calls running, waiting and distinct prompts in flight"""
+        with self._condition:
+            waiting = sum(len(tickets) for tickets in self._waiting.values())
+            running = self._in_use
+        with self._flight_lock:
+            in_flight = len(self._in_flight)
+        return {'running': running, 'waiting': waiting, 'in_flight': in_flight}
@@ -0,0 +1,307 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# src/.cache/tickets.duckdb, wherever the app is started from
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  ".cache", "tickets.duckdb")
+
+# Time buckets of the volume chart, by ChartAggregator granularity rule
+DATE_TRUNC_UNITS = {'D': 'day', 'W': 'week', 'M': 'month'}
+
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class TicketStore:
+    """Processed datasets in an embedded DuckDB file, queried without loading them into memory.
+
+    Each dataset is one table keyed like the dataset cache. Filtering, sorting, paging and
+    chart aggregation run as SQL and only their results are materialized as frames, so a
+    session holding a large dataset keeps little more than the current page or product in RAM.
+    Datasets survive Streamlit reruns and are shared by sessions that upload the same data;
+    the least recently used ones are dropped past max_datasets.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_datasets: int = 8,
+                 memory_limit: Optional[str] = "1GB"):
+        import duckdb
+        path = path or DEFAULT_STORE_PATH
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_datasets = max_datasets
+        self._connection = duckdb.connect(path)
+        if memory_limit is not None:
+            # Larger sorts and aggregations spill to disk instead of growing the process
+            self._connection.execute(f"SET memory_limit = '{memory_limit}'")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS datasets ("
+            "name VARCHAR PRIMARY KEY, dataset_key VARCHAR, products VARCHAR, columns VARCHAR, "
+            "rows BIGINT, last_used DOUBLE, report VARCHAR)"
+        )
+        self._lock = threading.Lock()
+
+    def _cursor(self):
+        # Connections are not thread-safe; a cursor per call lets background jobs query concurrently
+        return self._connection.cursor()
+
+    @staticmethod
+    def table_name(dataset_key: str) -> str:
+        return "tickets_" + hashlib.sha256(dataset_key.encode()).hexdigest()[:16]
+
+    def contains(self, dataset_key: str) -> bool:
+        """Whether the dataset is stored, marking it as recently used"""
+        with self._lock, self._cursor() as con:
+            con.execute("UPDATE datasets SET last_used = ? WHERE name = ?",
+                        [time.time(), self.table_name(dataset_key)])
+            return con.execute("SELECT count(*) FROM datasets WHERE name = ?",
+                               [self.table_name(dataset_key)]).fetchone()[0] > 0
+
+    def put(self, dataset_key: str, df: pd.DataFrame, products: List[Any],
+            report: Optional[List[Dict[str, Any]]] = None):
+        """Store a processed dataset with its product order and evict least recently used ones"""
+        import pyarrow as pa
+        name = self.table_name(dataset_key)
+        # Arrow keeps string columns zero-copy on the way into DuckDB
+        frame = pa.Table.from_pandas(df, preserve_index=False)
+        with self._lock, self._cursor() as con:
+            con.register("frame", frame)
+            try:
+                con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM frame")
+            finally:
+                con.unregister("frame")
+            self._register(con, name, dataset_key, products, list(df.columns), len(df), report)
+
+    def put_frames(self, dataset_key: str, frames: Iterable[pd.DataFrame],
+                   report: Optional[List[Dict[str, Any]]] = None) -> int:
+        """Store a processed dataset arriving as frames, e.g. one per uploaded file, and return its row count.
+
+        Each frame is appended to a staging table as it arrives, so only one is in memory at a
+        time; columns missing from a frame are NULL for its rows. The table is then sorted by
+        PRODUCT and ACCEPTANCE_TIME in DuckDB, the order put() receives from DataController.
+        Nothing is stored when the frames hold no rows. The report is read once every frame is
+        consumed, so the frames' producer may fill it.
+        """
+        import pyarrow as pa
+        name = self.table_name(dataset_key)
+        staging = f"{name}_{uuid.uuid4().hex[:8]}"
+        products: Dict[str, None] = {}
+        columns: List[str] = []
+        # Staging runs outside the store lock, since frames may be parsed while they are consumed
+        with self._cursor() as con:
+            try:
+                for df in frames:
+                    if df.empty:
+                        continue
+                    if 'PRODUCT' in df.columns:
+                        products.update(dict.fromkeys(str(product) for product in pd.unique(df['PRODUCT'].dropna())))
+                    con.register("frame", pa.Table.from_pandas(df, preserve_index=False))
+                    try:
+                        if not columns:
+                            con.execute(f"CREATE TABLE {staging} AS SELECT * FROM frame")
+                        else:
+                            for col, col_type, *_ in con.execute("DESCRIBE SELECT * FROM frame").fetchall():
+                                if col not in columns:
+                                    con.execute(f'ALTER TABLE {staging} ADD COLUMN "{col}" {col_type}')
+                            con.execute(f"INSERT INTO {staging} BY NAME SELECT * FROM frame")
+                    finally:
+                        con.unregister("frame")
+                    columns += [str(col) for col in df.columns if str(col) not in columns]
+                if not columns:
+                    return 0
+
+                order = ["PRODUCT NULLS LAST" if 'PRODUCT' in columns else None,
+                         "ACCEPTANCE_TIME NULLS LAST" if 'ACCEPTANCE_TIME' in columns else None, "rowid"]
+                with self._lock:
+                    con.execute(f"CREATE OR REPLACE TABLE {name} AS SELECT * FROM {staging} "
+                                f"ORDER BY {', '.join(column for column in order if column)}")
+                    rows = con.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+                    self._register(con, name, dataset_key, list(products), columns, rows, report)
+                return rows
+            finally:
+                con.execute(f"DROP TABLE IF EXISTS {staging}")
+
+    def _register(self, con, name: str, dataset_key: str, products: List[Any], columns: List[Any], rows: int,
+                  report: Optional[List[Dict[str, Any]]]):
+        con.execute("INSERT OR REPLACE INTO datasets (name, dataset_key, products, columns, rows, last_used, report) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [name, dataset_key, json.dumps([str(product) for product in products]),
+                     json.dumps([str(col) for col in columns]), rows, time.time(),
+                     json.dumps(report) if report is not None else None])
+        self._evict(con)
+
+    def _evict(self, con):
+        stale = con.execute("SELECT name FROM datasets ORDER BY last_used DESC OFFSET ?",
+                            [self.max_datasets]).fetchall()
+        for (name,) in stale:
+            con.execute(f"DROP TABLE IF EXISTS {name}")
+            con.execute("DELETE FROM datasets WHERE name = ?", [name])
+
+    def clear(self):
+        """Drop every stored dataset"""
+        with self._lock, self._cursor() as con:
+            for (name,) in con.execute("SELECT name FROM datasets").fetchall():
+                con.execute(f"DROP TABLE IF EXISTS {name}")
+            con.execute("DELETE FROM datasets")
+
+    def info(self, dataset_key: str) -> Dict[str, Any]:
+        """Row count, columns, product order (first appearance in the upload) and parse report of a dataset"""
+        with self._cursor() as con:
+            products, columns, rows, report = con.execute(
+                "SELECT products, columns, rows, report FROM datasets WHERE name = ?", [self.table_name(dataset_key)]
+            ).fetchone()
+        return {'rows': rows, 'columns': json.loads(columns), 'products': json.loads(products),
+                'report': json.loads(report) if report is not None else None}
+
+    def frame(self, dataset_key: str) -> pd.DataFrame:
+        """The whole dataset as a frame; only for callers that really need every row"""
+        with self._cursor() as con:
+            return con.execute(f"SELECT * FROM {self.table_name(dataset_key)} ORDER BY rowid").df()
+
+    def product_data(self, dataset_key: str, product: Any) -> pd.DataFrame:
+        """One product's tickets in time order, the same slice DataController's product index returns"""
+        columns = self.info(dataset_key)['columns']
+        order = "ACCEPTANCE_TIME NULLS LAST, rowid" if 'ACCEPTANCE_TIME' in columns else "rowid"
+        with self._cursor() as con:
+            return con.execute(
+                f"SELECT * FROM {self.table_name(dataset_key)} WHERE PRODUCT = ? ORDER BY {order}", [str(product)]
+            ).df()
+
+    def date_range(self, dataset_key: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        if 'ACCEPTANCE_TIME' not in self.info(dataset_key)['columns']:
+            return None
+        with self._cursor() as con:
+            first, last = con.execute(
+                f"SELECT min(ACCEPTANCE_TIME), max(ACCEPTANCE_TIME) FROM {self.table_name(dataset_key)}"
+            ).fetchone()
+        return None if first is None else (pd.Timestamp(first), pd.Timestamp(last))
+
+    def _where(self, columns: List[str], products: Optional[List[Any]] = None,
+               start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+               order_search: str = "") -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if products is not None:
+            clauses.append("PRODUCT IN (SELECT unnest(?::VARCHAR[]))")
+            params.append([str(product) for product in products])
+        if 'ACCEPTANCE_TIME' in columns:
+            if start is not None:
+                clauses.append("ACCEPTANCE_TIME >= ?")
+                params.append(pd.Timestamp(start).to_pydatetime())
+            if end is not None:
+                clauses.append("ACCEPTANCE_TIME <= ?")
+                params.append(pd.Timestamp(end).to_pydatetime())
+        if order_search and 'ORDER_NUMBER' in columns:
+            clauses.append("contains(lower(CAST(ORDER_NUMBER AS VARCHAR)), lower(?))")
+            params.append(order_search)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _order_by(self, columns: List[str], sort_by: Optional[str], ascending: bool) -> str:
+        # Without a sort column, rows come in DataController's product and time order
+        default = ["PRODUCT"] + (["ACCEPTANCE_TIME NULLS LAST"] if 'ACCEPTANCE_TIME' in columns else []) + ["rowid"]
+        if sort_by is not None and sort_by in columns:
+            default.insert(0, f'"{sort_by}" {"ASC" if ascending else "DESC"} NULLS LAST')
+        return " ORDER BY " + ", ".join(default)
+
+    def count(self, dataset_key: str, sort_by: Optional[str] = None, ascending: bool = True, **filters) -> int:
+        """Number of rows matching the filters; the sort arguments are accepted and ignored"""
+        where, params = self._where(self.info(dataset_key)['columns'], **filters)
+        with self._cursor() as con:
+            return con.execute(f"SELECT count(*) FROM {self.table_name(dataset_key)}{where}", params).fetchone()[0]
+
+    def query(self, dataset_key: str, page: int = 0, page_size: int = 100, sort_by: Optional[str] = None,
+              ascending: bool = True, **filters) -> Tuple[pd.DataFrame, int]:
+        """One page of the filtered and sorted rows, plus the number of matching rows"""
+        columns = self.info(dataset_key)['columns']
+        where, params = self._where(columns, **filters)
+        order_by = self._order_by(columns, sort_by, ascending)
+        name = self.table_name(dataset_key)
+        with self._cursor() as con:
+            total = con.execute(f"SELECT count(*) FROM {name}{where}", params).fetchone()[0]
+            page_df = con.execute(f"SELECT * FROM {name}{where}{order_by} LIMIT ? OFFSET ?",
+                                  params + [page_size, page * page_size]).df()
+        return page_df, total
+
+    def export(self, dataset_key: str, path: str, file_format: str = "csv", sort_by: Optional[str] = None,
+               ascending: bool = True, **filters):
+        """Write the filtered rows to a CSV or Parquet file straight from DuckDB"""
+        if file_format not in ("csv", "parquet"):
+            raise ValueError(f"Unsupported export format '{file_format}'")
+        columns = self.info(dataset_key)['columns']
+        where, params = self._where(columns, **filters)
+        order_by = self._order_by(columns, sort_by, ascending)
+        options = "FORMAT CSV, HEADER" if file_format == "csv" else "FORMAT PARQUET"
+        with self._cursor() as con:
+            con.execute(f"COPY (SELECT * FROM {self.table_name(dataset_key)}{where}{order_by}) "
+                        f"TO '{path.replace(chr(39), chr(39) * 2)}' ({options})", params)
+
+    def span_days(self, dataset_key: str) -> Optional[int]:
+        """Days between the first and last ticket, inclusive"""
+        date_range = self.date_range(dataset_key)
+        if date_range is None:
+            return None
+        return (date_range[1].normalize() - date_range[0].normalize()).days + 1
+
+    def volume_counts(self, dataset_key: str, rule: str) -> pd.DataFrame:
+        """Ticket counts per day, week (from Monday) or month and product"""
+        with self._cursor() as con:
+            counts = con.execute(
+                f"SELECT CAST(date_trunc('{DATE_TRUNC_UNITS[rule]}', ACCEPTANCE_TIME) AS TIMESTAMP) AS DATE, "
+                f"PRODUCT, count(*) AS COUNT FROM {self.table_name(dataset_key)} "
+                f"WHERE ACCEPTANCE_TIME IS NOT NULL AND PRODUCT IS NOT NULL "
+                f"GROUP BY ALL ORDER BY DATE, PRODUCT"
+            ).df()
+        counts['PRODUCT'] = counts['PRODUCT'].astype(object)
+        return counts
+
+    def resolution_summary(self, dataset_key: str, max_outliers: int) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """Box plot statistics and the most extreme outliers per product, as ChartAggregator computes them"""
+        columns = self.info(dataset_key)['columns']
+        if 'RESOLUTION_HOURS' in columns:
+            hours = "RESOLUTION_HOURS"
+        elif 'COMPLETION_TIME' in columns and 'ACCEPTANCE_TIME' in columns:
+            hours = "epoch(COMPLETION_TIME - ACCEPTANCE_TIME) / 3600"
+        else:
+            return None
+
+        query = f"""
+            WITH hours AS (
+                SELECT PRODUCT, {hours} AS H FROM {self.table_name(dataset_key)}
+                WHERE PRODUCT IS NOT NULL AND {hours} IS NOT NULL AND NOT isnan({hours})
+            ),
+            quartiles AS (
+                SELECT PRODUCT, count(*) AS COUNT, quantile_cont(H, 0.25) AS Q1,
+                       quantile_cont(H, 0.5) AS MEDIAN, quantile_cont(H, 0.75) AS Q3
+                FROM hours GROUP BY PRODUCT
+            ),
+            fenced AS (
+                SELECT h.PRODUCT, h.H, q.Q1 - 1.5 * (q.Q3 - q.Q1) AS LOW, q.Q3 + 1.5 * (q.Q3 - q.Q1) AS HIGH
+                FROM hours h JOIN quartiles q USING (PRODUCT)
+            )
+        """
+        with self._cursor() as con:
+            summary = con.execute(query + """
+                SELECT q.PRODUCT, q.COUNT, coalesce(w.LOWER_FENCE, q.Q1) AS LOWER_FENCE, q.Q1, q.MEDIAN, q.Q3,
+                       coalesce(w.UPPER_FENCE, q.Q3) AS UPPER_FENCE
+                FROM quartiles q LEFT JOIN (
+                    SELECT PRODUCT, min(H) AS LOWER_FENCE, max(H) AS UPPER_FENCE
+                    FROM fenced WHERE H BETWEEN LOW AND HIGH GROUP BY PRODUCT
+                ) w USING (PRODUCT)
+                ORDER BY q.PRODUCT
+            """).df()
+            outliers = con.execute(query + """
+                SELECT PRODUCT, H AS RESOLUTION_HOURS FROM fenced
+                WHERE H < LOW OR H > HIGH
+                QUALIFY row_number() OVER (PARTITION BY PRODUCT ORDER BY greatest(LOW - H, H - HIGH) DESC) <= ?
+                ORDER BY PRODUCT
+            """, [max_outliers]).df()
+        summary['PRODUCT'] = summary['PRODUCT'].astype(object)
+        outliers['PRODUCT'] = outliers['PRODUCT'].astype(object)
+        return summary, outliers
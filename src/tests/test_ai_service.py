@@ -0,0 +1,60 @@
+import time
+import pytest
+from benchmarks.mock_ollama import MockOllamaServer
+from benchmarks.stub_llm import StubAIService, StubLLM
+from services.ai_service import AIService
+from services.deadline import Deadline, DeadlineExceeded
+from services.summary_worker import SummaryWorker
+
+pytest.importorskip("langchain_ollama")
+
+def test_abandoned_call_keeps_its_slot_until_the_model_stops():
+    worker = SummaryWorker(max_concurrency=1)
+    with MockOllamaServer(first_token_latency=0.5, tokens_per_second=100, response_tokens=5) as server:
+        service = AIService("mistral", worker=worker, base_url=server.url)
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            service.generate_summary("slow prompt", Deadline(0.1))
+        assert time.perf_counter() - started < 0.4
+        # The generation still runs on the server and still holds the shared slot
+        assert worker.stats()['running'] == 1
+        for _ in range(50):
+            if worker.stats()['running'] == 0 and server.stats()['active'] == 0:
+                break
+            time.sleep(0.05)
+        assert worker.stats()['running'] == 0
+        assert server.stats()['active'] == 0
+        # The server stopped generating once the helper dropped the connection
+        assert server.stats()['tokens'] < 5
+
+def test_call_within_deadline_returns_the_reply():
+    with MockOllamaServer(first_token_latency=0.0, tokens_per_second=1000, response_tokens=5) as server:
+        service = AIService("mistral", worker=SummaryWorker(), base_url=server.url)
+        assert service.generate_summary("prompt", Deadline(10)).strip()
+
+class FailingLLM(StubLLM):
+    """Fails on one prompt and answers the earlier prompts last, so completion order differs from input order"""
+    
+    def __init__(self, failing_prompt):
+        super().__init__()
+        self.failing_prompt = failing_prompt
+    
+    def invoke(self, messages, **kwargs):
+        prompt = messages[-1].content
+        if prompt == self.failing_prompt:
+            raise ConnectionError("model crashed")
+        time.sleep(0.05 / (1 + int(prompt.split()[-1])))
+        return super().invoke(messages, **kwargs)
+
+def test_generate_summaries_keeps_order_and_reports_failures_per_prompt():
+    prompts = [f"prompt {i}" for i in range(8)]
+    service = StubAIService(max_concurrency=4)
+    service._llm = FailingLLM(failing_prompt="prompt 3")
+    reference = StubAIService()
+    expected = {prompt: reference.generate_summary(prompt) for prompt in prompts if prompt != "prompt 3"}
+
+    results = service.generate_summaries(prompts, max_concurrency=4)
+
+    assert [summary for summary, _ in results] == [expected.get(prompt) for prompt in prompts]
+    assert [error is None for _, error in results] == [prompt != "prompt 3" for prompt in prompts]
+    assert "model crashed" in results[3][1]
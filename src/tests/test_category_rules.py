@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.synthetic import generate_frame
+from models.category_mapper import CategoryMapper, DEFAULT_CATEGORY_MAP, DEFAULT_RULES_PATH
+from models.category_rules import CategoryRuleEngine, NO_MATCH
+
+RULES = [
+    {'product': 'Fibre', 'column': 'SERVICE_CATEGORY', 'match': 'exact', 'values': ['NET-FTTH']},
+    {'product': 'Broadband', 'column': 'SERVICE_CATEGORY', 'match': 'prefix', 'values': ['NET', 'KAI']},
+    {'product': 'TV', 'column': 'SERVICE_CATEGORY', 'match': 'regex', 'values': [r'^KA[DV]\d*$']},
+    {'product': 'Hardware', 'column': 'ORDER_DESCRIPTION_1', 'match': 'keyword', 'values': ['router', 'modem']},
+]
+
+def products(engine, df):
+    return engine.products_for(engine.rule_indices(df)).tolist()
+
+def test_first_matching_rule_wins_across_match_types():
+    engine = CategoryRuleEngine(RULES)
+    df = pd.DataFrame({
+        'SERVICE_CATEGORY': ['NET-FTTH', 'NET-DSL', 'KAD7', 'KADX', 'XXX', 'KAI'],
+        'ORDER_DESCRIPTION_1': ['router down', 'router down', 'modem', 'Replace ROUTER', 'no signal', ''],
+    })
+    # Exact before prefix, prefix and regex before the keyword rule, keyword when nothing earlier matches
+    assert products(engine, df) == ['Fibre', 'Broadband', 'TV', 'Hardware', None, 'Broadband']
+
+def test_keywords_match_whole_words_in_any_case():
+    engine = CategoryRuleEngine([RULES[3]])
+    df = pd.DataFrame({'ORDER_DESCRIPTION_1': ['ROUTER reset', 'new Modem.', 'routers', 'submodem']})
+    assert products(engine, df) == ['Hardware', 'Hardware', None, None]
+
+def test_regex_with_capturing_groups_or_backreferences_is_rejected():
+    for pattern in [r'^(KA)D$', r'^(?P<code>K)A\1$', r'^(.)\1$']:
+        with pytest.raises(ValueError, match="non-capturing"):
+            CategoryRuleEngine([{'product': 'TV', 'match': 'regex', 'values': [pattern]}])
+    CategoryRuleEngine([{'product': 'TV', 'match': 'regex', 'values': [r'^(?:KA)D$']}])
+
+def test_unmapped_policies():
+    df = pd.DataFrame({'SERVICE_CATEGORY': ['KAI', 'XXX', 'KAV']})
+    rules = {'KAI': 'Broadband', 'KAV': 'Voice'}
+
+    dropped = CategoryMapper(rules=CategoryRuleEngine.from_mapping(rules, unmapped='drop')).map_categories(df)
+    assert dropped['PRODUCT'].tolist() == ['Broadband', 'Voice']
+
+    labelled = CategoryMapper(rules=CategoryRuleEngine.from_mapping(
+        rules, unmapped='label', unmapped_label='Other')).map_categories(df)
+    assert labelled['PRODUCT'].tolist() == ['Broadband', 'Other', 'Voice']
+
+    with pytest.raises(ValueError, match="1 rows match no category rule"):
+        CategoryMapper(rules=CategoryRuleEngine.from_mapping(rules, unmapped='error')).map_categories(df)
+
+def test_distinct_values_are_matched_once():
+    engine = CategoryRuleEngine(RULES)
+    engine.match_values('SERVICE_CATEGORY', ['NET-DSL', 'XXX'])
+    assert engine._memo['SERVICE_CATEGORY'] == {'NET-DSL': 1, 'XXX': NO_MATCH}
+
+    # A memoized value is not matched against the pattern again
+    engine._patterns['SERVICE_CATEGORY'] = None
+    assert engine.match_values('SERVICE_CATEGORY', ['NET-DSL', 'XXX']).tolist() == [1, NO_MATCH]
+
+def test_shipped_rules_match_the_original_mapping():
+    df = generate_frame(5_000, seed=4)
+    mapped = CategoryMapper(rules_path=DEFAULT_RULES_PATH).map_categories(df)
+
+    # The original mapper used Series.map, leaving unknown categories without a product
+    original = df.assign(PRODUCT=df['SERVICE_CATEGORY'].map(DEFAULT_CATEGORY_MAP)).dropna(subset=['PRODUCT'])
+    assert mapped.index.tolist() == original.index.tolist()
+    assert np.array_equal(mapped['PRODUCT'].to_numpy(), original['PRODUCT'].to_numpy())
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from models.chart_aggregator import ChartAggregator, QuantileSketch
+
+def tickets(hours_by_product):
+    return pd.DataFrame({
+        'PRODUCT': [product for product, hours in hours_by_product.items() for _ in hours],
+        'RESOLUTION_HOURS': np.concatenate(list(hours_by_product.values())),
+    })
+
+def test_exact_quartiles_match_numpy():
+    rng = np.random.default_rng(0)
+    hours = {'Voice': rng.lognormal(2, 1, 999), 'TV': rng.exponential(5, 10)}
+    summary, _ = ChartAggregator().resolution_summary(tickets(hours))
+
+    for row in summary.itertuples():
+        assert row.COUNT == len(hours[row.PRODUCT])
+        assert (row.Q1, row.MEDIAN, row.Q3) == tuple(np.quantile(hours[row.PRODUCT], [0.25, 0.5, 0.75]))
+
+def test_outliers_are_capped_to_the_most_extreme():
+    hours = np.concatenate([np.full(300, 10.0), np.arange(1_000.0, 1_050.0)])
+    summary, outliers = ChartAggregator().resolution_summary(tickets({'Voice': hours}))
+
+    assert summary['UPPER_FENCE'].tolist() == [10.0]
+    assert sorted(outliers['RESOLUTION_HOURS']) == list(np.arange(1_030.0, 1_050.0))
+
+@pytest.mark.parametrize("span_days, label", [(400, 'Daily'), (401, 'Weekly'), (2_800, 'Weekly'), (2_801, 'Monthly')])
+def test_granularity_switches_at_the_point_limit(span_days, label):
+    times = pd.Timestamp('2020-01-01') + pd.to_timedelta([0, span_days - 1], unit='D')
+    counts, chosen = ChartAggregator().volume_counts(pd.DataFrame({'ACCEPTANCE_TIME': times, 'PRODUCT': 'Voice'}))
+
+    assert chosen == label
+    assert counts['COUNT'].sum() == 2
+
+def test_sketch_quantiles_are_within_the_relative_accuracy():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.lognormal(1, 2, 5_000), -rng.lognormal(0, 1, 500), np.zeros(50)])
+    sketch = QuantileSketch.from_values(values, relative_accuracy=0.01)
+
+    for q in np.linspace(0, 1, 41):
+        exact = np.quantile(values, q, method='lower')
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.01, abs=sketch.min_value)
+
+def test_merged_sketches_equal_one_sketch_of_all_values():
+    rng = np.random.default_rng(2)
+    first, second = rng.lognormal(1, 1, 1_000), rng.lognormal(3, 1, 300)
+    merged = QuantileSketch.from_values(first).merge(QuantileSketch.from_values(second))
+    whole = QuantileSketch.from_values(np.concatenate([first, second]))
+
+    assert (merged.count, merged.min, merged.max) == (whole.count, whole.min, whole.max)
+    assert [merged.quantile(q) for q in (0.1, 0.5, 0.9)] == [whole.quantile(q) for q in (0.1, 0.5, 0.9)]
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.05))
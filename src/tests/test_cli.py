@@ -0,0 +1,50 @@
+import json
+import cli
+from benchmarks.stub_llm import StubLLM
+from benchmarks.synthetic import generate_dump
+from services.ai_service import AIService
+
+# The only ticket line that fails: the first ticket of the dump that starts in 2025
+FAILING_TICKET = "Ticket 100000 (2025-"
+
+class StubModelService(AIService):
+    """AIService answered by StubLLM, failing the one section that lists FAILING_TICKET"""
+
+    def _initialize_llm(self):
+        if self._llm is None:
+            self._llm = StubLLM()
+
+    def _invoke(self, prompt):
+        if FAILING_TICKET in prompt:
+            raise ConnectionError("model crashed")
+        return super()._invoke(prompt)
+
+def test_main_writes_reports_and_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr("controllers.summary_controller.AIService", StubModelService)
+    dumps, output = tmp_path / "dumps", tmp_path / "reports"
+    dumps.mkdir()
+    (dumps / "january.txt").write_text(generate_dump(300, seed=1))
+    (dumps / "next_year.txt").write_text(generate_dump(200, seed=2, start='2025-01-01'))
+
+    exit_code = cli.main([str(dumps), "--output", str(output), "--workers", "1", "--no-cache",
+                          "--num-sections", "3"])
+
+    assert exit_code == 0
+    manifest = json.loads((output / "manifest.json").read_text())
+    assert [(entry['path'], entry['status']) for entry in manifest['dumps']] == [
+        (str(dumps / "january.txt"), 'ok'), (str(dumps / "next_year.txt"), 'partial')]
+    assert [len(entry['failures']) for entry in manifest['dumps']] == [0, 1]
+    assert (output / "metrics.prom").exists()
+
+    for name, entry in zip(["january", "next_year"], manifest['dumps']):
+        report_dir = output / name
+        assert entry['output'] == str(report_dir)
+        assert sorted(path.name for path in report_dir.iterdir()) == sorted(
+            f"{cli._safe_name(product)}{suffix}" for product in entry['products'] for suffix in (".md", ".json"))
+        for product in entry['products']:
+            report = json.loads((report_dir / f"{cli._safe_name(product)}.json").read_text())
+            assert report['product'] == product
+            assert sum(section['tickets'] for section in report['sections']) > 0
+            errors = [section['error'] for section in report['sections'] if section['error']]
+            assert len(errors) == sum(failure['product'] == product for failure in entry['failures'])
+            assert "## " in (report_dir / f"{cli._safe_name(product)}.md").read_text()
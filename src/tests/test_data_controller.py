@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import generate_dump
+from controllers.data_controller import DataController
+from models.data_loader import DataLoader
+
+def load(query_cache):
+    data_controller = DataController(single_pass=True, query_cache=query_cache)
+    data_controller.process_data(DataLoader().load_from_text(generate_dump(500, seed=2)))
+    return data_controller
+
+def test_query_cache_outlives_the_controller():
+    query_cache = {}
+    first = load(query_cache)
+    first.dataset_id = "upload"
+    positions = first.query_positions(sort_by='ORDER_NUMBER')
+
+    # A rerun builds a new controller for the same upload and pages through the same query
+    second = load(query_cache)
+    second.dataset_id = "upload"
+    assert second.query_positions(sort_by='ORDER_NUMBER') is positions
+
+def test_query_cache_is_not_reused_for_other_data():
+    query_cache = {}
+    first = load(query_cache)
+    first.dataset_id = "upload"
+    positions = first.query_positions(sort_by='ORDER_NUMBER')
+
+    second = load(query_cache)
+    assert second.dataset_id is None
+    assert second.query_positions(sort_by='ORDER_NUMBER') is not positions
+    second.dataset_id = "other upload"
+    reloaded = second.query_positions(sort_by='ORDER_NUMBER')
+    assert reloaded is not positions
+    assert np.array_equal(reloaded, positions)
+
+def test_single_pass_maps_the_same_values_as_the_copying_path():
+    raw = DataLoader().load_from_text(generate_dump(500, seed=3))
+    copying = DataController()
+    copying.process_data(raw.copy())
+    single_pass = DataController(single_pass=True)
+    single_pass.process_data(raw)
+
+    # Unmapped categories are dropped, so the in-place path goes through the filtering branch too
+    assert len(single_pass.mapped_df) < len(raw)
+    pd.testing.assert_frame_equal(single_pass.mapped_df, copying.mapped_df, check_dtype=False, check_categorical=False)
+    assert single_pass.get_stats()['products'] == copying.get_stats()['products']
+
+def test_single_pass_leaves_the_callers_tickets_intact():
+    raw = DataLoader().load_from_text(generate_dump(500, seed=3))
+    before = raw.copy()
+
+    DataController(single_pass=True).process_data(raw)
+
+    # Only the documented in-place change is visible: the date columns are parsed
+    for col in ['ACCEPTANCE_TIME', 'COMPLETION_TIME']:
+        before[col] = pd.to_datetime(before[col], errors='coerce')
+    pd.testing.assert_frame_equal(raw, before)
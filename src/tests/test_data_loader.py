@@ -0,0 +1,25 @@
+import io
+from models.data_loader import DataLoader, PIPELINE_COLUMNS, PIPELINE_DTYPES
+
+# UTF-8 throughout the sniffed sample, then a cp1252 row further into the file
+HEAD = "ORDER_NUMBER\tORDER_DESCRIPTION_1\tSERVICE_CATEGORY\n" + "".join(f"{i}\tplain text\tA\n" for i in range(5000))
+DUMP = HEAD.encode() + "9999\tcafé € failure\tB\n".encode('cp1252')
+
+def test_bytes_past_the_sniffed_sample_fall_back_to_cp1252():
+    for engine in ["pyarrow", "c"]:
+        df = DataLoader(engine=engine, sniff_bytes=1024).load_from_buffer(io.BytesIO(DUMP))
+        assert len(df) == 5001
+        assert df['ORDER_DESCRIPTION_1'].iloc[-1] == "café € failure"
+
+def test_pipeline_columns_fall_back_to_cp1252(tmp_path):
+    path = tmp_path / "dump.txt"
+    path.write_bytes(DUMP)
+    df = DataLoader(usecols=PIPELINE_COLUMNS, dtype=PIPELINE_DTYPES, sniff_bytes=1024).load_from_path(str(path))
+    assert df['ORDER_DESCRIPTION_1'].iloc[-1] == "café € failure"
+    assert df['SERVICE_CATEGORY'].dtype == 'category'
+
+def test_empty_text_fields_are_missing_with_either_engine():
+    dump = b"ORDER_NUMBER\tCOMPLETION_RESULT_KB\n1\t\n2\tReset\n"
+    for engine in ["pyarrow", "c"]:
+        df = DataLoader(usecols=PIPELINE_COLUMNS, dtype=PIPELINE_DTYPES, engine=engine).load_from_buffer(io.BytesIO(dump))
+        assert df['COMPLETION_RESULT_KB'].isna().tolist() == [True, False]
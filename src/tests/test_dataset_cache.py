@@ -0,0 +1,34 @@
+import os
+import pandas as pd
+from services.dataset_cache import DatasetCache, DEFAULT_CACHE_DIR
+
+def test_default_directory_is_under_src(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert DEFAULT_CACHE_DIR == os.path.join(src, ".cache", "datasets")
+
+def test_put_and_get_with_report(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    df = pd.DataFrame({'PRODUCT': ['Voice', 'TV'], 'ROWS': [1, 2]})
+    cache.put("fp", df, [{'file': 'dump.txt', 'status': 'parsed'}])
+    assert cache.get("fp").equals(df)
+    assert cache.get_report("fp") == [{'file': 'dump.txt', 'status': 'parsed'}]
+
+def test_failed_write_is_ignored_and_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = DatasetCache(str(tmp_path))
+
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "replace", disk_full)
+    cache.put("fp", pd.DataFrame({'PRODUCT': ['Voice']}), [{'file': 'dump.txt'}])
+    assert os.listdir(tmp_path) == []
+
+def test_eviction_keeps_the_most_recent_entries_and_their_reports(tmp_path):
+    cache = DatasetCache(str(tmp_path), max_entries=2)
+    for i in range(3):
+        cache.put(f"fp{i}", pd.DataFrame({'ROWS': [i]}), [])
+        os.utime(cache._path(f"fp{i}"), (i, i))
+    cache.put("fp3", pd.DataFrame({'ROWS': [3]}), [])
+    assert [cache.get(f"fp{i}") is not None for i in range(4)] == [False, False, True, True]
+    assert len(os.listdir(tmp_path)) == 4
@@ -0,0 +1,28 @@
+import time
+import pytest
+from services.deadline import Deadline, DeadlineExceeded
+
+def test_after_without_seconds_is_no_deadline():
+    assert Deadline.after(None) is None
+    assert Deadline.after(0) is None
+
+def test_remaining_counts_down_and_never_goes_negative():
+    deadline = Deadline(0.05)
+    assert 0 < deadline.remaining() <= 0.05
+    time.sleep(0.06)
+    assert deadline.remaining() == 0.0
+    assert deadline.expired()
+
+def test_within_keeps_the_earlier_deadline():
+    run = Deadline(10)
+    assert run.within(None) is run
+    assert run.within(60) is run
+    call = run.within(1)
+    assert call is not run and call.remaining() <= 1
+
+def test_check_raises_once_expired():
+    Deadline(10).check()
+    deadline = Deadline(0)
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+    assert issubclass(DeadlineExceeded, TimeoutError)
@@ -0,0 +1,19 @@
+import io
+from benchmarks.synthetic import generate_dump
+from controllers.file_controller import FileController
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+def test_worker_results_match_in_process_parsing():
+    uploads = [Upload(f"dump{seed}.txt", generate_dump(300, seed=seed).encode()) for seed in range(3)]
+
+    parallel, report = FileController(max_workers=3).load_uploaded_files(uploads)
+    serial, _ = FileController(max_workers=1).load_uploaded_files(uploads)
+
+    assert [entry['status'] for entry in report] == ['parsed'] * 3
+    assert len(parallel) == sum(entry['rows'] for entry in report)
+    assert parallel.dtypes.equals(serial.dtypes)
+    assert parallel.equals(serial)
@@ -0,0 +1,25 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from services.history_store import HistoryStore
+
+def test_section_summaries_survive_a_restart(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.put_section_summary("Voice", "Initial Issues", "fp1", "summary 1")
+    store.put_section_summary("TV", "Initial Issues", "fp2", "summary 2")
+
+    reopened = HistoryStore(str(tmp_path))
+    assert reopened.get_section_summary("Voice", "Initial Issues", "fp1") == "summary 1"
+    assert reopened.get_section_summary("TV", "Initial Issues", "fp2") == "summary 2"
+    assert reopened.get_section_summary("TV", "Initial Issues", "changed") is None
+
+def test_each_product_is_written_to_its_own_file(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    with ThreadPoolExecutor(8) as pool:
+        for product in ("Voice", "TV"):
+            for i in range(20):
+                pool.submit(store.put_section_summary, product, f"section {i}", "fp", f"{product} {i}")
+    assert len(os.listdir(tmp_path / "sections")) == 2
+
+    reopened = HistoryStore(str(tmp_path))
+    assert all(reopened.get_section_summary(product, f"section {i}", "fp") == f"{product} {i}"
+               for product in ("Voice", "TV") for i in range(20))
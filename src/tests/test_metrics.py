@@ -0,0 +1,28 @@
+import os
+from services.metrics import PipelineMetrics
+
+def test_export_skips_when_nothing_was_recorded(tmp_path):
+    metrics = PipelineMetrics()
+    metrics.record_stage('parse', 0.1)
+    assert metrics.export(str(tmp_path))
+    assert not metrics.export(str(tmp_path))
+    metrics.record_stage('parse', 0.1)
+    assert metrics.export(str(tmp_path))
+    with open(tmp_path / "metrics.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+def test_export_waits_for_min_interval(tmp_path):
+    metrics = PipelineMetrics()
+    metrics.record_stage('parse', 0.1)
+    assert metrics.export(str(tmp_path), min_interval=60)
+    metrics.record_stage('parse', 0.1)
+    assert not metrics.export(str(tmp_path), min_interval=60)
+
+def test_jsonl_is_rotated_at_max_size(tmp_path):
+    metrics = PipelineMetrics()
+    for _ in range(3):
+        metrics.record_stage('parse', 0.1)
+        metrics.export(str(tmp_path), max_log_bytes=10)
+    assert os.path.exists(tmp_path / "metrics.jsonl.1")
+    with open(tmp_path / "metrics.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
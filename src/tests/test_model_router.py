@@ -0,0 +1,42 @@
+import pytest
+from services.model_router import ModelRouter
+
+PROMPT = "x" * 12_000  # about 3,000 tokens
+
+@pytest.fixture
+def router():
+    return ModelRouter(model_speeds={'big': 0.25, 'small': 1.0})
+
+def test_prior_over_budget_routes_before_any_call(router):
+    # 'big' is estimated far over a 4 s budget without ever being called
+    assert router.estimate('big', PROMPT) > 4
+    assert router.route(['big', 'small'], [PROMPT], 4.0) is None
+    assert router.route(['big', 'small'], [PROMPT], router.estimate('small', PROMPT)) == 'small'
+
+def test_model_without_prior_or_observations_is_tried(router):
+    assert router.route(['unknown', 'small'], [PROMPT], 0.1) == 'unknown'
+
+def test_first_timeout_never_lowers_the_estimate(router):
+    prior = router.estimate('big', PROMPT)
+    router.observe('big', PROMPT, 1.0, timed_out=True)
+    assert router.estimate('big', PROMPT) == pytest.approx(prior)
+
+def test_timeout_raises_the_estimate(router):
+    prior = router.estimate('small', PROMPT)
+    router.observe('small', PROMPT, prior * 3, timed_out=True)
+    assert router.estimate('small', PROMPT) == pytest.approx(prior * 3)
+    router.observe('small', PROMPT, prior, timed_out=True)
+    assert router.estimate('small', PROMPT) == pytest.approx(prior * 3)
+
+def test_observed_latency_corrects_the_prior(router):
+    prior = router.estimate('small', PROMPT)
+    router.observe('small', PROMPT, prior / 10)
+    assert router.estimate('small', PROMPT) == pytest.approx(prior / 10)
+    router.observe('small', PROMPT, prior / 10 * 2)
+    assert router.estimate('small', PROMPT) == pytest.approx(prior / 10 * 1.3)
+    assert router.route(['big', 'small'], [PROMPT], prior / 2) == 'small'
+
+def test_batch_estimate_covers_parallel_calls_and_the_reduce(router):
+    single = router.estimate('small', PROMPT)
+    assert router.estimate_batch('small', [PROMPT] * 4, concurrency=4) > single
+    assert router.estimate_batch('small', [PROMPT] * 4, concurrency=1) > 4 * single
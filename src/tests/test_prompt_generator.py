@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import pandas as pd
+from services.prompt_generator import PromptGenerator
+
+def tickets(descriptions):
+    return pd.DataFrame({
+        'ORDER_NUMBER': [str(1000 + i) for i in range(len(descriptions))],
+        'ACCEPTANCE_TIME': pd.date_range('2024-01-01', periods=len(descriptions), freq='D'),
+        'ORDER_DESCRIPTION_1': descriptions,
+        'ORDER_DESCRIPTION_2': 'Internet',
+        'COMPLETION_RESULT_KB': 'Router restarted',
+    })
+
+def test_near_duplicates_are_collapsed():
+    section = tickets(["No signal on port 3", "no signal on port 12!", "No  signal on port 7.", "Slow speed"])
+    details = PromptGenerator().compact_ticket_details(section)
+    assert details.splitlines() == [
+        "- 3 tickets: No signal on port 3 - Internet. Resolution: Router restarted "
+        "(e.g. Ticket 1000, 2024-01-01 to 2024-01-03)",
+        "- Ticket 1003 (2024-01-04): Slow speed - Internet. Resolution: Router restarted",
+    ]
+
+def test_largest_groups_are_kept_first_and_the_rest_is_counted():
+    section = tickets(["Rare issue"] + ["Outage in area 1"] * 2 + ["Slow speed"] * 5)
+    details = PromptGenerator(token_budget=40).compact_ticket_details(section)
+    lines = details.splitlines()
+    assert lines[0].startswith("- 5 tickets: Slow speed")
+    assert "Rare issue" not in details
+    assert lines[1:] == ["- ... 3 more tickets in 2 less frequent groups omitted"]
+
+def test_a_single_long_description_is_truncated_to_the_budget():
+    generator = PromptGenerator(token_budget=50)
+    details = generator.compact_ticket_details(tickets(["x" * 5_000, "short"]))
+    line = details.splitlines()[0]
+    assert line.startswith("- Ticket 1000 (2024-01-01): xxx") and line.endswith("…")
+    assert len(line) < 50 * generator.chars_per_token
+
+def test_prompts_under_budget_are_unchanged():
+    section = tickets(["No signal on port 3", "No signal on port 4", "Slow speed"])
+    unbudgeted = PromptGenerator().create_section_prompt("Initial Issues", "Internet", section)
+    assert PromptGenerator(token_budget=10_000).create_section_prompt("Initial Issues", "Internet", section) == unbudgeted
+    assert "Ticket 1001 (2024-01-02): No signal on port 4" in unbudgeted
+
+def iterrows_ticket_details(section_data):
+    """The row-by-row formatting format_ticket_details replaced"""
+    return "\n".join(
+        f"- Ticket {row.get('ORDER_NUMBER', 'Unknown')} ({row.get('ACCEPTANCE_TIME', 'Unknown date').date() if hasattr(row.get('ACCEPTANCE_TIME', pd.NaT), 'date') else 'Unknown date'}): "
+        f"{row.get('ORDER_DESCRIPTION_1', '')} - {row.get('ORDER_DESCRIPTION_2', '')}. "
+        f"Resolution: {row.get('COMPLETION_RESULT_KB', '')}"
+        for _, row in section_data.iterrows()
+    )
+
+@pytest.mark.parametrize("acceptance_time", [
+    pd.Series(pd.to_datetime(['2024-01-01 08:00', None, '2024-03-31 23:30'])),
+    pd.Series(pd.to_datetime(['2024-01-01 08:00', None, '2024-03-31 23:30'])).dt.tz_localize('Asia/Riyadh'),
+    pd.Series(['2024-01-01', None, 'yesterday']),
+])
+def test_format_ticket_details_matches_row_iteration(acceptance_time):
+    section = pd.DataFrame({
+        'ORDER_NUMBER': pd.array([101, 102, None], dtype='Int64'),
+        'ACCEPTANCE_TIME': acceptance_time,
+        'ORDER_DESCRIPTION_1': ['No signal', np.nan, pd.NA],
+        'ORDER_DESCRIPTION_2': pd.array(['Internet', None, 'TV'], dtype='string'),
+        'COMPLETION_RESULT_KB': [1.5, np.nan, 3.0],
+    })
+    assert PromptGenerator().format_ticket_details(section) == iterrows_ticket_details(section)
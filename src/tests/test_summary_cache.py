@@ -0,0 +1,42 @@
+import os
+from services.summary_cache import SummaryCache, DEFAULT_CACHE_DIR
+
+def test_default_directory_is_under_src(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    src = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert DEFAULT_CACHE_DIR == os.path.join(src, ".cache", "summaries")
+
+def test_put_and_get(tmp_path):
+    cache = SummaryCache(str(tmp_path))
+    key = SummaryCache.make_key("model", 0.7, "prompt")
+    cache.put(key, "summary")
+    assert cache.get(key) == "summary"
+
+def test_failed_write_is_ignored_and_leaves_no_temp_file(tmp_path, monkeypatch):
+    cache = SummaryCache(str(tmp_path))
+
+    def disk_full(*args):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(os, "replace", disk_full)
+    cache.put(SummaryCache.make_key("model", 0.7, "prompt"), "summary")
+    assert os.listdir(tmp_path) == []
+
+def test_entries_removed_during_eviction_are_skipped(tmp_path):
+    cache = SummaryCache(str(tmp_path), max_bytes=10)
+    for i in range(5):
+        cache.put(SummaryCache.make_key("model", 0.7, str(i)), "x" * 8)
+    os.remove(next(iter(cache._entries()))[2])
+    cache.put(SummaryCache.make_key("model", 0.7, "last"), "y" * 8)
+    assert cache.stats()['entries'] == 1
+
+def test_contains_neither_counts_nor_refreshes_the_entry(tmp_path):
+    cache = SummaryCache(str(tmp_path))
+    key = SummaryCache.make_key("model", 0.7, "prompt")
+    cache.put(key, "summary")
+    os.utime(cache._path(key), (1, 1))
+
+    assert cache.contains(key)
+    assert not cache.contains(SummaryCache.make_key("model", 0.7, "other"))
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert os.path.getmtime(cache._path(key)) == 1
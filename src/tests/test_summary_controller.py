@@ -0,0 +1,129 @@
+import pytest
+from benchmarks.stub_llm import StubAIService
+from benchmarks.synthetic import generate_dump
+from controllers.data_controller import DataController
+from controllers.summary_controller import SummaryController, DEGRADED_MARKER
+from models.data_loader import DataLoader
+from services.deadline import DeadlineExceeded
+from services.history_store import HistoryStore
+from services.metrics import metrics
+from services.summary_cache import SummaryCache
+from services.model_router import ModelRouter
+
+@pytest.fixture(scope="module")
+def data_controller():
+    data_controller = DataController(single_pass=True)
+    data_controller.process_data(DataLoader().load_from_text(generate_dump(2_000, seed=1)))
+    return data_controller
+
+def make_controller(data_controller, **options):
+    router = ModelRouter(model_speeds={'slow': 0.01, 'fast': 100.0})
+    return SummaryController(data_controller, "slow", router=router, **options)
+
+def fail_if_called(prompt, deadline=None):
+    raise AssertionError("no LLM call expected")
+
+def test_sections_over_budget_are_degraded_without_calling_the_model(data_controller, monkeypatch):
+    controller = make_controller(data_controller, latency_budget=4)
+    monkeypatch.setattr(controller.ai_service, 'generate_summary', fail_if_called)
+    product = data_controller.get_stats()['products'][0]
+
+    summary = controller.generate_product_summary(product)
+
+    sections = data_controller.get_timeline_sections(product)
+    assert summary.count(DEGRADED_MARKER) == len(sections)
+    assert f"{len(sections)} of {len(sections)} sections were degraded" in summary
+    assert "**Tickets:**" in summary
+    assert [(p, section) for p, section, _ in controller.degraded] == [(product, name) for name in sections]
+
+def test_sections_over_budget_go_to_the_fallback_model(data_controller, monkeypatch):
+    controller = make_controller(data_controller, latency_budget=4, fallback_model="fast")
+    monkeypatch.setattr(controller.ai_service, 'generate_summary', fail_if_called)
+    monkeypatch.setattr(controller.fallback_service, 'generate_summary', lambda prompt, deadline=None: "fast summary")
+    product = data_controller.get_stats()['products'][0]
+
+    summary = controller.generate_product_summary(product)
+
+    assert DEGRADED_MARKER not in summary
+    assert "Summarized with the faster model fast" in summary
+    assert controller.degraded == []
+
+def test_expired_call_is_degraded(data_controller, monkeypatch):
+    controller = SummaryController(data_controller, "model", call_timeout=30, router=ModelRouter(model_speeds={}))
+
+    def time_out(prompt, deadline=None):
+        raise DeadlineExceeded("model did not finish")
+
+    monkeypatch.setattr(controller.ai_service, 'generate_summary', time_out)
+    product = data_controller.get_stats()['products'][0]
+    section_name, section_data, prompt = controller.plan_product_summary(product)[0]
+
+    summary = controller.summarize_section(section_name, product, section_data, prompt)
+
+    assert summary.startswith(f"{DEGRADED_MARKER} model did not finish within the deadline")
+    assert controller.degraded == [(product, section_name, "model did not finish within the deadline")]
+    # A timeout only tells the router the call took at least this long
+    assert controller.router.corrections()['model'] >= 1.0
+
+def test_without_budget_the_selected_model_answers(data_controller, monkeypatch):
+    controller = make_controller(data_controller)
+    monkeypatch.setattr(controller.ai_service, 'generate_summary', lambda prompt: "model summary")
+    product = data_controller.get_stats()['products'][0]
+
+    assert DEGRADED_MARKER not in controller.generate_product_summary(product)
+
+def test_streaming_within_a_budget_looks_up_each_section_once(data_controller, monkeypatch, tmp_path):
+    controller = make_controller(data_controller, latency_budget=4, section_store=HistoryStore(str(tmp_path)))
+    monkeypatch.setattr(controller.ai_service, 'generate_summary', fail_if_called)
+    product = data_controller.get_stats()['products'][0]
+    metrics.reset()
+
+    events = list(controller.stream_product_summary(product))
+
+    sections = [value for kind, value in events if kind == "section"]
+    assert metrics.snapshot()['caches']['section'] == {'hits': 0, 'misses': len(sections)}
+
+def map_reduce_controller(data_controller, tmp_path, chunk_size=10, fan_out=3):
+    controller = SummaryController(data_controller, "stub", map_reduce_chunk_size=chunk_size,
+                                   map_reduce_fan_out=fan_out)
+    controller.ai_service = StubAIService(cache=SummaryCache(str(tmp_path)))
+    controller.ai_service._initialize_llm()
+    return controller
+
+def product_tickets(data_controller, count):
+    return data_controller.get_product_data(data_controller.get_stats()['products'][0]).iloc[:count]
+
+def test_map_chunks_are_fixed_size_slices(data_controller, tmp_path):
+    controller = map_reduce_controller(data_controller, tmp_path)
+    tickets = product_tickets(data_controller, 21)
+    assert not controller._needs_map_reduce(tickets.iloc[:10])
+    assert controller._needs_map_reduce(tickets.iloc[:11])
+
+    prompts = controller._map_prompts("Initial Issues", "Voice", tickets)
+
+    assert len(prompts) == 3
+    for prompt, chunk in zip(prompts, (tickets.iloc[:10], tickets.iloc[10:20], tickets.iloc[20:])):
+        assert [f"Ticket {number} " in prompt for number in tickets['ORDER_NUMBER']] == \
+               tickets['ORDER_NUMBER'].isin(chunk['ORDER_NUMBER']).tolist()
+
+@pytest.mark.parametrize("chunks, calls, final_parts", [(3, 3, 3), (4, 4 + 2, 2), (9, 9 + 3, 3), (10, 10 + 4 + 2, 2)])
+def test_partials_are_reduced_level_by_level_up_to_the_fan_out(data_controller, tmp_path, chunks, calls, final_parts):
+    controller = map_reduce_controller(data_controller, tmp_path)
+
+    prompt = controller._map_reduce_prompt("Initial Issues", "Voice", product_tickets(data_controller, 10 * chunks))
+
+    assert controller.ai_service._llm.calls == calls
+    # The final reduce combines at most fan_out partial summaries
+    assert f"Part {final_parts}:" in prompt and f"Part {final_parts + 1}:" not in prompt
+
+def test_append_only_recalls_changed_chunks_and_the_reduces_above_them(data_controller, tmp_path):
+    controller = map_reduce_controller(data_controller, tmp_path)
+    controller._map_reduce_prompt("Initial Issues", "Voice", product_tickets(data_controller, 95))
+    llm = controller.ai_service._llm
+    assert llm.calls == 10 + 4 + 2
+
+    llm.calls = 0
+    controller._map_reduce_prompt("Initial Issues", "Voice", product_tickets(data_controller, 101))
+
+    # Chunk 10 grew and chunk 11 is new; only the last reduce of each level covers them
+    assert llm.calls == 2 + 1 + 1
@@ -0,0 +1,35 @@
+import threading
+import pytest
+from services.deadline import Deadline, DeadlineExceeded
+from services.summary_worker import SummaryWorker
+
+def test_handed_off_slot_stays_taken_until_released():
+    worker = SummaryWorker(max_concurrency=1)
+    with worker.slot("a") as lease:
+        release = lease.hand_off()
+    assert worker.stats()['running'] == 1
+    with pytest.raises(DeadlineExceeded):
+        with worker.slot("b", Deadline(0.05)):
+            pass
+    assert worker.stats()['waiting'] == 0
+    release()
+    assert worker.stats()['running'] == 0
+    with worker.slot("b", Deadline(1)):
+        assert worker.stats()['running'] == 1
+
+def test_shared_result_waits_only_until_the_deadline():
+    worker = SummaryWorker(max_concurrency=2)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow(lease):
+        started.set()
+        finish.wait(5)
+        return "done"
+
+    leader = threading.Thread(target=worker.run, args=("a", "key", slow))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(DeadlineExceeded):
+        worker.run("b", "key", slow, Deadline(0.05))
+    finish.set()
+    leader.join()
@@ -0,0 +1,58 @@
+import io
+import pytest
+from benchmarks.synthetic import generate_frame
+from controllers.data_controller import DataController
+from controllers.file_controller import FileController
+from services.prompt_generator import PromptGenerator
+
+duckdb = pytest.importorskip("duckdb")
+from services.ticket_store import TicketStore
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+def dump(seed):
+    df = generate_frame(400, seed=seed)
+    # Missing resolutions must read the same in prompts from either backend
+    df['COMPLETION_RESULT_KB'] = df['COMPLETION_RESULT_KB'].astype(object).where(df.index % 7 != 0)
+    return df.to_csv(sep='\t', index=False).encode()
+
+def uploads():
+    return [Upload(f"dump{seed}.txt", dump(seed)) for seed in range(3)]
+
+@pytest.fixture
+def loaded(tmp_path):
+    in_memory = DataController(single_pass=True)
+    df, _ = FileController(max_workers=1).load_uploaded_files(uploads())
+    in_memory.process_data(df)
+
+    report = []
+    stored = DataController(single_pass=True)
+    store = TicketStore(path=str(tmp_path / "tickets.duckdb"))
+    assert stored.process_into_store(FileController(max_workers=1).iter_uploaded_files(uploads(), report),
+                                     store, "dump", report)
+    return in_memory, stored, store, report
+
+def test_files_streamed_into_the_store_match_in_memory_processing(loaded):
+    in_memory, stored, store, report = loaded
+
+    assert stored.mapped_df.empty
+    assert stored.get_stats() == in_memory.get_stats()
+    assert [entry['status'] for entry in report] == ['parsed'] * 3
+    assert store.info("dump")['report'] == report
+    page, total = stored.query_rows(page=1, page_size=50)
+    expected, _ = in_memory.query_rows(page=1, page_size=50)
+    assert total == len(in_memory.mapped_df)
+    assert page['ORDER_NUMBER'].tolist() == expected['ORDER_NUMBER'].tolist()
+
+def test_store_results_keep_in_memory_dtypes_and_prompts(loaded):
+    in_memory, stored, _, _ = loaded
+    generator = PromptGenerator()
+    for product in in_memory.get_stats()['products']:
+        expected = in_memory.get_product_data(product)
+        actual = stored.get_product_data(product)
+        assert [str(dtype) for dtype in actual.dtypes] == [str(dtype) for dtype in expected.dtypes]
+        assert (generator.format_ticket_details(actual.head(20))
+                == generator.format_ticket_details(expected.head(20)))
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+from models.timeline_analyzer import TimelineAnalyzer, SECTION_NAMES
+
+def tickets(times):
+    return pd.DataFrame({'ACCEPTANCE_TIME': pd.to_datetime(pd.Series(times)), 'ORDER_NUMBER': range(len(times))})
+
+def sizes(sections):
+    return {name: len(section) for name, section in sections.items()}
+
+DAYS = pd.date_range('2024-01-01', periods=50, freq='D')
+
+def test_time_splits_into_equal_whole_day_periods():
+    sections = TimelineAnalyzer(5, 'time').create_timeline_sections(tickets(DAYS))
+    assert list(sections) == SECTION_NAMES
+    # 49 days make 9-day periods; the last section takes the remainder
+    assert list(sizes(sections).values()) == [9, 9, 9, 9, 14]
+
+def test_auto_uses_time_for_long_periods_and_count_for_short_ones():
+    assert sizes(TimelineAnalyzer(5, 'auto').create_timeline_sections(tickets(DAYS))) == \
+        sizes(TimelineAnalyzer(5, 'time').create_timeline_sections(tickets(DAYS)))
+    week = pd.date_range('2024-01-01', periods=20, freq='8h')
+    assert list(sizes(TimelineAnalyzer(5, 'auto').create_timeline_sections(tickets(week))).values()) == [4] * 5
+
+def test_count_splits_evenly():
+    assert list(sizes(TimelineAnalyzer(5, 'count').create_timeline_sections(tickets(DAYS))).values()) == [10] * 5
+
+def test_quantile_keeps_equal_timestamps_together():
+    times = ['2024-01-01'] * 8 + ['2024-03-01'] * 2
+    sections = TimelineAnalyzer(5, 'quantile').create_timeline_sections(tickets(times))
+    assert sizes(sections) == {'Initial Issues': 8, 'Recent Events': 2}
+
+def test_calendar_has_one_section_per_month_and_folds_older_months_into_the_first():
+    sections = TimelineAnalyzer(5, 'calendar').create_timeline_sections(tickets(DAYS))
+    assert sizes(sections) == {'January 2024': 31, 'February 2024': 19}
+
+    year = pd.date_range('2024-01-01', periods=12, freq='MS')
+    sections = TimelineAnalyzer(3, 'calendar').create_timeline_sections(tickets(year))
+    assert sizes(sections) == {'Through October 2024': 10, 'November 2024': 1, 'December 2024': 1}
+
+def test_tickets_without_a_date():
+    times = list(DAYS[:20]) + [None] * 3
+    count_sections = TimelineAnalyzer(5, 'count').create_timeline_sections(tickets(times))
+    # Positional count slices keep undated tickets in the last section
+    assert count_sections['Recent Events']['ACCEPTANCE_TIME'].isna().sum() == 3
+    assert sum(sizes(count_sections).values()) == 23
+    # Time-based sections only hold dated tickets
+    for strategy in ['time', 'quantile', 'calendar']:
+        sections = TimelineAnalyzer(5, strategy).create_timeline_sections(tickets(times))
+        assert sum(sizes(sections).values()) == 20
+        assert not any(section['ACCEPTANCE_TIME'].isna().any() for section in sections.values())
+
+    assert sizes(TimelineAnalyzer(5).create_timeline_sections(tickets([None, None]))) == {'All Tickets': 2}
+
+@pytest.mark.parametrize("strategy", ['auto', 'time', 'count', 'quantile', 'calendar'])
+def test_single_timestamp_product_keeps_every_ticket(strategy):
+    sections = TimelineAnalyzer(5, strategy).create_timeline_sections(tickets(['2024-02-03 10:00'] * 6))
+    assert sum(sizes(sections).values()) == 6
+    assert all(len(section) for section in sections.values())
+
+def test_more_sections_than_tickets_gives_one_ticket_per_section():
+    sections = TimelineAnalyzer(5, 'count').create_timeline_sections(tickets(DAYS[:3]))
+    assert sizes(sections) == {'Initial Issues': 1, 'Follow-ups': 1, 'Developments': 1}
+    sections = TimelineAnalyzer(8, 'time').create_timeline_sections(tickets(DAYS[:3]))
+    assert sum(sizes(sections).values()) == 3
+
+def test_callers_frame_is_not_mutated():
+    df = pd.DataFrame({'ACCEPTANCE_TIME': ['2024-01-03', '2024-01-01', '2024-01-02'], 'ORDER_NUMBER': [3, 1, 2]})
+    original = df.copy()
+    sections = TimelineAnalyzer(3, 'count').create_timeline_sections(df)
+    pd.testing.assert_frame_equal(df, original)
+    assert [section['ORDER_NUMBER'].tolist() for section in sections.values()] == [[1], [2], [3]]
@@ -1,4 +1,6 @@
+import pandas as pd
 import streamlit as st
+from typing import Any, Dict, List
 
 class PageView:
     """Responsible for basic page setup"""
@@ -10,8 +12,22 @@ class PageView:
         st.caption("Upload raw ticket data text file to generate AI-powered summaries")
     
     def file_uploader(self):
-        """Render file upload component"""
-        return st.file_uploader("Upload Ticket Data Text File", type=["txt"])
+        """Render file upload component; returns a list of uploaded files"""
+        return st.file_uploader("Upload Ticket Data Text Files or zip/gz Archives", type=["txt", "csv", "tsv", "zip", "gz"],
+                                accept_multiple_files=True)
+    
+    def show_file_report(self, report: List[Dict[str, Any]]):
+        """Show which uploaded files were parsed and which failed"""
+        failed = [entry for entry in report if entry['status'] == 'failed']
+        if failed:
+            st.warning(f"{len(failed)} of {len(report)} files could not be parsed and were skipped: "
+                       + ", ".join(entry['file'] for entry in failed))
+        if len(report) > 1 or failed:
+            with st.expander(f"Files ({len(report)})", expanded=bool(failed)):
+                table = pd.DataFrame(report)
+                table['MB'] = (table.pop('bytes') / 1024 ** 2).round(2)
+                table['seconds'] = table['seconds'].round(2)
+                st.dataframe(table, hide_index=True, use_container_width=True)
     
     def show_error(self, message: str):
         """Show error message"""
@@ -1,21 +1,32 @@
 import streamlit as st
-import plotly.express as px
 import pandas as pd
+from typing import Optional, Tuple
 
 class ResolutionTimeView:
     """Responsible only for displaying resolution time visualizations"""
     
-    def render(self, df: pd.DataFrame):
-        """Render resolution time visualization"""
+    def render(self, resolution_summary: Optional[Tuple[pd.DataFrame, pd.DataFrame]]):
+        """Render resolution time visualization from precomputed box statistics and outliers"""
         
-        # Resolution time analysis
-        if all(col in df.columns for col in ['COMPLETION_TIME', 'ACCEPTANCE_TIME']) and \
-           not df['COMPLETION_TIME'].isna().all() and not df['ACCEPTANCE_TIME'].isna().all():
-            data_with_resolution = df.copy()
-            data_with_resolution['RESOLUTION_HOURS'] = (data_with_resolution['COMPLETION_TIME'] - 
-                                                     data_with_resolution['ACCEPTANCE_TIME']).dt.total_seconds() / 3600
-            fig2 = px.box(data_with_resolution, x='PRODUCT', y='RESOLUTION_HOURS',
-                         title="Resolution Time by Product (Hours)")
+        if resolution_summary is not None and not resolution_summary[0].empty:
+            import plotly.graph_objects as go  # deferred until there is a chart to draw
+            summary, outliers = resolution_summary
+            products = summary['PRODUCT'].astype(str).tolist()
+            # Only five numbers per product reach the browser, however many tickets there are
+            fig2 = go.Figure(go.Box(
+                x=products,
+                q1=summary['Q1'], median=summary['MEDIAN'], q3=summary['Q3'],
+                lowerfence=summary['LOWER_FENCE'], upperfence=summary['UPPER_FENCE'],
+                boxpoints=False, name="Resolution time",
+                hovertext=[f"{count:,} tickets" for count in summary['COUNT']]
+            ))
+            if not outliers.empty:
+                fig2.add_trace(go.Scatter(
+                    x=outliers['PRODUCT'].astype(str), y=outliers['RESOLUTION_HOURS'],
+                    mode='markers', marker=dict(size=4), name="Outliers"
+                ))
+            fig2.update_layout(title="Resolution Time by Product (Hours)", xaxis_title="PRODUCT",
+                               yaxis_title="RESOLUTION_HOURS", showlegend=False)
             st.plotly_chart(fig2, use_container_width=True)
         else:
             st.warning("Cannot create resolution time visualization: Missing or invalid timing data")
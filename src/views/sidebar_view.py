@@ -1,5 +1,6 @@
 import streamlit as st
-from typing import List
+import pandas as pd
+from typing import List, Dict, Any, Callable, Optional
 
 class SidebarView:
     """Responsible only for sidebar components"""
@@ -25,4 +26,226 @@ class SidebarView:
             3. Keep Ollama running in background
             """)
             
-            return model
\ No newline at end of file
+            return model
+    
+    def render_warm_up_settings(self) -> bool:
+        """Render the model warm-up toggle and return whether it is enabled"""
+        with st.sidebar:
+            return st.checkbox(
+                "Preload selected model",
+                value=True,
+                help="Load the model into Ollama in the background as soon as it is selected "
+                     "and keep it loaded between summaries"
+            )
+    
+    def render_model_status(self, model: str, status: Optional[Dict[str, Any]]):
+        """Show whether the selected model is loading, loaded or failed to load"""
+        if status is None:
+            return
+        with st.sidebar:
+            if status['state'] == 'loading':
+                st.caption(f"Loading {model} in the background...")
+            elif status['state'] == 'ready':
+                st.caption(f"{model} is loaded (took {status['seconds']:.1f}s)")
+            else:
+                st.caption(f"Could not preload {model}: {status['error']}")
+    
+    def render_cache_settings(self, stats: Dict[str, Any], on_clear: Callable) -> bool:
+        """Render summary cache controls and return whether the cache should be used"""
+        with st.sidebar:
+            st.divider()
+            st.subheader("Summary Cache")
+            use_cache = st.checkbox(
+                "Reuse cached summaries",
+                value=True,
+                help="Skip the LLM for sections whose prompt was already summarized with the same model"
+            )
+            st.caption(f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KB) · "
+                       f"{stats['hits']} hits / {stats['misses']} misses")
+            st.button("Clear cache", on_click=on_clear)
+            
+            return use_cache
+    
+    def render_generation_settings(self) -> Dict[str, Any]:
+        """Render summary generation settings"""
+        with st.sidebar:
+            st.divider()
+            st.subheader("Generation")
+            max_concurrency = st.slider(
+                "Concurrent LLM requests",
+                min_value=1,
+                max_value=16,
+                value=1,
+                help="Send section prompts for all products in parallel. "
+                     "Ollama serves parallel requests up to its OLLAMA_NUM_PARALLEL setting."
+            )
+            on_demand = st.checkbox(
+                "Generate summaries on demand",
+                value=True,
+                help="Generate each product's summary in the background when requested, "
+                     "so the overview and charts show immediately"
+            )
+            stream = st.checkbox(
+                "Stream summaries",
+                value=False,
+                help="Show each section while the model is writing it. Takes precedence over concurrent requests. "
+                     "Only used when summaries are not generated on demand."
+            )
+            num_sections = st.slider(
+                "Timeline sections",
+                min_value=2,
+                max_value=10,
+                value=5,
+                help="Number of timeline sections summarized per product"
+            )
+            strategy_labels = {
+                'auto': "Automatic",
+                'time': "Equal time",
+                'count': "Equal ticket count",
+                'quantile': "Time quantiles",
+                'calendar': "Calendar months"
+            }
+            timeline_strategy = st.selectbox(
+                "Section bucketing",
+                list(strategy_labels),
+                format_func=strategy_labels.get,
+                help="Automatic splits short periods by ticket count and longer ones by equal time. "
+                     "Calendar months keep older sections unchanged when new tickets are appended."
+            )
+            prompt_token_budget = st.number_input(
+                "Prompt token budget per section",
+                min_value=0,
+                value=3000,
+                step=500,
+                help="Larger sections collapse near-duplicate tickets and keep the most common issues. "
+                     "0 sends every ticket."
+            )
+            map_reduce_chunk_size = st.number_input(
+                "Map-reduce chunk size (tickets)",
+                min_value=0,
+                value=500,
+                step=100,
+                help="Sections with more tickets are summarized in chunks whose partial summaries "
+                     "are then combined. 0 sends each section as one prompt."
+            )
+            map_reduce_fan_out = st.slider(
+                "Map-reduce fan-out",
+                min_value=2,
+                max_value=16,
+                value=8,
+                help="Maximum number of partial summaries combined by one reduce call"
+            )
+            
+            return {
+                'max_concurrency': max_concurrency,
+                'on_demand': on_demand,
+                'stream': stream,
+                'num_sections': num_sections,
+                'timeline_strategy': timeline_strategy,
+                'prompt_token_budget': int(prompt_token_budget) or None,
+                'map_reduce_chunk_size': int(map_reduce_chunk_size) or None,
+                'map_reduce_fan_out': map_reduce_fan_out
+            }
+    
+    def render_latency_settings(self, model_options: List[str], model_name: str) -> Dict[str, Any]:
+        """Render the latency budget controls for summary runs"""
+        with st.sidebar:
+            st.divider()
+            st.subheader("Latency budget")
+            latency_budget = st.number_input(
+                "Seconds per summary",
+                min_value=0,
+                value=0,
+                step=10,
+                help="Time one product summary (or one batch of summaries) may take. Sections not expected "
+                     "to finish in time go to the fallback model or get a statistical summary. 0 means no limit."
+            )
+            call_timeout = st.number_input(
+                "Seconds per LLM call",
+                min_value=0,
+                value=0,
+                step=10,
+                help="Cancel a section's model call after this long and show a statistical summary instead. "
+                     "0 means no limit besides the summary budget."
+            )
+            fallback_model = st.selectbox(
+                "Fallback model",
+                ["None"] + [model for model in model_options if model != model_name],
+                help="Smaller or faster model used for sections the selected model is not expected to "
+                     "finish within the budget"
+            )
+            
+            return {
+                'latency_budget': float(latency_budget) or None,
+                'call_timeout': float(call_timeout) or None,
+                'fallback_model': None if fallback_model == "None" else fallback_model
+            }
+    
+    def render_history_settings(self, on_clear: Callable) -> bool:
+        """Render append-mode controls and return whether uploads are appended to the history"""
+        with st.sidebar:
+            st.divider()
+            st.subheader("History")
+            append_mode = st.checkbox(
+                "Append uploads to history",
+                value=False,
+                help="Merge each upload into the stored tickets (deduplicated on ORDER_NUMBER) and only "
+                     "re-summarize sections whose tickets changed"
+            )
+            st.button("Clear history", on_click=on_clear)
+            
+            return append_mode
+    
+    def render_storage_settings(self, available: bool, on_clear: Callable) -> bool:
+        """Render the out-of-core storage toggle and return whether processed data is kept in DuckDB"""
+        with st.sidebar:
+            st.divider()
+            st.subheader("Storage")
+            out_of_core = st.checkbox(
+                "Query data from disk (DuckDB)",
+                value=False,
+                disabled=not available,
+                help="Keep processed tickets in a local DuckDB file and run filtering, paging and chart "
+                     "aggregation as queries, so only the rows on screen are held in memory"
+                     + ("" if available else ". Install duckdb to enable this option.")
+            )
+            if out_of_core:
+                st.button("Clear stored datasets", on_click=on_clear)
+            
+            return out_of_core and available
+    
+    def render_performance_panel(self, snapshot: Dict[str, Any], on_reset: Callable):
+        """Render a collapsible panel with stage timings, LLM, cache and volume metrics"""
+        with st.sidebar:
+            with st.expander("Performance", expanded=False):
+                st.caption("Covers every session served by this app process since the last reset. "
+                           "Resetting clears the numbers for all sessions.")
+                if snapshot['stages']:
+                    st.markdown("**Stages**")
+                    st.dataframe(pd.DataFrame([
+                        {'stage': name, 'runs': entry['runs'], 'total (s)': round(entry['seconds'], 3),
+                         'last (s)': round(entry['last_seconds'], 3)}
+                        for name, entry in snapshot['stages'].items()
+                    ]), hide_index=True)
+                
+                if snapshot['llm']:
+                    st.markdown("**LLM**")
+                    st.dataframe(pd.DataFrame([
+                        {'model': model, 'calls': entry['calls'], 'errors': entry['errors'],
+                         'prompt tokens': entry['prompt_tokens'], 'completion tokens': entry['completion_tokens'],
+                         'avg latency (s)': round(entry['avg_latency'], 2),
+                         'tokens/s': round(entry['tokens_per_second'], 1)}
+                        for model, entry in snapshot['llm'].items()
+                    ]), hide_index=True)
+                
+                if snapshot['sections']:
+                    st.markdown("**Slowest sections**")
+                    sections = sorted(snapshot['sections'], key=lambda entry: entry['seconds'], reverse=True)[:10]
+                    st.dataframe(pd.DataFrame(sections).round({'seconds': 2}), hide_index=True)
+                
+                for name, entry in snapshot['caches'].items():
+                    st.caption(f"{name} cache: {entry['hits']} hits / {entry['misses']} misses")
+                for name, entry in snapshot['volume'].items():
+                    st.caption(f"{name}: {entry['rows']:,} rows, {entry['bytes'] / 2**20:.1f} MB")
+                
+                st.button("Reset metrics", on_click=on_reset)
\ No newline at end of file
@@ -1,7 +1,20 @@
 # views/summary_view.py
 import streamlit as st
+import os
+import time
 import pandas as pd
-from typing import List, Callable, Dict
+from typing import Any, List, Callable, Dict, Optional, Tuple
+
+# Exports are written under Streamlit's static folder (server.enableStaticServing in
+# .streamlit/config.toml), so the browser downloads them straight from disk
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "exports")
+EXPORT_URL = "app/static/exports"
+# Largest file Streamlit serves from its static folder
+MAX_STATIC_EXPORT_BYTES = 200 * 1024 * 1024
+# Without static serving the export is sent through st.download_button, which holds it in memory
+MAX_INLINE_EXPORT_BYTES = 50 * 1024 * 1024
+# Exports older than this are deleted when the next one is prepared
+EXPORT_MAX_AGE = 3600
 
 class SummaryView:
     """Responsible only for displaying summary content"""
@@ -20,17 +33,162 @@ class SummaryView:
                     with st.spinner(f"Generating summary for {product}..."):
                         summary = get_summary_callback(product)
                         if summary:
-                            # Split the summary into sections and display with clear headers
-                            sections = summary.split('### ')
-                            for section in sections[1:]:  # Skip the first empty split
-                                section_title, *section_content = section.split('\n', 1)
-                                with st.container():
-                                    st.subheader(section_title)
-                                    st.markdown('\n'.join(section_content))
+                            self._render_summary(summary)
                         else:
                             st.warning(f"No tickets found for {product}")
     
-    def render_raw_data(self, tab, df: pd.DataFrame):
-        """Render raw data in the given tab"""
+    def _render_summary(self, summary: str):
+        # Split the summary into sections and display with clear headers
+        sections = summary.split('### ')
+        # Text before the first section, e.g. a note that no sections could be created
+        preamble = '\n'.join(line for line in sections[0].splitlines() if not line.startswith('## ')).strip()
+        if preamble:
+            st.markdown(preamble)
+        for section in sections[1:]:
+            section_title, *section_content = section.split('\n', 1)
+            with st.container():
+                st.subheader(section_title)
+                st.markdown('\n'.join(section_content))
+    
+    def render_on_demand_summaries(self, tab, products: List[str], get_job: Callable,
+                                   on_generate: Callable, on_generate_all: Callable):
+        """Render each product's summary job: a button to start it, its progress, or its result.
+        
+        Jobs run in the background, so this returns immediately and the rest of the page renders.
+        """
         with tab:
-            st.dataframe(df)
\ No newline at end of file
+            st.button("Generate all summaries", on_click=on_generate_all, key="generate_all_summaries")
+            for product in products:
+                job = get_job(product)
+                with st.expander(f"{product} Tickets", expanded=job is not None):
+                    if job is None:
+                        st.button("Generate summary", on_click=on_generate, args=(product,),
+                                  key=f"generate_summary_{product}")
+                    elif job.active:
+                        st.progress(job.progress,
+                                    text=f"Generating summary: {job.finished_sections} of "
+                                         f"{job.total_sections or '?'} sections done")
+                    elif job.status == "error":
+                        st.error(f"Summary generation failed: {job.error}")
+                        st.button("Retry", on_click=on_generate, args=(product,),
+                                  key=f"retry_summary_{product}")
+                    elif job.summary:
+                        self._render_summary(job.summary)
+                    else:
+                        st.warning(f"No tickets found for {product}")
+    
+    def render_streaming_product_summaries(self, tab, products: List[str], stream_callback: Callable):
+        """Render product summaries in the given tab while the model is still writing them"""
+        with tab:
+            for product in products:
+                with st.expander(f"{product} Tickets", expanded=True):
+                    events = stream_callback(product)
+                    if events is None:
+                        st.warning(f"No tickets found for {product}")
+                        continue
+                    
+                    placeholder, text, received = None, "", False
+                    for kind, value in events:
+                        received = True
+                        if kind == "section":
+                            st.subheader(value)
+                            placeholder, text = st.empty(), ""
+                        elif kind == "token":
+                            text += value
+                            placeholder.markdown(text + "▌")
+                        elif kind == "details":
+                            placeholder.markdown(text)
+                            st.markdown(value)
+                    if not received:
+                        st.markdown("No timeline sections could be created for this product.")
+    
+    def show_generating_message(self, product_count: int):
+        """Show a spinner while summaries for all products are generated"""
+        return st.spinner(f"Generating summaries for {product_count} products...")
+    
+    def render_raw_data(self, tab, products: List[Any], columns: List[str],
+                        date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]],
+                        count_callback: Callable, query_callback: Callable, export_callback: Callable):
+        """Render one page of filtered, sorted raw data; filtering, sorting and paging run on the server"""
+        with tab:
+            filters = self._render_raw_data_filters(products, columns, date_range)
+            
+            page_col, size_col = st.columns([3, 1])
+            page_size = size_col.selectbox("Rows per page", [50, 100, 250, 500], index=1, key="raw_page_size")
+            page_count = max(1, -(-count_callback(**filters) // page_size))
+            page = page_col.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count,
+                                         value=1, step=1, key="raw_page") - 1
+            page = min(page, page_count - 1)
+            
+            page_df, total = query_callback(page=page, page_size=page_size, **filters)
+            st.dataframe(page_df, hide_index=True)
+            first = page * page_size + 1 if total else 0
+            st.caption(f"Rows {first:,}–{page * page_size + len(page_df):,} of {total:,}")
+            
+            self._render_export(export_callback, filters)
+    
+    def _render_raw_data_filters(self, products: List[Any], columns: List[str],
+                                 date_range: Optional[Tuple[pd.Timestamp, pd.Timestamp]]) -> Dict[str, Any]:
+        product_col, date_col, search_col = st.columns(3)
+        selected = product_col.multiselect("Products", products, key="raw_products")
+        
+        start = end = None
+        if date_range is not None:
+            dates = date_col.date_input("Accepted between", value=(date_range[0].date(), date_range[1].date()),
+                                        min_value=date_range[0].date(), max_value=date_range[1].date(),
+                                        key="raw_dates")
+            # The range has a single date while the user is still picking the end
+            if len(dates) == 2:
+                start = pd.Timestamp(dates[0])
+                end = pd.Timestamp(dates[1]) + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+        order_search = search_col.text_input("ORDER_NUMBER contains", key="raw_order_search").strip()
+        
+        sort_col, direction_col = st.columns([3, 1])
+        sort_by = sort_col.selectbox("Sort by", ["(none)"] + columns, key="raw_sort_by")
+        ascending = direction_col.radio("Order", ["Ascending", "Descending"], key="raw_sort_order") == "Ascending"
+        
+        return {
+            'products': selected or None,
+            'start': start,
+            'end': end,
+            'order_search': order_search,
+            'sort_by': None if sort_by == "(none)" else sort_by,
+            'ascending': ascending
+        }
+    
+    def _render_export(self, export_callback: Callable, filters: Dict[str, Any]):
+        format_col, button_col = st.columns([1, 3])
+        file_format = format_col.selectbox("Export format", ["csv", "parquet"], key="raw_export_format")
+        static_serving = st.get_option("server.enableStaticServing")
+        limit = MAX_STATIC_EXPORT_BYTES if static_serving else MAX_INLINE_EXPORT_BYTES
+        st.caption(f"Exports up to {limit // 2**20} MB can be downloaded; narrow the filters for larger ones.")
+        if button_col.button("Prepare export of filtered rows", key="raw_export"):
+            if static_serving:
+                self._prune_exports()
+            with st.spinner("Writing export..."):
+                path = export_callback(file_format=file_format, directory=EXPORT_DIR if static_serving else None,
+                                       **filters)
+            size = os.path.getsize(path)
+            if size > limit:
+                os.remove(path)
+                st.warning(f"The export is {size / 2**20:,.0f} MB, over the {limit // 2**20} MB download limit. "
+                           "Narrow the filters, or use cli.py for full reports.")
+            elif static_serving:
+                # Served by Streamlit's static file handler, read from disk in chunks
+                st.markdown(f'<a href="{EXPORT_URL}/{os.path.basename(path)}" download="tickets.{file_format}">'
+                            f'Download {file_format.upper()} ({size / 2**20:,.1f} MB)</a>', unsafe_allow_html=True)
+            else:
+                with open(path, "rb") as f:
+                    st.download_button(f"Download {file_format.upper()}", f, file_name=f"tickets.{file_format}",
+                                       mime="text/csv" if file_format == "csv" else "application/octet-stream")
+                os.remove(path)
+    
+    def _prune_exports(self):
+        """Delete exports old enough that their download link is no longer in use"""
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        for entry in os.scandir(EXPORT_DIR):
+            try:
+                if time.time() - entry.stat().st_mtime > EXPORT_MAX_AGE:
+                    os.remove(entry.path)
+            except OSError:
+                pass
\ No newline at end of file
@@ -1,21 +1,19 @@
 import streamlit as st
-import plotly.express as px
 import pandas as pd
+from typing import Optional, Tuple
 
 class TimeSeriesView:
     """Responsible only for displaying time series visualizations"""
     
-    def render(self, df: pd.DataFrame):
-        """Render time series visualization"""
+    def render(self, volume_counts: Optional[Tuple[pd.DataFrame, str]]):
+        """Render time series visualization from per-period ticket counts"""
         
-        # Only create date-based visualization if the column exists and has valid dates
-        if 'ACCEPTANCE_TIME' in df.columns and not df['ACCEPTANCE_TIME'].isna().all():
-            # Ensure we have a date column
-            data_with_date = df.copy()
-            data_with_date['DATE'] = data_with_date['ACCEPTANCE_TIME'].dt.date
-            daily_counts = data_with_date.groupby(['DATE', 'PRODUCT']).size().reset_index(name='COUNT')
-            fig1 = px.line(daily_counts, x='DATE', y='COUNT', color='PRODUCT',
-                          title="Daily Ticket Volume by Product")
+        # Only create date-based visualization if there were valid dates to count
+        if volume_counts is not None:
+            import plotly.express as px  # deferred until there is a chart to draw
+            counts, granularity = volume_counts
+            fig1 = px.line(counts, x='DATE', y='COUNT', color='PRODUCT',
+                          title=f"{granularity} Ticket Volume by Product")
             st.plotly_chart(fig1, use_container_width=True)
         else:
             st.warning("Cannot create time-based visualization: Missing or invalid date data")
@@ -1,8 +1,8 @@
 from views.time_series_view import TimeSeriesView
 from views.resolution_time_view import ResolutionTimeView
 import streamlit as st
-import plotly.express as px
 import pandas as pd
+from typing import Optional, Tuple
 
 class VisualizationView:
     """Coordinates all visualization components"""
@@ -11,17 +11,20 @@ class VisualizationView:
         self.time_series_view = TimeSeriesView()
         self.resolution_time_view = ResolutionTimeView()
     
-    def render_visualizations(self, df: pd.DataFrame):
-        """Render all visualizations"""
+    def show_no_data(self):
+        """Show the visualizations header with a no-data warning"""
+        st.subheader("Data Visualizations")
+        st.warning("No data available for visualizations")
+    
+    def render_visualizations(self, volume_counts: Optional[Tuple[pd.DataFrame, str]],
+                              resolution_summary: Optional[Tuple[pd.DataFrame, pd.DataFrame]]):
+        """Render all visualizations from pre-aggregated chart data"""
         st.subheader("Data Visualizations")
-        if df.empty:
-            st.warning("No data available for visualizations")
-            return
             
         viz_col1, viz_col2 = st.columns(2)
         
         with viz_col1:
-            self.time_series_view.render(df)
+            self.time_series_view.render(volume_counts)
         
         with viz_col2:
-            self.resolution_time_view.render(df)
\ No newline at end of file
+            self.resolution_time_view.render(resolution_summary)
\ No newline at end of file